@@ -0,0 +1,297 @@
+"""Нагрузочный прогон приёма событий с постоянной частотой запросов.
+
+По умолчанию приложение поднимается в этом же процессе поверх httpx.ASGITransport,
+а Kafka и Redis заменены заглушками из benchmarks.fakes — так измеряется сам
+сервис одного воркера без сети. С --url нагрузка подаётся на запущенный
+сервис (например, docker compose с реальными Kafka и Redis).
+
+Нагрузка открытая: запросы отправляются по расписанию независимо от ответов,
+а задержка считается от запланированного времени отправки, поэтому очередь
+на стороне клиента тоже попадает в перцентили. Частота повышается ступенями,
+пока выполняется SLO; последняя такая ступень — максимальный устойчивый RPS.
+
+Пример:
+    python -m benchmarks.ingest --endpoint batch --batch-size 20 --rates 200,400,800 \
+        --output benchmarks/results/batch.json --baseline benchmarks/results/batch-prev.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+import jwt
+
+from benchmarks.workload import EVENT_MIX, batch_request, single_request
+
+BENCH_SECRET = "benchmark-secret"
+
+# Заглушки вместо обязательных настроек: в локальном режиме Kafka и Redis не нужны.
+BENCH_ENV = {
+    "KAFKA_BOOTSTRAP_SERVERS": "localhost:9092",
+    "KAFKA_USERNAME": "benchmark",
+    "KAFKA_PASSWORD": "benchmark",
+    "JWT_SECRET_KEY": BENCH_SECRET,
+}
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Перцентиль методом ближайшего ранга по отсортированным значениям"""
+    if not values:
+        return 0.0
+    rank = max(0, min(len(values) - 1, int(round(q / 100 * len(values))) - 1))
+    return values[rank]
+
+
+def make_token(secret: str, algorithm: str = "HS256", ttl: int = 3600) -> str:
+    return jwt.encode(
+        {"user_uuid": str(uuid.uuid4()), "exp": int(time.time()) + ttl}, secret, algorithm=algorithm
+    )
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def build_local_app(token_verification: str):
+    """Приложение с заглушками Kafka и Redis вместо lifespan"""
+    for name, value in BENCH_ENV.items():
+        os.environ.setdefault(name, value)
+    os.environ.setdefault("TOKEN_VERIFICATION", token_verification)
+    Path("logs/analitycal_service").mkdir(parents=True, exist_ok=True)
+
+    from datetime import timedelta
+
+    from src.core.config import settings
+    from src.main import app
+    from src.services import batcher, token
+    from src.services.event import EventPublisherService
+    from tests.fakes import InMemoryProducer, InMemoryStorage
+
+    producer = InMemoryProducer(record=False)
+    if settings.auth.token_verification == "local":
+        token.verifier = token.TokenVerifier(key=settings.auth.jwt_key, algorithm=settings.auth.jwt_algorithm)
+    batcher.batcher = batcher.EventBatcher(
+        storage=InMemoryStorage(),
+        producer=producer,
+        publisher=EventPublisherService(producer=producer),
+        topic=settings.brocker.auth_topic_name,
+        key=settings.brocker.auth_topic_key,
+        buffer_size=settings.batcher.buffer_size,
+        batch_size=settings.batcher.batch_size,
+        linger=timedelta(milliseconds=settings.batcher.linger_ms),
+        expire=timedelta(seconds=settings.batcher.pending_ttl),
+    )
+    await batcher.batcher.start()
+    return app, batcher.batcher, producer
+
+
+async def run_step(
+    client: httpx.AsyncClient,
+    rate: float,
+    duration: float,
+    endpoint: str,
+    batch_size: int,
+    tokens: list[str],
+    seed: int,
+    timeout: float,
+) -> dict:
+    """Одна ступень: rate запросов в секунду в течение duration секунд"""
+    rng = random.Random(seed)
+    total = int(rate * duration)
+    latencies: list[float] = []
+    statuses: dict[str, int] = {}
+    events = 0
+
+    async def send(scheduled: float, path: str, body: dict, size: int):
+        nonlocal events
+        try:
+            response = await client.post(path, json=body, timeout=timeout)
+            status = str(response.status_code)
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        latencies.append(time.perf_counter() - scheduled)
+        statuses[status] = statuses.get(status, 0) + 1
+        if status == "200":
+            events += size
+
+    tasks = []
+    started = time.perf_counter()
+    for i in range(total):
+        scheduled = started + i / rate
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        token = rng.choice(tokens)
+        if endpoint == "batch":
+            path, body = batch_request(rng, token, batch_size)
+            size = batch_size
+        else:
+            path, body = single_request(rng, token)
+            size = 1
+        tasks.append(asyncio.create_task(send(scheduled, path, body, size)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    errors = total - statuses.get("200", 0)
+    return {
+        "target_rps": rate,
+        "requests": total,
+        "achieved_rps": round(total / elapsed, 1),
+        "events_per_second": round(events / elapsed, 1),
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "statuses": dict(sorted(statuses.items())),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 2),
+            "p95": round(percentile(latencies, 95) * 1000, 2),
+            "p99": round(percentile(latencies, 99) * 1000, 2),
+            "max": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        },
+    }
+
+
+def meets_slo(step: dict, p99_ms: float, max_error_rate: float) -> bool:
+    # Клиент, не успевающий отправлять по расписанию, тоже означает перегрузку.
+    return (
+        step["latency_ms"]["p99"] <= p99_ms
+        and step["error_rate"] <= max_error_rate
+        and step["achieved_rps"] >= 0.95 * step["target_rps"]
+    )
+
+
+def compare(result: dict, baseline: dict) -> list[str]:
+    """Строки сравнения с прошлым прогоном по совпадающим ступеням"""
+    lines = []
+    before = baseline["summary"]["max_sustainable_rps_per_worker"]
+    after = result["summary"]["max_sustainable_rps_per_worker"]
+    lines.append(f"max sustainable rps/worker: {before} -> {after}")
+    previous = {step["target_rps"]: step for step in baseline["steps"]}
+    for step in result["steps"]:
+        old = previous.get(step["target_rps"])
+        if old is None:
+            continue
+        lines.append(
+            "rps {target}: p50 {a50} -> {b50} ms, p99 {a99} -> {b99} ms, errors {ae} -> {be}".format(
+                target=step["target_rps"],
+                a50=old["latency_ms"]["p50"],
+                b50=step["latency_ms"]["p50"],
+                a99=old["latency_ms"]["p99"],
+                b99=step["latency_ms"]["p99"],
+                ae=old["error_rate"],
+                be=step["error_rate"],
+            )
+        )
+    return lines
+
+
+async def main(args: argparse.Namespace) -> dict:
+    rates = [float(rate) for rate in args.rates.split(",")]
+    producer = None
+    if args.url:
+        transport = httpx.AsyncHTTPTransport(limits=httpx.Limits(max_connections=args.connections))
+        client = httpx.AsyncClient(base_url=args.url, transport=transport, headers={"User-Agent": "benchmark"})
+        secret = args.jwt_secret
+    else:
+        app, event_batcher, producer = await build_local_app(args.token_verification)
+        client = httpx.AsyncClient(
+            base_url="http://benchmark", transport=httpx.ASGITransport(app=app), headers={"User-Agent": "benchmark"}
+        )
+        secret = BENCH_SECRET
+    tokens = [make_token(secret) for _ in range(args.users)]
+
+    steps = []
+    max_sustainable = 0.0
+    async with client:
+        if args.warmup:
+            await run_step(client, rates[0], args.warmup, args.endpoint, args.batch_size, tokens, args.seed, args.timeout)
+        for i, rate in enumerate(rates):
+            step = await run_step(
+                client, rate, args.duration, args.endpoint, args.batch_size, tokens, args.seed + i, args.timeout
+            )
+            step["slo_met"] = meets_slo(step, args.slo_p99_ms, args.slo_error_rate)
+            steps.append(step)
+            print(json.dumps(step, sort_keys=True), file=sys.stderr)
+            if not step["slo_met"]:
+                if not args.keep_going:
+                    break
+                continue
+            max_sustainable = max(max_sustainable, step["achieved_rps"])
+
+    if producer is not None:
+        await event_batcher.stop()
+
+    return {
+        "meta": {
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "target": args.url or "in-process",
+        },
+        "config": {
+            "endpoint": args.endpoint,
+            "batch_size": args.batch_size if args.endpoint == "batch" else 1,
+            "duration_seconds": args.duration,
+            "users": args.users,
+            "workers": args.workers,
+            "token_verification": args.token_verification if not args.url else None,
+            "event_mix": EVENT_MIX,
+            "slo": {"p99_ms": args.slo_p99_ms, "error_rate": args.slo_error_rate},
+            "seed": args.seed,
+        },
+        "steps": steps,
+        "summary": {
+            "max_sustainable_rps": max_sustainable,
+            "max_sustainable_rps_per_worker": round(max_sustainable / args.workers, 1),
+            "produced_messages": dict(sorted(producer.messages.items())) if producer is not None else None,
+        },
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Адрес запущенного сервиса; без него сервис поднимается в процессе")
+    parser.add_argument("--endpoint", choices=("single", "batch"), default="single")
+    parser.add_argument("--batch-size", type=int, default=20, help="Событий в одном запросе /events/batch")
+    parser.add_argument("--rates", default="100,200,400,800,1600", help="Ступени RPS через запятую")
+    parser.add_argument("--duration", type=float, default=10.0, help="Длительность ступени, секунд")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Прогрев на первой ступени, секунд")
+    parser.add_argument("--users", type=int, default=1000, help="Сколько разных токенов использовать")
+    parser.add_argument("--workers", type=int, default=1, help="Воркеров сервиса, для пересчёта RPS на воркер")
+    parser.add_argument("--connections", type=int, default=200, help="Предел соединений с --url")
+    parser.add_argument("--timeout", type=float, default=5.0)
+    parser.add_argument("--token-verification", choices=("local", "broker"), default="local")
+    parser.add_argument("--jwt-secret", default=os.environ.get("JWT_SECRET_KEY", BENCH_SECRET))
+    parser.add_argument("--slo-p99-ms", type=float, default=50.0)
+    parser.add_argument("--slo-error-rate", type=float, default=0.001)
+    parser.add_argument("--keep-going", action="store_true", help="Не останавливаться на первой ступени вне SLO")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path, help="Куда сохранить результат в JSON")
+    parser.add_argument("--baseline", type=Path, help="Прошлый результат для сравнения")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    result = asyncio.run(main(args))
+    report = json.dumps(result, indent=2, sort_keys=True)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(report + "\n")
+    else:
+        print(report)
+    if args.baseline:
+        print("\n".join(compare(result, json.loads(args.baseline.read_text()))), file=sys.stderr)
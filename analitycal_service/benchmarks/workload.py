@@ -0,0 +1,61 @@
+import random
+import uuid
+
+# Доли типов событий в реальном трафике плеера: heartbeat'ы прогресса
+# составляют основную часть запросов.
+EVENT_MIX = {
+    "video_progress": 0.70,
+    "page_view": 0.10,
+    "click": 0.10,
+    "quality_change": 0.05,
+    "video_finished": 0.03,
+    "search_filter_used": 0.02,
+}
+
+QUALITIES = ["240p", "360p", "480p", "720p", "1080p", "2160p"]
+PAGES = ["main", "film", "search", "profile", "genre"]
+FILTERS = ["comedy", "drama", "2024", "imdb>7", "ru", "en", "series"]
+# Постоянный набор фильмов, чтобы прогоны разных версий были сравнимы.
+_catalog_rng = random.Random(0)
+VIDEOS = [str(uuid.UUID(int=_catalog_rng.getrandbits(128), version=4)) for _ in range(200)]
+
+
+def make_payload(event_type: str, rng: random.Random) -> dict:
+    """Полезная нагрузка, соответствующая схеме ClientEvent для типа события"""
+    video_id = rng.choice(VIDEOS)
+    if event_type == "video_progress":
+        return {"video_id": video_id, "watched_seconds": rng.randint(1, 7200)}
+    if event_type == "page_view":
+        return {"page_type": rng.choice(PAGES), "duration_seconds": rng.randint(1, 600)}
+    if event_type == "click":
+        return {"item_id": video_id, "item_type": "film"}
+    if event_type == "quality_change":
+        from_quality, to_quality = rng.sample(QUALITIES, 2)
+        return {
+            "video_id": video_id,
+            "from_quality": from_quality,
+            "to_quality": to_quality,
+            "current_time_seconds": rng.randint(0, 7200),
+        }
+    if event_type == "video_finished":
+        return {"video_id": video_id, "total_duration_seconds": rng.randint(600, 10800)}
+    return {"filters": rng.sample(FILTERS, rng.randint(1, 3))}
+
+
+def next_event_type(rng: random.Random) -> str:
+    return rng.choices(list(EVENT_MIX), weights=list(EVENT_MIX.values()))[0]
+
+
+def single_request(rng: random.Random, token: str) -> tuple[str, dict]:
+    """Путь и тело запроса к /event/{event_type}/"""
+    event_type = next_event_type(rng)
+    return f"/api/v1/event/{event_type}/", {"token": token, "payload": make_payload(event_type, rng)}
+
+
+def batch_request(rng: random.Random, token: str, size: int) -> tuple[str, dict]:
+    """Путь и тело запроса к /events/batch"""
+    events = []
+    for _ in range(size):
+        event_type = next_event_type(rng)
+        events.append({"event_type": event_type, "payload": make_payload(event_type, rng)})
+    return "/api/v1/events/batch", {"token": token, "events": events}
@@ -1,19 +1,40 @@
-from locust import HttpUser, task, between
-import uuid
+"""Нагрузка на развёрнутый сервис через locust.
+
+Каждый пользователь отправляет запросы с постоянной частотой (constant_throughput),
+так что общий RPS задаётся числом пользователей. Токен подписывается секретом
+JWT_SECRET_KEY, чтобы события проходили локальную проверку.
+
+    JWT_SECRET_KEY=... locust -f locustfile.py --host http://localhost:8000 \
+        --users 500 --spawn-rate 50 --run-time 2m --headless --csv results/locust
+"""
+
+import os
 import random
 
+from locust import HttpUser, constant_throughput, task
+
+from benchmarks.ingest import make_token
+from benchmarks.workload import batch_request, single_request
+
+BATCH_SIZE = int(os.environ.get("BENCH_BATCH_SIZE", "20"))
+USER_RPS = float(os.environ.get("BENCH_USER_RPS", "1"))
+SECRET = os.environ.get("JWT_SECRET_KEY", "benchmark-secret")
+
+
+class PlayerUser(HttpUser):
+    wait_time = constant_throughput(USER_RPS)
+
+    def on_start(self):
+        self.rng = random.Random()
+        self.token = make_token(SECRET)
+        self.client.headers["User-Agent"] = "LocustLoadTest"
+
+    @task(9)
+    def send_event(self):
+        path, body = single_request(self.rng, self.token)
+        self.client.post(path, json=body, name="/api/v1/event/[type]/", timeout=2)
 
-class LoadTestUser(HttpUser):
-    wait_time = between(1, 2)  # интервал между запросами
-
-    @task
-    def send_event_click(self):
-        self.client.post(
-            "/api/v1/event/click/",
-            json={
-                "token": str(uuid.uuid4()),  # имитация уникального токена
-                "payload": {"video_id": "test_id", "watched_seconds": 10},
-            },
-            headers={"User-Agent": "LocustLoadTest"},
-            timeout=2,
-        )
+    @task(1)
+    def send_batch(self):
+        path, body = batch_request(self.rng, self.token, BATCH_SIZE)
+        self.client.post(path, json=body, timeout=2)
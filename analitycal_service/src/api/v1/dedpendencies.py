@@ -2,6 +2,8 @@ from typing import Annotated
 
 from fastapi import Depends
 
+from src.services.batcher import EventBatcher, get_batcher
+from src.services.token import TokenVerifier, get_token_verifier
 from src.services.event import AbstractEventPublisherService, get_event_service
 from src.infrastructure.storage import AbstractStorageRepository, get_storage_repository 
 from src.infrastructure.producer import AbstractProducerBroker, get_producer
@@ -9,3 +11,5 @@ from src.infrastructure.producer import AbstractProducerBroker, get_producer
 eventDep = Annotated[AbstractEventPublisherService, Depends(get_event_service)]
 storage_repoDep = Annotated[AbstractStorageRepository, Depends(get_storage_repository)]
 producerDep = Annotated[AbstractProducerBroker, Depends(get_producer)]
+batcherDep = Annotated[EventBatcher, Depends(get_batcher)]
+verifierDep = Annotated[TokenVerifier | None, Depends(get_token_verifier)]
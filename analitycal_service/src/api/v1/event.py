@@ -1,44 +1,98 @@
-import uuid
-import asyncio
 import logging
 
 from fastapi import APIRouter, HTTPException, Request
 from pydantic import ValidationError
 
-from src.core.config import settings
-from src.api.v1.schemas import Event
+from src.api.v1.schemas import Event, EventBatch
 from src.domain.entities import ClientEvent
-from src.api.v1.dedpendencies import storage_repoDep, producerDep
-from src.infrastructure.storage import AbstractStorageRepository
-from src.infrastructure.producer import AbstractProducerBroker
+from src.api.v1.dedpendencies import batcherDep, verifierDep
+from src.infrastructure.storage import make_request_id
+from src.services.batcher import BufferFullError, PendingEvent, client_events_adapter
+from src.services.token import InvalidTokenError, TokenVerifier
 
 route = APIRouter()
 
 
+def verify_token(verifier: TokenVerifier | None, token: str) -> str | None:
+    """Id пользователя из токена или None, если токен проверит сервис авторизации"""
+    if verifier is None:
+        return None
+    try:
+        return verifier.verify(token)
+    except InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+
+def make_pending(request_id: str, token: str, user_id: str | None, events: list[ClientEvent]) -> PendingEvent:
+    if user_id is not None:
+        return PendingEvent(request_id=request_id, events=events)
+    message = {"request_id": request_id, "token": token}
+    return PendingEvent(request_id=request_id, events=events, message=message)
+
+
 @route.post("/event/{event_type}/")
 async def client_event(
     request: Request,
     event: Event,
     event_type: str,
-    storage_repo: storage_repoDep,
-    producer: producerDep
+    batcher: batcherDep,
+    verifier: verifierDep,
 ):
-    request_id = str(uuid.uuid4())
+    request_id = make_request_id()
+    user_id = verify_token(verifier, event.token)
     try:    
         client_event = ClientEvent(
+            user_id=user_id,
             user_agent=request.headers.get("user-agent"),
             user_ip=request.client.host,
             event_type=event_type,
             payload=event.payload,
         )
-        await storage_repo.add(key=request_id, value=client_event.model_dump_json())
     except ValidationError as e:
         raise HTTPException(status_code=422, detail=e.errors())
-    message = {"request_id": request_id, "token": event.token}
-    asyncio.create_task(producer.send_message(topic=settings.brocker.auth_topic_name, value=message, key=settings.brocker.auth_topic_key))
+    try:
+        batcher.submit(make_pending(request_id, event.token, user_id, [client_event]))
+    except BufferFullError:
+        raise HTTPException(status_code=503, detail="Event buffer is full", headers={"Retry-After": "1"})
     return {"ok": True}
 
 
+@route.post("/events/batch")
+async def client_events_batch(
+    request: Request,
+    batch: EventBatch,
+    batcher: batcherDep,
+    verifier: verifierDep,
+):
+    """Принимает пачку событий одного клиента с общим токеном.
+
+    Payload событий проверены вместе с телом запроса, ClientEvent всей
+    пачки валидируются одним проходом TypeAdapter; ошибка в любом событии
+    отклоняет пачку с 422. Токен проверяется один раз на всю пачку:
+    локально либо одним сообщением в auth_topic, пока пачка ждёт ответа в
+    Redis под одним request_id.
+    """
+    request_id = make_request_id()
+    user_id = verify_token(verifier, batch.token)
+    user_agent = request.headers.get("user-agent")
+    user_ip = request.client.host
+    items = []
+    for item in batch.events:
+        fields = {"user_id": user_id, "user_agent": user_agent, "user_ip": user_ip, "event_type": item.event_type, "payload": item.payload}
+        if item.timestamp is not None:
+            fields["timestamp"] = item.timestamp
+        items.append(fields)
+    try:
+        client_events = client_events_adapter.validate_python(items)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+    try:
+        batcher.submit(make_pending(request_id, batch.token, user_id, client_events))
+    except BufferFullError:
+        raise HTTPException(status_code=503, detail="Event buffer is full", headers={"Retry-After": "1"})
+    return {"ok": True, "accepted": len(client_events)}
+
+
 @route.post("/ping")
 async def ping():
     return {"pong": True}
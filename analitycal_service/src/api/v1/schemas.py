@@ -1,8 +1,28 @@
+from datetime import datetime
 from typing import Any
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
+
+from src.core.config import settings
+from src.domain.entities import EventPayload, EventType, validate_payload_type
 
 
 class Event(BaseModel):
     token: str
     payload: dict[str, Any]
+
+
+class BatchEvent(BaseModel):
+    event_type: EventType
+    timestamp: datetime | None = None
+    payload: EventPayload
+
+    @model_validator(mode="before")
+    @classmethod
+    def check_payload_type(cls, data: Any) -> Any:
+        return validate_payload_type(data)
+
+
+class EventBatch(BaseModel):
+    token: str
+    events: list[BatchEvent] = Field(min_length=1, max_length=settings.batcher.max_request_events)
@@ -1,7 +1,8 @@
-import logging
+import logging.config
 from pathlib import Path
+from typing import Literal
 
-from pydantic import Field
+from pydantic import Field, SecretStr, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -49,6 +50,37 @@ class BrockerSettings(ModelConfig):
     bootstrap_service: str = Field(..., validation_alias="KAFKA_BOOTSTRAP_SERVERS")
     kafka_username: str = Field(..., validation_alias="KAFKA_USERNAME")
     kafka_password: str = Field(..., validation_alias="KAFKA_PASSWORD")
+    security_protocol: Literal["PLAINTEXT", "SASL_PLAINTEXT", "SASL_SSL"] = Field(
+        default="PLAINTEXT", validation_alias="KAFKA_SECURITY_PROTOCOL"
+    )
+
+    # Профиль продюсера (см. src/infrastructure/kafka.py) и точечные
+    # переопределения его параметров; пустое значение — как в профиле.
+    producer_profile: Literal["latency", "throughput"] = Field(
+        default="throughput", validation_alias="KAFKA_PRODUCER_PROFILE"
+    )
+    compression_type: Literal["gzip", "snappy", "lz4", "zstd"] | None = Field(
+        default=None, validation_alias="KAFKA_COMPRESSION_TYPE"
+    )
+    linger_ms: int | None = Field(default=None, validation_alias="KAFKA_LINGER_MS")
+    max_batch_size: int | None = Field(default=None, validation_alias="KAFKA_MAX_BATCH_SIZE")
+
+    # Потребитель забирает до consumer_max_records сообщений за раз и
+    # обрабатывает до consumer_concurrency разделов одновременно.
+    consumer_max_records: int = Field(default=500, validation_alias="CONSUMER_MAX_RECORDS")
+    consumer_concurrency: int = Field(default=8, validation_alias="CONSUMER_CONCURRENCY")
+    # Раздел с упавшей пачкой встаёт на паузу с удваивающейся задержкой; после
+    # consumer_max_retries повторов сообщения обрабатываются по одному, а
+    # непрошедшие пропускаются.
+    consumer_max_retries: int = Field(default=5, validation_alias="CONSUMER_MAX_RETRIES")
+    consumer_retry_backoff_ms: int = Field(default=500, validation_alias="CONSUMER_RETRY_BACKOFF_MS")
+    consumer_max_backoff_ms: int = Field(default=30000, validation_alias="CONSUMER_MAX_BACKOFF_MS")
+
+    # Кодирование событий в event_topic: компактный msgpack по версии схемы
+    # или JSON для совместимости со старыми потребителями.
+    event_encoding: Literal["json", "msgpack"] = Field(
+        default="msgpack", validation_alias="EVENT_ENCODING"
+    )
 
     @property
     def consumer_topics(self) -> list[str]:
@@ -63,6 +95,15 @@ class RedisSettings(ModelConfig):
     redis_username: str | None = Field(default=None, validation_alias="REDIS_USERNAME")
     redis_password: str | None = Field(default=None, validation_alias="REDIS_PASSWORD")
 
+    # Ожидающие проверки события хранятся в hash-корзинах по
+    # pending_bucket_seconds секунд, подтверждённые — в stream.
+    pending_prefix: str = Field(default="analytics:pending", validation_alias="PENDING_EVENTS_PREFIX")
+    pending_bucket_seconds: int = Field(default=60, validation_alias="PENDING_BUCKET_SECONDS")
+    resolved_stream: str = Field(default="analytics:resolved", validation_alias="RESOLVED_EVENTS_STREAM")
+    resolved_batch_size: int = Field(default=500, validation_alias="RESOLVED_EVENTS_BATCH_SIZE")
+    # Через сколько неподтверждённую запись stream забирает другой процесс.
+    resolved_claim_idle_ms: int = Field(default=60000, validation_alias="RESOLVED_EVENTS_CLAIM_IDLE_MS")
+
     @property
     def redis_url(self) -> str:
         if self.redis_username is not None:
@@ -74,10 +115,56 @@ class RedisSettings(ModelConfig):
         return f"redis://{self.redis_host}:{self.redis_port}"
 
 
+class AuthSettings(ModelConfig):
+    # broker — события ждут в Redis ответа сервиса авторизации через
+    # auth_topic; local — подпись и срок токена проверяются на месте по
+    # JWT_SECRET_KEY или JWT_PUBLIC_KEY_FILE, события сразу уходят в топик.
+    token_verification: Literal["local", "broker"] = Field(
+        default="broker", validation_alias="TOKEN_VERIFICATION"
+    )
+    jwt_secret_key: SecretStr | None = Field(default=None, validation_alias="JWT_SECRET_KEY")
+    jwt_public_key_file: Path | None = Field(default=None, validation_alias="JWT_PUBLIC_KEY_FILE")
+    jwt_algorithm: str = Field(default="HS256", validation_alias="JWT_ALGORITHM")
+
+    @model_validator(mode="after")
+    def check_jwt_key(self) -> "AuthSettings":
+        if self.token_verification != "local":
+            return self
+        if self.jwt_public_key_file is not None:
+            if not self.jwt_public_key_file.is_file():
+                raise ValueError(f"JWT_PUBLIC_KEY_FILE не найден: {self.jwt_public_key_file}")
+        elif self.jwt_secret_key is None:
+            raise ValueError(
+                "TOKEN_VERIFICATION=local требует JWT_SECRET_KEY или JWT_PUBLIC_KEY_FILE."
+            )
+        return self
+
+    @property
+    def jwt_key(self) -> str:
+        if self.jwt_public_key_file is not None:
+            return self.jwt_public_key_file.read_text()
+        return self.jwt_secret_key.get_secret_value()
+
+
+class BatcherSettings(ModelConfig):
+    buffer_size: int = Field(default=10000, validation_alias="EVENT_BUFFER_SIZE")
+    batch_size: int = Field(default=500, validation_alias="EVENT_BATCH_SIZE")
+    linger_ms: int = Field(default=10, validation_alias="EVENT_BATCH_LINGER_MS")
+    # Максимум событий в одном запросе к /events/batch.
+    max_request_events: int = Field(default=1000, validation_alias="EVENT_BATCH_MAX_EVENTS")
+    # Сколько событие ждёт проверки токена в Redis.
+    pending_ttl: int = Field(default=600, validation_alias="PENDING_EVENT_TTL")
+    # Повторы записи пачки в Redis и Kafka; задержка удваивается с каждым.
+    flush_retries: int = Field(default=5, validation_alias="EVENT_FLUSH_RETRIES")
+    flush_retry_delay_ms: int = Field(default=100, validation_alias="EVENT_FLUSH_RETRY_DELAY_MS")
+
+
 class Settings(BaseSettings):
     brocker: BrockerSettings = BrockerSettings()
     service: ServiceSettings = ServiceSettings()
     redis: RedisSettings = RedisSettings()
+    batcher: BatcherSettings = BatcherSettings()
+    auth: AuthSettings = AuthSettings()
 
 
 settings = Settings()
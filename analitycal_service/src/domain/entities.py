@@ -1,8 +1,8 @@
 from datetime import datetime
-from typing import Literal
+from typing import Any, Literal
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
 class ClickPayload(BaseModel):
@@ -36,19 +36,53 @@ class VideoProgressPayload(BaseModel):
     watched_seconds: int
 
 
+EventType = Literal[
+    "click", "page_view", "quality_change", "video_finished", "search_filter_used", "video_progress"
+]
+
+EventPayload = (
+    ClickPayload
+    | PageViewPayload
+    | QualityChangePayload
+    | VideoFinishedPayload
+    | SearchFilterPayload
+    | VideoProgressPayload
+)
+
+
+PAYLOAD_TYPES: dict[str, type[BaseModel]] = {
+    "click": ClickPayload,
+    "page_view": PageViewPayload,
+    "quality_change": QualityChangePayload,
+    "video_finished": VideoFinishedPayload,
+    "search_filter_used": SearchFilterPayload,
+    "video_progress": VideoProgressPayload,
+}
+
+
+def validate_payload_type(data: Any) -> Any:
+    """Разбирает payload моделью его event_type.
+
+    Иначе объединение EventPayload принимает первую подходящую модель, и
+    payload одного типа события проходит с event_type другого.
+    """
+    if isinstance(data, dict):
+        payload_type = PAYLOAD_TYPES.get(data.get("event_type"))
+        payload = data.get("payload")
+        if payload_type is not None and not isinstance(payload, payload_type):
+            data = {**data, "payload": payload_type.model_validate(payload)}
+    return data
+
+
 class ClientEvent(BaseModel):
     user_id: UUID | str | None = Field(default=None)
     user_ip: str
     user_agent: str
-    event_type: Literal[
-        "click", "page_view", "quality_change", "video_finished", "search_filter_used", "video_progress"
-    ]
+    event_type: EventType
     timestamp: datetime = Field(default_factory=datetime.now)
-    payload: (
-        ClickPayload
-        | PageViewPayload
-        | QualityChangePayload
-        | VideoFinishedPayload
-        | SearchFilterPayload
-        | VideoProgressPayload
-    )
+    payload: EventPayload
+
+    @model_validator(mode="before")
+    @classmethod
+    def check_payload_type(cls, data: Any) -> Any:
+        return validate_payload_type(data)
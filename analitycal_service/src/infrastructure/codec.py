@@ -0,0 +1,77 @@
+from datetime import datetime
+from uuid import UUID
+
+import msgpack
+
+from src.domain.entities import ClientEvent
+
+JSON_CONTENT_TYPE = b"application/json"
+MSGPACK_CONTENT_TYPE = b"application/x-msgpack;schema=client_event;v=%d"
+CONTENT_TYPE_HEADER = "content-type"
+
+# Версии схемы компактного кодирования. Событие кодируется массивом
+# [user_id, user_ip, user_agent, тип, время в мкс, [поля payload]], где тип —
+# индекс в event_types, а поля payload идут в порядке payload_fields. Схемы
+# только добавляются: потребитель должен уметь читать все прежние версии.
+SCHEMAS = {
+    1: {
+        "event_types": (
+            "click",
+            "page_view",
+            "quality_change",
+            "video_finished",
+            "search_filter_used",
+            "video_progress",
+        ),
+        "payload_fields": {
+            "click": ("item_id", "item_type"),
+            "page_view": ("page_type", "duration_seconds"),
+            "quality_change": (
+                "video_id",
+                "from_quality",
+                "to_quality",
+                "current_time_seconds",
+            ),
+            "video_finished": ("video_id", "total_duration_seconds"),
+            "search_filter_used": ("filters",),
+            "video_progress": ("video_id", "watched_seconds"),
+        },
+    },
+}
+CURRENT_VERSION = max(SCHEMAS)
+
+_schema = SCHEMAS[CURRENT_VERSION]
+_event_type_codes = {name: code for code, name in enumerate(_schema["event_types"])}
+
+
+def _user_id(user_id: UUID | str | None) -> bytes | str | None:
+    if isinstance(user_id, UUID):
+        return user_id.bytes
+    return user_id
+
+
+def _timestamp_us(timestamp: datetime) -> int:
+    return int(timestamp.timestamp() * 1_000_000)
+
+
+def encode_msgpack(event: ClientEvent) -> tuple[bytes, list[tuple[str, bytes]]]:
+    """Кодирует событие текущей версией схемы и возвращает значение с заголовками."""
+    payload = event.payload
+    value = msgpack.packb(
+        [
+            _user_id(event.user_id),
+            event.user_ip,
+            event.user_agent,
+            _event_type_codes[event.event_type],
+            _timestamp_us(event.timestamp),
+            [getattr(payload, field) for field in _schema["payload_fields"][event.event_type]],
+        ]
+    )
+    return value, [(CONTENT_TYPE_HEADER, MSGPACK_CONTENT_TYPE % CURRENT_VERSION)]
+
+
+def encode_json(event: ClientEvent) -> tuple[bytes, list[tuple[str, bytes]]]:
+    return event.model_dump_json().encode("utf-8"), [(CONTENT_TYPE_HEADER, JSON_CONTENT_TYPE)]
+
+
+ENCODERS = {"json": encode_json, "msgpack": encode_msgpack}
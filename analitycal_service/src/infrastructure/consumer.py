@@ -1,8 +1,31 @@
+import asyncio
 import json
+import logging
 from abc import ABC, abstractmethod
-from typing import Callable
+from datetime import timedelta
+from typing import Any, Callable
 
-from aiokafka import AIOKafkaConsumer
+from aiokafka import AIOKafkaConsumer, ConsumerRecord, TopicPartition
+from aiokafka.errors import CommitFailedError
+
+from src.infrastructure.kafka import (
+    MESSAGES_CONSUMED,
+    MESSAGES_CONSUMER_FAILED,
+    MESSAGES_CONSUMER_SKIPPED,
+    security_config,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _loads(value: bytes) -> Any:
+    """JSON сообщения или None, если сообщение не разобрать"""
+    # Исключение из десериализатора остановило бы чтение всех разделов.
+    try:
+        return json.loads(value)
+    except ValueError:
+        logger.warning("Сообщение не является JSON и будет пропущено")
+        return None
 
 
 class AbstractConsumerBroker(ABC):
@@ -15,31 +38,138 @@ class AbstractConsumerBroker(ABC):
     @abstractmethod
     def register_handler(self, topic_name: str, handler: Callable) -> None: ...
 
+    @abstractmethod
+    def register_batch_handler(self, topic_name: str, handler: Callable) -> None: ...
+
 
 class KafkaConsumerWrapper(AbstractConsumerBroker):
-    def __init__(self, bootstrap_servers: str, username: str, password: str, topics: list[str], group_id: str) -> None:
-        """Инициализируем AIOKafkaProducer с авторизацией и сериализацией"""
+    def __init__(
+        self,
+        bootstrap_servers: str,
+        username: str | None,
+        password: str | None,
+        topics: list[str],
+        group_id: str,
+        security_protocol: str = "PLAINTEXT",
+        max_records: int = 500,
+        timeout_ms: int = 1000,
+        concurrency: int = 8,
+        max_retries: int = 5,
+        retry_backoff: timedelta = timedelta(milliseconds=500),
+        max_backoff: timedelta = timedelta(seconds=30),
+    ) -> None:
+        """Инициализируем AIOKafkaConsumer с ручной фиксацией offset'ов после обработки"""
         self._consumer = AIOKafkaConsumer(
             *topics,
             bootstrap_servers=bootstrap_servers,
-            value_deserializer=lambda v: json.loads(v.decode("utf-8")),
+            value_deserializer=_loads,
             key_deserializer=lambda v: v.decode("utf-8") if v else None,
             group_id=group_id,
-            enable_auto_commit=True
+            enable_auto_commit=False,
+            **security_config(security_protocol, username, password),
         )
+        self._max_records = max_records
+        self._timeout_ms = timeout_ms
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._max_retries = max_retries
+        self._retry_backoff = retry_backoff.total_seconds()
+        self._max_backoff = max_backoff.total_seconds()
+        self._failures: dict[TopicPartition, int] = {}
         self._handlers = {}
+        self._batch_handlers = {}
 
     def register_handler(self, topic_name: str, handler: Callable) -> None:
+        """Обработчик одного сообщения: handler(topic, value, key)"""
         self._handlers[topic_name] = handler
 
+    def register_batch_handler(self, topic_name: str, handler: Callable) -> None:
+        """Обработчик пачки сообщений одного раздела: handler(topic, records)"""
+        self._batch_handlers[topic_name] = handler
+
+    async def _handle(self, tp: TopicPartition, records: list[ConsumerRecord]) -> None:
+        batch_handler = self._batch_handlers.get(tp.topic)
+        if batch_handler:
+            await batch_handler(tp.topic, records)
+            return
+        handler = self._handlers.get(tp.topic)
+        if handler:
+            for record in records:
+                await handler(record.topic, record.value, record.key)
+
+    async def _handle_one_by_one(self, tp: TopicPartition, records: list[ConsumerRecord]) -> None:
+        """Обрабатывает сообщения по одному и пропускает те, что снова падают"""
+        for record in records:
+            try:
+                await self._handle(tp, [record])
+            except Exception:
+                logger.exception(
+                    "Сообщение %s:%s:%s пропущено после %s повторов",
+                    record.topic,
+                    record.partition,
+                    record.offset,
+                    self._max_retries,
+                )
+                MESSAGES_CONSUMER_SKIPPED.labels(tp.topic).inc()
+
+    async def _process_partition(self, tp: TopicPartition, records: list[ConsumerRecord]) -> None:
+        """Обрабатывает сообщения раздела по порядку, разделы — параллельно"""
+        MESSAGES_CONSUMED.labels(tp.topic).inc(len(records))
+        async with self._semaphore:
+            if self._failures.get(tp, 0) < self._max_retries:
+                await self._handle(tp, records)
+            else:
+                await self._handle_one_by_one(tp, records)
+
+    def _pause(self, tp: TopicPartition, delay: float) -> None:
+        """Останавливает чтение раздела на delay секунд, не задерживая остальные"""
+        self._consumer.pause(tp)
+        asyncio.get_running_loop().call_later(delay, self._resume, tp)
+
+    def _resume(self, tp: TopicPartition) -> None:
+        # За время паузы раздел мог уйти другому потребителю группы.
+        if tp in self._consumer.assignment():
+            self._consumer.resume(tp)
+
+    async def _process(self, batches: dict[TopicPartition, list[ConsumerRecord]]) -> None:
+        partitions = list(batches)
+        results = await asyncio.gather(
+            *(self._process_partition(tp, batches[tp]) for tp in partitions), return_exceptions=True
+        )
+        offsets = {}
+        for tp, result in zip(partitions, results):
+            if isinstance(result, Exception):
+                # Раздел перечитывается с первого необработанного сообщения
+                # после паузы: доставка как минимум один раз.
+                failures = self._failures.get(tp, 0) + 1
+                self._failures[tp] = failures
+                delay = min(self._retry_backoff * 2 ** (failures - 1), self._max_backoff)
+                logger.error(
+                    "Ошибка обработки раздела %s, попытка %s, повтор через %s с",
+                    tp,
+                    failures,
+                    delay,
+                    exc_info=result,
+                )
+                MESSAGES_CONSUMER_FAILED.labels(tp.topic).inc(len(batches[tp]))
+                self._consumer.seek(tp, batches[tp][0].offset)
+                self._pause(tp, delay)
+            else:
+                self._failures.pop(tp, None)
+                offsets[tp] = batches[tp][-1].offset + 1
+        if offsets:
+            try:
+                await self._consumer.commit(offsets)
+            except CommitFailedError:
+                logger.warning("Offset'ы не зафиксированы из-за перераспределения разделов")
+
     async def start(self):
-        """Устанавливаем соединение с Kafka и запускаем фоновые задачи продюсера"""
+        """Устанавливаем соединение с Kafka и обрабатываем сообщения пачками"""
         await self._consumer.start()
         try:
-            async for message in self._consumer:
-                handler = self._handlers.get(message.topic)
-                if handler:
-                    await handler(message.topic, message.value, message.key)
+            while True:
+                batches = await self._consumer.getmany(timeout_ms=self._timeout_ms, max_records=self._max_records)
+                if batches:
+                    await self._process(batches)
         finally:
             await self.stop()
 
@@ -0,0 +1,51 @@
+from typing import Any
+
+from prometheus_client import Counter
+
+# Профили продюсера. latency — сообщение уходит сразу и подтверждается
+# лидером раздела; throughput — сообщения копятся в крупные сжатые пачки
+# и подтверждаются всеми репликами без дублей при повторах.
+PRODUCER_PROFILES: dict[str, dict[str, Any]] = {
+    "latency": {
+        "linger_ms": 0,
+        "max_batch_size": 16384,
+        "compression_type": None,
+        "acks": 1,
+    },
+    "throughput": {
+        "linger_ms": 20,
+        "max_batch_size": 256 * 1024,
+        "compression_type": "lz4",
+        "acks": "all",
+        "enable_idempotence": True,
+    },
+}
+
+MESSAGES_QUEUED = Counter("kafka_producer_messages_queued", "Сообщения, переданные продюсеру", ["topic"])
+MESSAGES_SENT = Counter("kafka_producer_messages_sent", "Сообщения, подтверждённые брокером", ["topic"])
+MESSAGES_FAILED = Counter("kafka_producer_messages_failed", "Сообщения, которые не удалось доставить", ["topic"])
+BYTES_QUEUED = Counter("kafka_producer_bytes_queued", "Байты значений сообщений, переданных продюсеру", ["topic"])
+MESSAGES_CONSUMED = Counter("kafka_consumer_messages", "Прочитанные сообщения", ["topic"])
+MESSAGES_CONSUMER_FAILED = Counter("kafka_consumer_messages_failed", "Сообщения, обработка которых упала", ["topic"])
+MESSAGES_CONSUMER_SKIPPED = Counter(
+    "kafka_consumer_messages_skipped", "Сообщения, пропущенные после исчерпания повторов", ["topic"]
+)
+
+
+def security_config(security_protocol: str, username: str | None, password: str | None) -> dict[str, Any]:
+    """Параметры подключения, общие для продюсера и потребителя"""
+    config: dict[str, Any] = {"security_protocol": security_protocol}
+    if security_protocol.startswith("SASL"):
+        config.update(
+            sasl_mechanism="PLAIN",
+            sasl_plain_username=username,
+            sasl_plain_password=password,
+        )
+    return config
+
+
+def producer_config(profile: str, **overrides: Any) -> dict[str, Any]:
+    """Настройки профиля с явно заданными переопределениями (None — из профиля)"""
+    config = dict(PRODUCER_PROFILES[profile])
+    config.update({name: value for name, value in overrides.items() if value is not None})
+    return config
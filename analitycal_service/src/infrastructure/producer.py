@@ -1,7 +1,25 @@
+import asyncio
 import json
+import logging
 from abc import ABC, abstractmethod
+from typing import Any, Callable
 
 from aiokafka import AIOKafkaProducer
+from aiokafka.structs import RecordMetadata
+
+from src.infrastructure.kafka import (
+    BYTES_QUEUED,
+    MESSAGES_FAILED,
+    MESSAGES_QUEUED,
+    MESSAGES_SENT,
+    producer_config,
+    security_config,
+)
+
+logger = logging.getLogger(__name__)
+
+# Вызывается по итогам доставки: метаданные записи или исключение.
+DeliveryCallback = Callable[[str, RecordMetadata | None, BaseException | None], None]
 
 
 class AbstractProducerBroker(ABC):
@@ -12,20 +30,50 @@ class AbstractProducerBroker(ABC):
     async def stop(self): ...
 
     @abstractmethod
-    async def send_message(self, topic: str, value: dict, key: str | None = None): ...
+    async def send_message(
+        self, topic: str, value: dict | bytes, key: str | None = None, headers: list[tuple[str, bytes]] | None = None
+    ): ...
 
     @abstractmethod
-    async def send_message_and_wait(self, topic: str, value: dict, key: str | None = None): ...
+    async def send_message_and_wait(
+        self, topic: str, value: dict | bytes, key: str | None = None, headers: list[tuple[str, bytes]] | None = None
+    ): ...
+
+
+def _serialize_value(value: dict | bytes) -> bytes:
+    """Уже закодированные события передаются как есть, словари — в JSON"""
+    if isinstance(value, bytes):
+        return value
+    return json.dumps(value).encode("utf-8")
+
+
+def _log_delivery(topic: str, metadata: RecordMetadata | None, error: BaseException | None) -> None:
+    if error is not None:
+        logger.error("Сообщение в топик %s не доставлено: %s", topic, error)
 
 
 class KafkaProducerWrapper(AbstractProducerBroker):
-    def __init__(self, bootstrap_servers: str, username: str, password: str) -> None:
-        """Инициализируем AIOKafkaProducer с авторизацией и сериализацией"""
+    def __init__(
+        self,
+        bootstrap_servers: str,
+        username: str | None = None,
+        password: str | None = None,
+        security_protocol: str = "PLAINTEXT",
+        profile: str = "throughput",
+        on_delivery: DeliveryCallback = _log_delivery,
+        **overrides: Any,
+    ) -> None:
+        """Инициализируем AIOKafkaProducer с авторизацией и настройками профиля.
+
+        overrides переопределяют параметры профиля (linger_ms, compression_type и т.д.).
+        """
         self._brocker = AIOKafkaProducer(
             bootstrap_servers=bootstrap_servers,
-            value_serializer=lambda v: json.dumps(v).encode("utf-8"),
             key_serializer=lambda v: v.encode("utf-8"),
+            **security_config(security_protocol, username, password),
+            **producer_config(profile, **overrides),
         )
+        self._on_delivery = on_delivery
 
     async def start(self):
         """Устанавливаем соединение с Kafka и запускаем фоновые задачи продюсера"""
@@ -35,13 +83,43 @@ class KafkaProducerWrapper(AbstractProducerBroker):
         """Завершаем соединение и останавливаем фоновые задачи"""
         await self._brocker.stop()
 
-    async def send_message(self, topic: str, value: dict, key: str | None = None):
+    def _delivered(self, topic: str, future: asyncio.Future) -> None:
+        if future.cancelled():
+            error, metadata = asyncio.CancelledError(), None
+        else:
+            error = future.exception()
+            metadata = None if error is not None else future.result()
+        if error is None:
+            MESSAGES_SENT.labels(topic).inc()
+        else:
+            MESSAGES_FAILED.labels(topic).inc()
+        self._on_delivery(topic, metadata, error)
+
+    async def _send(
+        self, topic: str, value: dict | bytes, key: str | None, headers: list[tuple[str, bytes]] | None
+    ) -> asyncio.Future:
+        data = _serialize_value(value)
+        try:
+            future = await self._brocker.send(topic=topic, value=data, key=key, headers=headers)
+        except Exception:
+            MESSAGES_FAILED.labels(topic).inc()
+            raise
+        MESSAGES_QUEUED.labels(topic).inc()
+        BYTES_QUEUED.labels(topic).inc(len(data))
+        future.add_done_callback(lambda f: self._delivered(topic, f))
+        return future
+
+    async def send_message(
+        self, topic: str, value: dict | bytes, key: str | None = None, headers: list[tuple[str, bytes]] | None = None
+    ):
         """Отправляем сообщение в Kafka (асинхронно, без ожидания подтверждения)"""
-        await self._brocker.send(topic=topic, value=value, key=key)
+        await self._send(topic, value, key, headers)
 
-    async def send_message_and_wait(self, topic: str, value: dict, key: str | None = None):
+    async def send_message_and_wait(
+        self, topic: str, value: dict | bytes, key: str | None = None, headers: list[tuple[str, bytes]] | None = None
+    ):
         """Отправляем сообщение и дожидаемся подтверждения от брокера"""
-        await self._brocker.send_and_wait(topic=topic, value=value, key=key)
+        return await (await self._send(topic, value, key, headers))
 
 
 # Глобальный экземпляр — для внедрения DI
@@ -1,38 +1,200 @@
-import json
+import time
+import uuid
 from abc import ABC, abstractmethod
+from collections import defaultdict
 from datetime import timedelta
-from typing import Any
 
 from fastapi import Depends
 from redis.asyncio.client import Redis
+from redis.exceptions import ResponseError
 
+from src.core.config import settings
 from src.db.redis import get_redis
 
 
+def make_request_id() -> str:
+    """Id ожидающего запроса; начинается с номера временной корзины, где он хранится"""
+    bucket = int(time.time()) // settings.redis.pending_bucket_seconds
+    return f"{bucket}-{uuid.uuid4().hex}"
+
+
 class AbstractStorageRepository(ABC):
     @abstractmethod
-    async def add(self, key: str, value: dict[str, Any], expire: timedelta| None = None) -> None: ...
+    async def add_many(self, items: dict[str, bytes], expire: timedelta | None = None) -> None: ...
 
     @abstractmethod
-    async def get(self, key: str) -> dict[str, Any] | None: ...
+    async def resolve_many(self, resolved: dict[str, str]) -> list[str]: ...
 
     @abstractmethod
-    async def delete(self, key: str) -> None: ...
+    async def discard_many(self, request_ids: list[str]) -> None: ...
+
+    @abstractmethod
+    async def read_resolved(self, consumer: str, count: int, block_ms: int) -> list[tuple[str, str, bytes]]: ...
+
+    @abstractmethod
+    async def ack_resolved(self, entry_ids: list[str]) -> None: ...
 
 
 class RedisStorageRepository(AbstractStorageRepository):
-    def __init__(self, redis_client: Redis):
+    """Ожидающие проверки токена события во временных корзинах Redis.
+
+    Корзина — hash на bucket_seconds секунд: поле — request_id, значение —
+    события запроса в JSON. Корзина целиком истекает через expire после
+    своего окончания, поэтому неподтверждённые остатки удаляет сам Redis.
+    Подтверждённые события переносятся в stream и вычитываются оттуда
+    группой потребителей пачками через XREADGROUP. Записи, которые
+    потребитель взял и не подтвердил дольше claim_idle_ms, забирает
+    себе другой потребитель группы.
+    """
+
+    def __init__(
+        self,
+        redis_client: Redis,
+        prefix: str = "analytics:pending",
+        stream: str = "analytics:resolved",
+        group: str = "publisher",
+        bucket_seconds: int = 60,
+        stream_maxlen: int = 1_000_000,
+        claim_idle_ms: int = 60_000,
+    ):
         self._redis = redis_client
+        self._prefix = prefix
+        self._stream = stream
+        self._group = group
+        self._bucket_seconds = bucket_seconds
+        self._stream_maxlen = stream_maxlen
+        self._claim_idle_ms = claim_idle_ms
+        self._recovered: set[str] = set()
+        self._claim_cursor = "0-0"
+        self._next_claim_at = 0.0
+
+    def _bucket_key(self, request_id: str) -> str:
+        return f"{self._prefix}:{request_id.split('-', 1)[0]}"
+
+    def _group_by_bucket(self, request_ids: list[str]) -> dict[str, list[str]]:
+        buckets = defaultdict(list)
+        for request_id in request_ids:
+            buckets[self._bucket_key(request_id)].append(request_id)
+        return buckets
+
+    async def add_many(self, items: dict[str, bytes], expire: timedelta | None = None) -> None:
+        """Сохраняет пачку запросов одним конвейером без транзакции"""
+        buckets = self._group_by_bucket(list(items))
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for key, request_ids in buckets.items():
+                pipe.hset(key, mapping={request_id: items[request_id] for request_id in request_ids})
+                if expire is not None:
+                    bucket = int(key.rsplit(":", 1)[1])
+                    expire_at = (bucket + 1) * self._bucket_seconds + int(expire.total_seconds())
+                    pipe.expireat(key, expire_at)
+            await pipe.execute()
+
+    async def resolve_many(self, resolved: dict[str, str]) -> list[str]:
+        """Переносит события подтверждённых запросов в stream.
+
+        resolved — id пользователя по request_id. Возвращает request_id,
+        которые ещё ждали в корзинах; остальные уже обработаны или истекли.
+        """
+        buckets = self._group_by_bucket(list(resolved))
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for key, request_ids in buckets.items():
+                pipe.hmget(key, request_ids)
+            values = await pipe.execute()
+
+        found = []
+        async with self._redis.pipeline(transaction=True) as pipe:
+            for (key, request_ids), events in zip(buckets.items(), values):
+                for request_id, value in zip(request_ids, events):
+                    if value is None:
+                        continue
+                    found.append(request_id)
+                    pipe.xadd(
+                        self._stream,
+                        {"user_id": resolved[request_id], "events": value},
+                        maxlen=self._stream_maxlen,
+                        approximate=True,
+                    )
+                    pipe.hdel(key, request_id)
+            if found:
+                await pipe.execute()
+        return found
+
+    async def discard_many(self, request_ids: list[str]) -> None:
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for key, ids in self._group_by_bucket(request_ids).items():
+                pipe.hdel(key, *ids)
+            await pipe.execute()
+
+    async def _ensure_group(self) -> None:
+        try:
+            await self._redis.xgroup_create(self._stream, self._group, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def _claim_stale(self, consumer: str, count: int) -> list:
+        """Забирает записи, которые другие потребители давно не подтвердили.
+
+        Потребитель упавшего или перезапущенного процесса больше не
+        появится, поэтому его записи переходят к живому через XAUTOCLAIM.
+        Список ожидающих записей проходится по курсору; после полного
+        прохода следующий начинается не раньше чем через claim_idle_ms.
+        """
+        now = time.monotonic()
+        if now < self._next_claim_at:
+            return []
+        cursor, messages, *_ = await self._redis.xautoclaim(
+            self._stream, self._group, consumer, self._claim_idle_ms, start_id=self._claim_cursor, count=count
+        )
+        self._claim_cursor = cursor
+        if cursor in (b"0-0", "0-0"):
+            self._next_claim_at = now + self._claim_idle_ms / 1000
+        return [(entry_id, fields) for entry_id, fields in messages if entry_id is not None]
 
-    async def add(self, key: str, value: dict[str, Any], expire: timedelta | None = None) -> None:
-        await self._redis.set(name=key, value=json.dumps(value))
+    async def read_resolved(self, consumer: str, count: int, block_ms: int) -> list[tuple[str, str, bytes]]:
+        """Пачка подтверждённых событий: (id записи, id пользователя, события).
 
-    async def get(self, key: str) -> dict[str, Any] | None:
-        await self._redis.get(name=key)
+        Сначала дочитываются записи, выданные этому потребителю раньше и
+        не подтверждённые из-за падения, затем записи других потребителей,
+        простаивающие дольше claim_idle_ms, и только потом новые.
+        """
+        if consumer not in self._recovered:
+            await self._ensure_group()
+            entries = await self._redis.xreadgroup(self._group, consumer, {self._stream: "0"}, count=count)
+            if not entries or not entries[0][1]:
+                self._recovered.add(consumer)
+            messages = entries[0][1] if entries else []
+        else:
+            messages = await self._claim_stale(consumer, count)
+            if not messages:
+                entries = await self._redis.xreadgroup(
+                    self._group, consumer, {self._stream: ">"}, count=count, block=block_ms
+                )
+                messages = entries[0][1] if entries else []
+        result, deleted = [], []
+        for entry_id, fields in messages:
+            if not fields:
+                # Запись удалена из stream, но осталась выданной потребителю.
+                deleted.append(entry_id)
+                continue
+            result.append((entry_id, fields[b"user_id"].decode(), fields[b"events"]))
+        await self.ack_resolved(deleted)
+        return result
 
-    async def delete(self, key: str) -> None:
-        await self._redis.delete(key)
+    async def ack_resolved(self, entry_ids: list[str]) -> None:
+        if not entry_ids:
+            return
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.xack(self._stream, self._group, *entry_ids)
+            pipe.xdel(self._stream, *entry_ids)
+            await pipe.execute()
 
 
 def get_storage_repository(redis: Redis = Depends(get_redis)) -> AbstractStorageRepository:
-    return RedisStorageRepository(redis_client=redis)
+    return RedisStorageRepository(
+        redis_client=redis,
+        prefix=settings.redis.pending_prefix,
+        stream=settings.redis.resolved_stream,
+        bucket_seconds=settings.redis.pending_bucket_seconds,
+        claim_idle_ms=settings.redis.resolved_claim_idle_ms,
+    )
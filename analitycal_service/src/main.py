@@ -1,15 +1,21 @@
 import asyncio
 from contextlib import asynccontextmanager
+from datetime import timedelta
 
 from fastapi import FastAPI
 from fastapi.responses import ORJSONResponse
+from prometheus_client import make_asgi_app
 from redis.asyncio.client import Redis
 
 from src.db import redis
 from src.api.v1.event import route
 from src.core.config import settings
 from src.infrastructure import consumer, producer
+from src.infrastructure.storage import RedisStorageRepository
+from src.services import batcher, token
 from src.services.consumer_handlers import AuthConsumerHandler
+from src.services.event import EventPublisherService
+from src.services.resolved_drainer import ResolvedEventsDrainer
 
 
 @asynccontextmanager
@@ -18,6 +24,11 @@ async def lifespan(_: FastAPI):
         bootstrap_servers=settings.brocker.bootstrap_service,
         username=settings.brocker.kafka_username,
         password=settings.brocker.kafka_password,
+        security_protocol=settings.brocker.security_protocol,
+        profile=settings.brocker.producer_profile,
+        compression_type=settings.brocker.compression_type,
+        linger_ms=settings.brocker.linger_ms,
+        max_batch_size=settings.brocker.max_batch_size,
     )
     consumer.consumer = consumer.KafkaConsumerWrapper(
         bootstrap_servers=settings.brocker.bootstrap_service,
@@ -25,15 +36,55 @@ async def lifespan(_: FastAPI):
         password=settings.brocker.kafka_password,
         topics=settings.brocker.consumer_topics,
         group_id=settings.brocker.consumer_group_id,
+        security_protocol=settings.brocker.security_protocol,
+        max_records=settings.brocker.consumer_max_records,
+        concurrency=settings.brocker.consumer_concurrency,
+        max_retries=settings.brocker.consumer_max_retries,
+        retry_backoff=timedelta(milliseconds=settings.brocker.consumer_retry_backoff_ms),
+        max_backoff=timedelta(milliseconds=settings.brocker.consumer_max_backoff_ms),
+    )
+    redis.redis = Redis.from_url(settings.redis.redis_url)
+    storage = RedisStorageRepository(
+        redis_client=redis.redis,
+        prefix=settings.redis.pending_prefix,
+        stream=settings.redis.resolved_stream,
+        bucket_seconds=settings.redis.pending_bucket_seconds,
+        claim_idle_ms=settings.redis.resolved_claim_idle_ms,
+    )
+    publisher = EventPublisherService(producer=producer.producer)
+
+    if settings.auth.token_verification == "local":
+        token.verifier = token.TokenVerifier(key=settings.auth.jwt_key, algorithm=settings.auth.jwt_algorithm)
+
+    consumer.consumer.register_batch_handler(
+        settings.brocker.auth_topic_name, AuthConsumerHandler(storage=storage).handle_batch
     )
-    consumer.consumer.register_handler(settings.brocker.auth_topic_name, AuthConsumerHandler().handle)
     await producer.producer.start()
     task = asyncio.create_task(consumer.consumer.start())
 
-    redis.redis = Redis.from_url(settings.redis.redis_url)
+    batcher.batcher = batcher.EventBatcher(
+        storage=storage,
+        producer=producer.producer,
+        publisher=publisher,
+        topic=settings.brocker.auth_topic_name,
+        key=settings.brocker.auth_topic_key,
+        buffer_size=settings.batcher.buffer_size,
+        batch_size=settings.batcher.batch_size,
+        linger=timedelta(milliseconds=settings.batcher.linger_ms),
+        expire=timedelta(seconds=settings.batcher.pending_ttl),
+        retries=settings.batcher.flush_retries,
+        retry_delay=timedelta(milliseconds=settings.batcher.flush_retry_delay_ms),
+    )
+    await batcher.batcher.start()
+    drainer = ResolvedEventsDrainer(
+        storage=storage, publisher=publisher, batch_size=settings.redis.resolved_batch_size
+    )
+    await drainer.start()
 
     yield
 
+    await batcher.batcher.stop()
+    await drainer.stop()
     await producer.producer.stop()
     await consumer.consumer.stop()
     task.cancel()
@@ -52,6 +103,7 @@ app = FastAPI(
 
 
 app.include_router(router=route, prefix="/api/v1")
+app.mount("/metrics", make_asgi_app())
 
 
 if __name__ == "__main__":
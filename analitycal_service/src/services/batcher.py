@@ -0,0 +1,160 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any
+
+from pydantic import TypeAdapter
+
+from src.domain.entities import ClientEvent
+from src.infrastructure.producer import AbstractProducerBroker
+from src.infrastructure.storage import AbstractStorageRepository
+from src.services.event import AbstractEventPublisherService
+
+logger = logging.getLogger(__name__)
+
+client_events_adapter = TypeAdapter(list[ClientEvent])
+
+
+class BufferFullError(Exception):
+    """Буфер событий заполнен, запрос нужно отклонить."""
+
+
+@dataclass
+class PendingEvent:
+    """События одного запроса.
+
+    С сообщением message события ждут в Redis проверки общего токена,
+    без него токен уже проверен и события сразу публикуются. sent — сколько
+    уже отправлено: сообщение на проверку или события по порядку; повторная
+    запись пачки продолжает с этого места, не отправляя их второй раз.
+    """
+
+    request_id: str
+    events: list[ClientEvent]
+    message: dict[str, Any] | None = None
+    sent: int = 0
+
+
+class EventBatcher:
+    """Копит принятые события и пишет их в Redis и Kafka пачками.
+
+    Обработчик запроса только кладёт событие в ограниченную очередь.
+    Фоновая задача раз в linger забирает до batch_size событий. Проверенные
+    события публикуются в топик событий, остальные сохраняются одним
+    конвейером Redis, а сообщения на проверку токена уходят в продюсер,
+    который сам собирает их в пачки Kafka. Клиент получил ответ до записи,
+    поэтому неудачная запись пачки повторяется до retries раз с растущей
+    задержкой; пока пачка повторяется, буфер заполняется и новые запросы
+    получают 503.
+    """
+
+    def __init__(
+        self,
+        storage: AbstractStorageRepository,
+        producer: AbstractProducerBroker,
+        publisher: AbstractEventPublisherService,
+        topic: str,
+        key: str | None,
+        buffer_size: int,
+        batch_size: int,
+        linger: timedelta,
+        expire: timedelta | None = None,
+        retries: int = 5,
+        retry_delay: timedelta = timedelta(milliseconds=100),
+    ) -> None:
+        self._storage = storage
+        self._producer = producer
+        self._publisher = publisher
+        self._topic = topic
+        self._key = key
+        self._batch_size = batch_size
+        self._linger = linger.total_seconds()
+        self._expire = expire
+        self._retries = retries
+        self._retry_delay = retry_delay.total_seconds()
+        self._queue: asyncio.Queue[PendingEvent] = asyncio.Queue(maxsize=buffer_size)
+        self._task: asyncio.Task | None = None
+        self._closed = False
+
+    def submit(self, event: PendingEvent) -> None:
+        """Кладёт событие в буфер без ожидания"""
+        if self._closed:
+            raise BufferFullError
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            raise BufferFullError from None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Перестаёт принимать события и дожидается записи уже принятых"""
+        self._closed = True
+        await self._queue.join()
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _next_batch(self) -> list[PendingEvent]:
+        batch = [await self._queue.get()]
+        if self._linger:
+            await asyncio.sleep(self._linger)
+        while len(batch) < self._batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+
+    async def _flush(self, batch: list[PendingEvent]):
+        pending = [item for item in batch if item.message is not None and not item.sent]
+        if pending:
+            # События сохраняются раньше отправки токенов на проверку, иначе
+            # ответ сервиса авторизации может прийти раньше самого события.
+            await self._storage.add_many(
+                {item.request_id: client_events_adapter.dump_json(item.events) for item in pending},
+                expire=self._expire,
+            )
+            for item in pending:
+                await self._producer.send_message(topic=self._topic, value=item.message, key=self._key)
+                item.sent = 1
+        for item in batch:
+            if item.message is None:
+                for event in item.events[item.sent :]:
+                    await self._publisher.publish_client_event(event, key=str(event.user_id))
+                    item.sent += 1
+
+    async def _flush_with_retries(self, batch: list[PendingEvent]):
+        for attempt in range(self._retries + 1):
+            try:
+                await self._flush(batch)
+                return
+            except Exception:
+                if attempt == self._retries:
+                    logger.exception(
+                        "Не удалось записать пачку из %s событий за %s попыток", len(batch), attempt + 1
+                    )
+                    return
+                delay = self._retry_delay * 2**attempt
+                logger.warning(
+                    "Не удалось записать пачку из %s событий, повтор через %s с", len(batch), delay, exc_info=True
+                )
+                await asyncio.sleep(delay)
+
+    async def _run(self):
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._flush_with_retries(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+
+# Глобальный экземпляр — для внедрения DI
+batcher: EventBatcher | None = None
+
+
+def get_batcher() -> EventBatcher:
+    return batcher
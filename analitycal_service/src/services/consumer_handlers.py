@@ -2,7 +2,10 @@ import logging
 from abc import ABC, abstractmethod
 from typing import Any
 
+from aiokafka import ConsumerRecord
+
 from src.core.config import settings
+from src.infrastructure.storage import AbstractStorageRepository
 
 logger = logging.getLogger(__name__)
 
@@ -11,11 +14,59 @@ class AbstractConsumerHandler(ABC):
     @abstractmethod
     async def handle(self, topic: str, message: dict[str, Any], key: str | None = None) -> None: ...
 
+    async def handle_batch(self, topic: str, records: list[ConsumerRecord]) -> None:
+        """Пачка сообщений одного раздела; по умолчанию — по одному по порядку"""
+        for record in records:
+            await self.handle(topic, record.value, record.key)
+
 
 class AuthConsumerHandler(AbstractConsumerHandler):
+    """Разрешает события, ждущие в Redis ответа сервиса авторизации.
 
-    async def handle(self, topic, message, key: str | None = None):
-        logger.debug("Пришло сообщение из топика %s и ключем %s", topic, key)
+    Ответ приходит в auth_topic с ключом сервиса в виде
+    {"request_id": ..., "valid": bool, "user_id": ...}. Собственные запросы
+    на проверку в том же топике содержат token и пропускаются.
+    Подтверждённые события публикует ResolvedEventsDrainer.
+    """
+
+    def __init__(self, storage: AbstractStorageRepository) -> None:
+        self._storage = storage
+
+    @staticmethod
+    def _is_reply(message: Any, key: str | None) -> bool:
+        if not isinstance(message, dict):
+            return False
         if key is None or key != settings.brocker.auth_topic_key:
             logger.debug("Ключ топика не подходит")
-            return
+            return False
+        return "token" not in message and "request_id" in message
+
+    async def handle(self, topic, message, key: str | None = None):
+        logger.debug("Пришло сообщение из топика %s и ключем %s", topic, key)
+        if self._is_reply(message, key):
+            await self._resolve({message["request_id"]: message})
+
+    async def handle_batch(self, topic: str, records: list[ConsumerRecord]) -> None:
+        """Разрешает все ответы пачки одним обращением к Redis"""
+        replies = {
+            record.value["request_id"]: record.value for record in records if self._is_reply(record.value, record.key)
+        }
+        if replies:
+            await self._resolve(replies)
+
+    async def _resolve(self, replies: dict[str, dict[str, Any]]) -> None:
+        """Переносит подтверждённые события в поток на публикацию, остальные удаляет"""
+        resolved, rejected = {}, []
+        for request_id, message in replies.items():
+            user_id = message.get("user_id")
+            if message.get("valid") and user_id is not None:
+                resolved[request_id] = str(user_id)
+            else:
+                rejected.append(request_id)
+        if rejected:
+            logger.info("Токены %s запросов не прошли проверку, события отброшены", len(rejected))
+            await self._storage.discard_many(rejected)
+        if resolved:
+            found = await self._storage.resolve_many(resolved)
+            if len(found) < len(resolved):
+                logger.debug("События %s запросов уже обработаны или истекли", len(resolved) - len(found))
@@ -2,6 +2,9 @@ from abc import ABC, abstractmethod
 from typing import Any
 
 from fastapi import Depends
+from src.core.config import settings
+from src.domain.entities import ClientEvent
+from src.infrastructure.codec import ENCODERS
 from src.infrastructure.producer import AbstractProducerBroker, get_producer
 
 
@@ -12,6 +15,9 @@ class AbstractEventPublisherService(ABC):
     @abstractmethod
     async def handle_event_and_wait(self, topic: str, data: dict[str, Any], key: str | None = None) -> None: ...
 
+    @abstractmethod
+    async def publish_client_event(self, event: ClientEvent, key: str | None = None) -> None: ...
+
 
 class EventPublisherService(AbstractEventPublisherService):
     def __init__(self, producer: AbstractProducerBroker) -> None:
@@ -25,6 +31,13 @@ class EventPublisherService(AbstractEventPublisherService):
         """Публикация события с ожиданием подтверждения"""
         await self._producer.send_message_and_wait(topic=topic, value=data, key=key)
 
+    async def publish_client_event(self, event: ClientEvent, key: str | None = None) -> None:
+        """Публикация клиентского события в топик событий в настроенной кодировке"""
+        value, headers = ENCODERS[settings.brocker.event_encoding](event)
+        await self._producer.send_message(
+            topic=settings.brocker.producer_topic_name, value=value, key=key, headers=headers
+        )
+
 
 def get_event_service(producer: AbstractProducerBroker = Depends(get_producer)) -> AbstractEventPublisherService:
     """Провайдер зависимости."""
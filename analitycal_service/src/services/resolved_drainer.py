@@ -0,0 +1,60 @@
+import asyncio
+import logging
+import os
+import socket
+
+from src.infrastructure.storage import AbstractStorageRepository
+from src.services.batcher import client_events_adapter
+from src.services.event import AbstractEventPublisherService
+
+logger = logging.getLogger(__name__)
+
+
+class ResolvedEventsDrainer:
+    """Публикует события с подтверждённым токеном из Redis stream пачками.
+
+    Каждый процесс сервиса читает stream как отдельный потребитель одной
+    группы. Запись подтверждается в Redis только после передачи всех её
+    событий продюсеру. Записи упавшего процесса его потребитель уже не
+    дочитает, поэтому их забирает себе другой процесс (см. read_resolved).
+    """
+
+    def __init__(
+        self,
+        storage: AbstractStorageRepository,
+        publisher: AbstractEventPublisherService,
+        batch_size: int = 500,
+        block_ms: int = 1000,
+        consumer: str | None = None,
+    ) -> None:
+        self._storage = storage
+        self._publisher = publisher
+        self._batch_size = batch_size
+        self._block_ms = block_ms
+        self._consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+        self._task: asyncio.Task | None = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _drain(self) -> None:
+        entries = await self._storage.read_resolved(self._consumer, self._batch_size, self._block_ms)
+        for _, user_id, value in entries:
+            for event in client_events_adapter.validate_json(value):
+                event.user_id = user_id
+                await self._publisher.publish_client_event(event, key=user_id)
+        await self._storage.ack_resolved([entry_id for entry_id, _, _ in entries])
+
+    async def _run(self):
+        while True:
+            try:
+                await self._drain()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Не удалось опубликовать подтверждённые события")
+                await asyncio.sleep(1)
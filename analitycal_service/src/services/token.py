@@ -0,0 +1,54 @@
+import logging
+import time
+from functools import lru_cache
+
+import jwt
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidTokenError(Exception):
+    """Токен не прошёл проверку подписи или просрочен."""
+
+
+class TokenVerifier:
+    def __init__(self, key: str, algorithm: str, user_claim: str = "user_uuid", cache_size: int = 10000) -> None:
+        """
+        Проверяет access токены сервиса авторизации локально.
+
+        :param key: Секрет (HS*) или публичный ключ (RS*/ES*), читается один раз при старте.
+        :param algorithm: Алгоритм подписи токенов.
+        :param user_claim: Поле токена с идентификатором пользователя.
+        :param cache_size: Сколько проверенных токенов держать в памяти.
+        """
+        self._key = key
+        self._algorithms = [algorithm]
+        self._user_claim = user_claim
+        # Клиент шлёт много событий с одним токеном, поэтому результат
+        # разбора кэшируется, а срок действия проверяется при каждом вызове.
+        self._decode = lru_cache(maxsize=cache_size)(self._decode_token)
+
+    def _decode_token(self, token: str) -> tuple[str, float]:
+        try:
+            payload = jwt.decode(
+                jwt=token, key=self._key, algorithms=self._algorithms, options={"require": ["exp"]}
+            )
+            return str(payload[self._user_claim]), float(payload["exp"])
+        except (jwt.PyJWTError, KeyError, TypeError, ValueError) as e:
+            logger.debug("Токен не прошёл проверку: %s", e)
+            raise InvalidTokenError from None
+
+    def verify(self, token: str) -> str:
+        """Возвращает id пользователя из действующего токена"""
+        user_id, expires_at = self._decode(token)
+        if expires_at <= time.time():
+            raise InvalidTokenError
+        return user_id
+
+
+# Глобальный экземпляр — для внедрения DI
+verifier: TokenVerifier | None = None
+
+
+def get_token_verifier() -> TokenVerifier | None:
+    return verifier
@@ -0,0 +1,8 @@
+import os
+from pathlib import Path
+
+# Настройки и логирование сервиса читаются при импорте src.core.config.
+os.environ.setdefault("KAFKA_BOOTSTRAP_SERVERS", "localhost:9092")
+os.environ.setdefault("KAFKA_USERNAME", "pytest")
+os.environ.setdefault("KAFKA_PASSWORD", "pytest")
+Path("logs/analitycal_service").mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,90 @@
+from datetime import timedelta
+
+from src.domain.entities import ClientEvent
+from src.infrastructure.producer import AbstractProducerBroker
+from src.infrastructure.storage import AbstractStorageRepository
+from src.services.event import AbstractEventPublisherService
+
+
+class InMemoryProducer(AbstractProducerBroker):
+    """Продюсер без Kafka: считает отправленные сообщения и байты.
+
+    Первые failures отправок падают. При record=False сами сообщения не
+    сохраняются, чтобы долгий прогон бенчмарка не копил их в памяти.
+    """
+
+    def __init__(self, failures: int = 0, record: bool = True) -> None:
+        self.failures = failures
+        self.record = record
+        self.messages: dict[str, int] = {}
+        self.nbytes = 0
+        self.sent: list[tuple[str, dict | bytes]] = []
+
+    async def start(self): ...
+
+    async def stop(self): ...
+
+    async def send_message(
+        self, topic: str, value: dict | bytes, key: str | None = None, headers: list[tuple[str, bytes]] | None = None
+    ):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("Kafka недоступна")
+        self.messages[topic] = self.messages.get(topic, 0) + 1
+        if isinstance(value, bytes):
+            self.nbytes += len(value)
+        if self.record:
+            self.sent.append((topic, value))
+
+    async def send_message_and_wait(
+        self, topic: str, value: dict | bytes, key: str | None = None, headers: list[tuple[str, bytes]] | None = None
+    ):
+        await self.send_message(topic, value, key=key, headers=headers)
+
+
+class FakePublisher(AbstractEventPublisherService):
+    """Публикует события через продюсер, не кодируя их"""
+
+    def __init__(self, producer: InMemoryProducer) -> None:
+        self._producer = producer
+
+    async def handle_event(self, topic: str, data: dict, key: str | None = None) -> None: ...
+
+    async def handle_event_and_wait(self, topic: str, data: dict, key: str | None = None) -> None: ...
+
+    async def publish_client_event(self, event: ClientEvent, key: str | None = None) -> None:
+        await self._producer.send_message("event_topic", event.model_dump(mode="json"), key=key)
+
+
+class InMemoryStorage(AbstractStorageRepository):
+    """Хранилище ожидающих событий в словаре вместо Redis"""
+
+    def __init__(self) -> None:
+        self.pending: dict[str, bytes] = {}
+        self.resolved: list[tuple[str, str, bytes]] = []
+        self._next_id = 0
+
+    async def add_many(self, items: dict[str, bytes], expire: timedelta | None = None) -> None:
+        self.pending.update(items)
+
+    async def resolve_many(self, resolved: dict[str, str]) -> list[str]:
+        found = []
+        for request_id, user_id in resolved.items():
+            events = self.pending.pop(request_id, None)
+            if events is None:
+                continue
+            self._next_id += 1
+            self.resolved.append((f"{self._next_id}-0", user_id, events))
+            found.append(request_id)
+        return found
+
+    async def discard_many(self, request_ids: list[str]) -> None:
+        for request_id in request_ids:
+            self.pending.pop(request_id, None)
+
+    async def read_resolved(self, consumer: str, count: int, block_ms: int) -> list[tuple[str, str, bytes]]:
+        return self.resolved[:count]
+
+    async def ack_resolved(self, entry_ids: list[str]) -> None:
+        acked = set(entry_ids)
+        self.resolved = [entry for entry in self.resolved if entry[0] not in acked]
@@ -0,0 +1,66 @@
+from datetime import timedelta
+from uuid import uuid4
+
+import pytest
+
+from src.domain.entities import ClientEvent
+from src.services.batcher import EventBatcher, PendingEvent
+from tests.fakes import FakePublisher, InMemoryProducer, InMemoryStorage
+
+
+def make_event() -> ClientEvent:
+    return ClientEvent(
+        user_id=str(uuid4()),
+        user_ip="127.0.0.1",
+        user_agent="pytest",
+        event_type="video_progress",
+        payload={"video_id": "v1", "watched_seconds": 30},
+    )
+
+
+def make_batcher(producer: InMemoryProducer, storage: InMemoryStorage, retries: int) -> EventBatcher:
+    return EventBatcher(
+        storage=storage,
+        producer=producer,
+        publisher=FakePublisher(producer),
+        topic="auth_topic",
+        key="analytic_service",
+        buffer_size=100,
+        batch_size=10,
+        linger=timedelta(0),
+        retries=retries,
+        retry_delay=timedelta(0),
+    )
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_is_retried_without_duplicates():
+    producer = InMemoryProducer(failures=2)
+    storage = InMemoryStorage()
+    batcher = make_batcher(producer, storage, retries=3)
+    await batcher.start()
+
+    batcher.submit(PendingEvent(request_id="checked", events=[make_event(), make_event()]))
+    batcher.submit(
+        PendingEvent(request_id="pending", events=[make_event()], message={"request_id": "pending", "token": "t"})
+    )
+    await batcher.stop()
+
+    topics = [topic for topic, _ in producer.sent]
+    assert sorted(topics) == ["auth_topic", "event_topic", "event_topic"]
+    assert list(storage.pending) == ["pending"]
+
+
+@pytest.mark.asyncio
+async def test_batch_is_dropped_after_retries():
+    producer = InMemoryProducer(failures=3)
+    batcher = make_batcher(producer, InMemoryStorage(), retries=2)
+    await batcher.start()
+
+    batcher.submit(PendingEvent(request_id="lost", events=[make_event()]))
+    batcher.submit(PendingEvent(request_id="next", events=[make_event()]))
+    await batcher.stop()
+
+    # Пачка из обоих запросов отброшена после трёх попыток.
+    assert producer.sent == []
+    assert producer.failures == 0
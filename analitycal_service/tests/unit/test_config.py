@@ -0,0 +1,36 @@
+import pytest
+from pydantic import ValidationError
+
+from src.core.config import AuthSettings
+
+
+@pytest.fixture(autouse=True)
+def no_jwt_env(monkeypatch):
+    for name in ("TOKEN_VERIFICATION", "JWT_SECRET_KEY", "JWT_PUBLIC_KEY_FILE"):
+        monkeypatch.delenv(name, raising=False)
+
+
+def test_broker_verification_needs_no_key():
+    auth = AuthSettings(_env_file=None)
+
+    assert auth.token_verification == "broker"
+
+
+def test_local_verification_without_key_is_a_config_error(monkeypatch):
+    monkeypatch.setenv("TOKEN_VERIFICATION", "local")
+
+    with pytest.raises(ValidationError, match="JWT_SECRET_KEY или JWT_PUBLIC_KEY_FILE"):
+        AuthSettings(_env_file=None)
+
+
+def test_local_verification_reads_public_key_file(monkeypatch, tmp_path):
+    key_file = tmp_path / "jwt.pem"
+    key_file.write_text("public key")
+    monkeypatch.setenv("TOKEN_VERIFICATION", "local")
+    monkeypatch.setenv("JWT_PUBLIC_KEY_FILE", str(key_file))
+
+    assert AuthSettings(_env_file=None).jwt_key == "public key"
+
+    key_file.unlink()
+    with pytest.raises(ValidationError, match="JWT_PUBLIC_KEY_FILE не найден"):
+        AuthSettings(_env_file=None)
@@ -0,0 +1,100 @@
+from datetime import timedelta
+
+import pytest
+import pytest_asyncio
+from aiokafka import ConsumerRecord, TopicPartition
+
+from src.infrastructure.consumer import KafkaConsumerWrapper
+
+TP = TopicPartition("auth_topic", 0)
+
+
+class FakeConsumer:
+    def __init__(self) -> None:
+        self.seeks: list[tuple[TopicPartition, int]] = []
+        self.paused: set[TopicPartition] = set()
+        self.commits: list[dict[TopicPartition, int]] = []
+
+    def seek(self, tp: TopicPartition, offset: int) -> None:
+        self.seeks.append((tp, offset))
+
+    def pause(self, *partitions: TopicPartition) -> None:
+        self.paused.update(partitions)
+
+    def resume(self, *partitions: TopicPartition) -> None:
+        self.paused.difference_update(partitions)
+
+    def assignment(self) -> set[TopicPartition]:
+        return {TP}
+
+    async def commit(self, offsets: dict[TopicPartition, int]) -> None:
+        self.commits.append(offsets)
+
+
+def make_record(offset: int, value: dict) -> ConsumerRecord:
+    return ConsumerRecord(
+        topic=TP.topic,
+        partition=TP.partition,
+        offset=offset,
+        timestamp=0,
+        timestamp_type=0,
+        key="analytic_service",
+        value=value,
+        checksum=None,
+        serialized_key_size=-1,
+        serialized_value_size=-1,
+        headers=(),
+    )
+
+
+@pytest_asyncio.fixture
+async def consumer() -> KafkaConsumerWrapper:
+    wrapper = KafkaConsumerWrapper(
+        bootstrap_servers="localhost:9092",
+        username=None,
+        password=None,
+        topics=[TP.topic],
+        group_id="pytest",
+        max_retries=2,
+        retry_backoff=timedelta(0),
+    )
+    wrapper._consumer = FakeConsumer()
+    return wrapper
+
+
+@pytest.mark.asyncio
+async def test_bad_record_is_retried_with_pause_then_skipped(consumer):
+    handled = []
+
+    async def handler(topic, records):
+        if any(record.value.get("bad") for record in records):
+            raise ValueError("плохое сообщение")
+        handled.extend(record.offset for record in records)
+
+    consumer.register_batch_handler(TP.topic, handler)
+    records = [make_record(10, {}), make_record(11, {"bad": True}), make_record(12, {})]
+
+    for _ in range(2):
+        await consumer._process({TP: records})
+    assert consumer._consumer.seeks == [(TP, 10), (TP, 10)]
+    assert consumer._consumer.commits == []
+
+    await consumer._process({TP: records})
+
+    assert handled == [10, 12]
+    assert consumer._consumer.commits == [{TP: 13}]
+    assert consumer._failures == {}
+
+
+@pytest.mark.asyncio
+async def test_failed_partition_is_paused_until_backoff_expires(consumer):
+    async def handler(topic, records):
+        raise ValueError("Redis недоступен")
+
+    consumer.register_batch_handler(TP.topic, handler)
+    consumer._retry_backoff = 60
+
+    await consumer._process({TP: [make_record(10, {})]})
+
+    assert consumer._consumer.paused == {TP}
+    assert consumer._failures == {TP: 1}
@@ -0,0 +1,69 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.v1 import event
+from src.services.batcher import PendingEvent
+
+
+class RecordingBatcher:
+    def __init__(self) -> None:
+        self.submitted: list[PendingEvent] = []
+
+    def submit(self, pending: PendingEvent) -> None:
+        self.submitted.append(pending)
+
+
+@pytest.fixture
+def batcher(monkeypatch) -> RecordingBatcher:
+    batcher = RecordingBatcher()
+    monkeypatch.setattr("src.services.batcher.batcher", batcher)
+    monkeypatch.setattr("src.services.token.verifier", None)
+    return batcher
+
+
+@pytest.fixture
+def client(batcher) -> TestClient:
+    app = FastAPI()
+    app.include_router(event.route, prefix="/api/v1")
+    return TestClient(app)
+
+
+PROGRESS = {"event_type": "video_progress", "payload": {"video_id": "v1", "watched_seconds": 30}}
+CLICK = {"event_type": "click", "payload": {"item_id": "1", "item_type": "film"}}
+
+
+def test_batch_is_accepted(client, batcher):
+    response = client.post(
+        "/api/v1/events/batch",
+        json={"token": "t", "events": [PROGRESS, CLICK]},
+        headers={"user-agent": "pytest"},
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"ok": True, "accepted": 2}
+    [pending] = batcher.submitted
+    assert [e.payload.__class__.__name__ for e in pending.events] == ["VideoProgressPayload", "ClickPayload"]
+
+
+def test_payload_of_other_event_type_is_rejected(client, batcher):
+    mismatched = {"event_type": "click", "payload": PROGRESS["payload"]}
+
+    response = client.post(
+        "/api/v1/events/batch",
+        json={"token": "t", "events": [PROGRESS, mismatched]},
+        headers={"user-agent": "pytest"},
+    )
+
+    assert response.status_code == 422
+    assert batcher.submitted == []
+
+
+def test_missing_user_agent_is_rejected(client, batcher):
+    # TestClient по умолчанию представляется как testclient.
+    del client.headers["user-agent"]
+
+    response = client.post("/api/v1/events/batch", json={"token": "t", "events": [PROGRESS]})
+
+    assert response.status_code == 422
+    assert batcher.submitted == []
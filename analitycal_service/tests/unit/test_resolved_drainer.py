@@ -0,0 +1,50 @@
+from uuid import uuid4
+
+import pytest
+from fakeredis import FakeAsyncRedis, FakeServer
+
+from src.domain.entities import ClientEvent
+from src.infrastructure.storage import RedisStorageRepository
+from src.services.batcher import client_events_adapter
+from src.services.resolved_drainer import ResolvedEventsDrainer
+from tests.fakes import FakePublisher, InMemoryProducer
+
+
+def make_event() -> ClientEvent:
+    return ClientEvent(
+        user_id=str(uuid4()),
+        user_ip="127.0.0.1",
+        user_agent="pytest",
+        event_type="video_progress",
+        payload={"video_id": "v1", "watched_seconds": 30},
+    )
+
+
+def make_storage(server: FakeServer) -> RedisStorageRepository:
+    # У каждого процесса сервиса своё подключение к общему Redis.
+    return RedisStorageRepository(redis_client=FakeAsyncRedis(server=server), claim_idle_ms=0)
+
+
+@pytest.mark.asyncio
+async def test_entry_of_dead_consumer_is_published_by_another():
+    server = FakeServer()
+    storage = make_storage(server)
+    await storage.add_many({"1-request": client_events_adapter.dump_json([make_event()])})
+    await storage.resolve_many({"1-request": "user-1"})
+
+    # Потребитель A взял запись и упал, не подтвердив её. Первое чтение
+    # возвращает его собственные неподтверждённые записи — их ещё нет.
+    assert await storage.read_resolved("a", count=10, block_ms=10) == []
+    [(_, user_id, _)] = await storage.read_resolved("a", count=10, block_ms=10)
+    assert user_id == "user-1"
+
+    producer = InMemoryProducer()
+    drainer = ResolvedEventsDrainer(make_storage(server), FakePublisher(producer), block_ms=10, consumer="b")
+    for _ in range(2):
+        await drainer._drain()
+
+    assert [topic for topic, _ in producer.sent] == ["event_topic"]
+    assert producer.sent[0][1]["user_id"] == "user-1"
+    redis = FakeAsyncRedis(server=server)
+    assert (await redis.xpending("analytics:resolved", "publisher"))["pending"] == 0
+    assert await redis.xlen("analytics:resolved") == 0
@@ -2,10 +2,12 @@ from http import HTTPStatus
 import logging
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from src.core.auth import require_permissions
+from src.core.cursor import Cursor, InvalidCursorError, decode_cursor, encode_cursor
 from src.core.permissions import permissions
-from src.models.film import ResponseFilm
+from src.models.film import Film, ResponseFilm
+from src.services.db_managers import sort_values
 from src.services.film import FilmService, get_film_service
 from src.core.config import settings
 
@@ -13,6 +15,16 @@ router = APIRouter()
 
 logger = logging.getLogger(__name__)
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+CURSOR_DESCRIPTION = (
+    "Курсор следующей страницы из заголовка X-Next-Cursor; "
+    "с курсором параметр page не используется"
+)
+CONSISTENT_DESCRIPTION = (
+    "Листать снимок индекса (point in time), "
+    "чтобы изменения не сдвигали страницы"
+)
+
 
 def create_response_films(films: list) -> list[ResponseFilm]:
     """Вспомогательная функция для
@@ -31,8 +43,70 @@ def handle_no_films_error(films: list, query_params: dict):
         )
 
 
+async def get_films_page(
+    film_service: FilmService,
+    response: Response,
+    sort: str,
+    page_size: int,
+    page: int,
+    cursor: str | None,
+    consistent: bool,
+    query: str | None = None,
+) -> list[Film] | None:
+    """Страница фильмов по номеру или по курсору.
+
+    Неглубокие страницы по номеру берутся из кэша. Курсор следующей
+    страницы отдаётся в заголовке X-Next-Cursor в обоих режимах, так что
+    бесконечная прокрутка может начать с обычной страницы.
+    """
+    pit_id = None
+    if cursor is None and not consistent:
+        if page * page_size > settings.max_result_window:
+            raise HTTPException(
+                status_code=HTTPStatus.BAD_REQUEST,
+                detail="Page is too deep, use cursor from X-Next-Cursor",
+            )
+        if query is None:
+            films = await film_service.get_film_list(
+                sort=sort, page_size=page_size, page=page
+            )
+        else:
+            films = await film_service.get_films_by_query(
+                query=query, sort=sort, page_size=page_size, page=page
+            )
+        after = sort_values(films[-1].model_dump(), sort) if films else None
+    else:
+        search_after = None
+        if cursor is not None:
+            try:
+                position = decode_cursor(cursor, sort=sort, query=query)
+            except InvalidCursorError:
+                raise HTTPException(
+                    status_code=HTTPStatus.BAD_REQUEST, detail="Invalid cursor"
+                )
+            search_after, pit_id = position.after, position.pit_id
+        result = await film_service.get_films_after(
+            sort=sort,
+            page_size=page_size,
+            search_after=search_after,
+            pit_id=pit_id,
+            consistent=consistent,
+            query=query,
+        )
+        if result is None:
+            return None
+        films, after, pit_id = result
+
+    if films and len(films) == page_size and after is not None:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            Cursor(sort=sort, query=query, after=after, pit_id=pit_id)
+        )
+    return films
+
+
 @router.get("/", response_model=list[ResponseFilm])
 async def film_list(
+    response: Response,
     sort: str = Query(
         default="-imdb_rating",
         enum=["imdb_rating", "-imdb_rating"],
@@ -40,11 +114,15 @@ async def film_list(
     ),
     page_size: int = Query(default=50, ge=1, le=50, alias="page_size"),
     page: int = Query(default=1, ge=1),
+    cursor: str | None = Query(default=None, description=CURSOR_DESCRIPTION),
+    consistent: bool = Query(default=False, description=CONSISTENT_DESCRIPTION),
     film_service: FilmService = Depends(get_film_service),
     # perm: bool = Depends(require_permissions([permissions.films_can_view])),
 ) -> list[ResponseFilm]:
     """Получаем список фильмов с кэшированием"""
-    films = await film_service.get_film_list(sort=sort, page_size=page_size, page=page)
+    films = await get_films_page(
+        film_service, response, sort, page_size, page, cursor, consistent
+    )
     handle_no_films_error(films, {"sort": sort, "page_size": page_size, "page": page})
     return create_response_films(films)
 
@@ -68,6 +146,7 @@ async def film_details(
 
 @router.get("/search/", response_model=list[ResponseFilm])
 async def film_search(
+    response: Response,
     query: str = Query(..., alias="query"),
     sort: str = Query(
         default="-imdb_rating",
@@ -76,12 +155,14 @@ async def film_search(
     ),
     page_size: int = Query(default=50, gt=1, le=50, alias="page_size"),
     page: int = Query(default=1, ge=1, alias="page"),
+    cursor: str | None = Query(default=None, description=CURSOR_DESCRIPTION),
+    consistent: bool = Query(default=False, description=CONSISTENT_DESCRIPTION),
     film_service: FilmService = Depends(get_film_service),
     # perm: bool = Depends(require_permissions([permissions.films_can_view])),
 ) -> list[ResponseFilm | None]:
     """Поиск фильмов по запросу"""
-    films = await film_service.get_films_by_query(
-        query=query, sort=sort, page_size=page_size, page=page
+    films = await get_films_page(
+        film_service, response, sort, page_size, page, cursor, consistent, query
     )
     if not films:
         return []
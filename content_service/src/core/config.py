@@ -21,6 +21,55 @@ class Settings(BaseSettings):
     redis_port: int = Field(6379, validation_alias="REDIS_PORT")
     redis_password: SecretStr | None = Field(None, validation_alias="REDIS_PASSWORD")
 
+    # Кэш процесса перед Redis: число записей и время жизни (в секундах)
+    local_cache_size: int = Field(1024, validation_alias="LOCAL_CACHE_SIZE")
+    local_cache_ttl: float = Field(10, validation_alias="LOCAL_CACHE_TTL")
+    # Время жизни кэша по запросам (в секундах), переопределяется JSON-объектом
+    # в CACHE_TTL. Фильм по id кэшируется надолго: ETL сбрасывает изменённые
+    # фильмы через канал cache_invalidation_channel.
+    cache_ttl: dict[str, int] = Field(
+        {
+            "film": 3600,
+            "film_list": 60,
+            "film_search": 60,
+            "person_films": 300,
+            "person": 300,
+            "person_search": 60,
+            "person_list": 300,
+            "genre": 3600,
+            "genre_list": 3600,
+        },
+        validation_alias="CACHE_TTL",
+    )
+    cache_default_ttl: int = Field(60, validation_alias="CACHE_DEFAULT_TTL")
+    # Сколько ещё секунд списки отдаются устаревшими, пока обновляются в фоне
+    cache_stale_ttl: int = Field(600, validation_alias="CACHE_STALE_TTL")
+    # Прогрев кэша: первые страницы списка фильмов для каждой сортировки
+    # и весь список жанров, при старте и затем каждые interval секунд
+    cache_warm_pages: int = Field(5, validation_alias="CACHE_WARM_PAGES")
+    cache_warm_interval: int = Field(50, validation_alias="CACHE_WARM_INTERVAL")
+    cache_warm_film_page_size: int = Field(
+        50, validation_alias="CACHE_WARM_FILM_PAGE_SIZE"
+    )
+    cache_warm_genre_page_size: int = Field(
+        10, validation_alias="CACHE_WARM_GENRE_PAGE_SIZE"
+    )
+    # Значения больше этого размера (в байтах) хранятся в Redis сжатыми
+    cache_compress_min_size: int = Field(
+        4096, validation_alias="CACHE_COMPRESS_MIN_SIZE"
+    )
+    film_not_found_cache_ttl: int = Field(
+        60, validation_alias="FILM_NOT_FOUND_CACHE_TTL"
+    )
+    cache_invalidation_channel: str = Field(
+        "content:invalidate:movies", validation_alias="CACHE_INVALIDATION_CHANNEL"
+    )
+
+    # Глубже этого номера документа страницы отдаются только по курсору
+    max_result_window: int = Field(10000, validation_alias="MAX_RESULT_WINDOW")
+    # Сколько держать снимок индекса между запросами страниц
+    pit_keep_alive: str = Field("1m", validation_alias="PIT_KEEP_ALIVE")
+
     jwt_secret_key: str = Field("secret", validation_alias="SECRET_KEY")
     jwt_alg: str = Field("HS256", validation_alias="JWT_ALGORITHM")
 
@@ -36,6 +85,10 @@ class Settings(BaseSettings):
         """Формируем URL для подключения к Elasticsearch."""
         return f"http://{self.elastic_host}:{self.elastic_port}"
 
+    def get_cache_ttl(self, endpoint: str) -> int:
+        """Время жизни кэша для запроса."""
+        return self.cache_ttl.get(endpoint, self.cache_default_ttl)
+
     @property
     def redis_url(self) -> str:
         """Формируем URL для подключения к Redis"""
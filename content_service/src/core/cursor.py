@@ -0,0 +1,47 @@
+import base64
+import binascii
+from typing import Any
+
+import orjson
+from pydantic import BaseModel, ValidationError
+
+CURSOR_VERSION = 1
+
+
+class InvalidCursorError(Exception):
+    """Курсор повреждён или выдан для другого запроса."""
+
+
+class Cursor(BaseModel):
+    """Позиция в выдаче: значения сортировки последнего документа и снимок индекса."""
+
+    version: int = CURSOR_VERSION
+    sort: str | None = None
+    query: str | None = None
+    after: list[Any]
+    pit_id: str | None = None
+
+
+def encode_cursor(cursor: Cursor) -> str:
+    """Непрозрачная для клиента строка курсора."""
+    data = orjson.dumps(cursor.model_dump(exclude_none=True))
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def decode_cursor(value: str, sort: str | None, query: str | None = None) -> Cursor:
+    """
+    Разбирает курсор и проверяет, что он выдан для того же запроса.
+    :raises InvalidCursorError: Курсор не удалось разобрать или он от другого запроса.
+    """
+    try:
+        padded = value + "=" * (-len(value) % 4)
+        cursor = Cursor(**orjson.loads(base64.urlsafe_b64decode(padded)))
+    except (binascii.Error, ValueError, TypeError, ValidationError):
+        raise InvalidCursorError from None
+    if (
+        cursor.version != CURSOR_VERSION
+        or cursor.sort != sort
+        or cursor.query != query
+    ):
+        raise InvalidCursorError
+    return cursor
@@ -1,3 +1,4 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 from elasticsearch import AsyncElasticsearch
@@ -8,6 +9,10 @@ from src.api.v1 import films, genres, persons
 from src.core.config import settings
 from src.core.middlewares import RateLimiterMiddleware
 from src.db import elastic, redis
+from src.services.cache_invalidation import listen_invalidations
+from src.services.cache_warmer import CacheWarmer
+from src.services.film import get_film_service
+from src.services.genres import get_genre_service
 from fastapi.middleware.cors import CORSMiddleware
 
 
@@ -15,9 +20,30 @@ from fastapi.middleware.cors import CORSMiddleware
 async def lifespan(_: FastAPI):
     redis.redis = Redis(host=settings.redis_host, port=settings.redis_port)
     elastic.es = AsyncElasticsearch(hosts=[settings.elastic_url])
+    # Тот же экземпляр сервиса, что получают обработчики через Depends.
+    film_service = get_film_service(elastic=elastic.es, redis=redis.redis)
+    invalidation = asyncio.create_task(
+        listen_invalidations(
+            redis.redis,
+            settings.cache_invalidation_channel,
+            film_service.forget_films,
+        )
+    )
+
+    warmer = CacheWarmer(
+        film_service=film_service,
+        genre_service=get_genre_service(redis=redis.redis, elastic=elastic.es),
+        pages=settings.cache_warm_pages,
+        film_page_size=settings.cache_warm_film_page_size,
+        genre_page_size=settings.cache_warm_genre_page_size,
+        interval=settings.cache_warm_interval,
+    )
+    warming = asyncio.create_task(warmer.run())
 
     yield
 
+    warming.cancel()
+    invalidation.cancel()
     # Закрытие соединений при завершении работы
     await redis.redis.close()
     await elastic.es.close()
@@ -56,6 +82,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 app.include_router(films.router, prefix="/api/v1/films", tags=["films"])
@@ -0,0 +1,46 @@
+import asyncio
+import json
+import logging
+from typing import Awaitable, Callable
+
+from redis.asyncio import Redis
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+logger = logging.getLogger(__name__)
+
+
+async def listen_invalidations(
+    redis: Redis,
+    channel: str,
+    handler: Callable[[list[str]], Awaitable[None]],
+    retry_delay: float = 1,
+) -> None:
+    """
+    Слушает канал сброса кэша и передаёт пришедшие id в handler.
+    :param redis: Клиент Redis.
+    :param channel: Канал, в который ETL публикует id изменённых документов.
+    :param handler: Обработчик списка id.
+    :param retry_delay: Пауза перед переподключением (в секундах).
+    """
+    while True:
+        pubsub = redis.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(channel)
+            async for message in pubsub.listen():
+                try:
+                    ids = json.loads(message["data"])
+                except ValueError:
+                    logger.warning(
+                        "Некорректное сообщение в канале %s: %s",
+                        channel,
+                        message["data"],
+                    )
+                    continue
+                await handler(ids)
+        except RedisConnectionError as e:
+            logger.warning(
+                "Потеряно подключение к каналу %s: %s", channel, e
+            )
+            await asyncio.sleep(retry_delay)
+        finally:
+            await pubsub.aclose()
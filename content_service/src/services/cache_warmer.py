@@ -0,0 +1,61 @@
+import asyncio
+import logging
+
+from src.services.film import FilmService
+from src.services.genres import GenreService
+
+logger = logging.getLogger(__name__)
+
+# Сортировки списка фильмов, доступные в /api/v1/films/.
+FILM_SORTS = ("-imdb_rating", "imdb_rating")
+
+
+class CacheWarmer:
+    """
+    Прогревает кэш главных страниц: первые страницы списка фильмов
+    для каждой сортировки и весь список жанров.
+    Запросы идут через сервисы с теми же параметрами, что и от API,
+    поэтому отсутствующие страницы загружаются, а устаревшие
+    обновляются в фоне до того, как их запросит пользователь.
+    """
+
+    def __init__(
+        self,
+        film_service: FilmService,
+        genre_service: GenreService,
+        pages: int = 5,
+        film_page_size: int = 50,
+        genre_page_size: int = 10,
+        interval: float = 50,
+    ):
+        self.film_service = film_service
+        self.genre_service = genre_service
+        self.pages = pages
+        self.film_page_size = film_page_size
+        self.genre_page_size = genre_page_size
+        self.interval = interval
+
+    async def warm(self) -> None:
+        """Один проход прогрева."""
+        for sort in FILM_SORTS:
+            for page in range(1, self.pages + 1):
+                films = await self.film_service.get_film_list(
+                    sort=sort, page_size=self.film_page_size, page=page
+                )
+                if not films:
+                    break
+        page = 1
+        # Параметры совпадают с запросом списка жанров из API.
+        while await self.genre_service.get_all_genres(
+            sort=None, page_size=self.genre_page_size, page=page
+        ):
+            page += 1
+
+    async def run(self) -> None:
+        """Прогревает кэш при старте и затем каждые interval секунд."""
+        while True:
+            try:
+                await self.warm()
+            except Exception as e:
+                logger.error("Ошибка прогрева кэша: {}".format(e))
+            await asyncio.sleep(self.interval)
@@ -9,6 +9,30 @@ from elasticsearch_dsl import AsyncSearch, Q
 
 logger = logging.getLogger(__name__)
 
+# Последнее поле сортировки: делает порядок однозначным при равных
+# значениях, без чего search_after может пропускать или повторять документы.
+TIEBREAK_FIELD = "id"
+
+
+def sort_fields(sort: str | None) -> list[str]:
+    """Поля сортировки с направлением ('-' — по убыванию) и полем-тайбрейком."""
+    fields = sort.split(",") if sort else []
+    if TIEBREAK_FIELD not in (field.lstrip("-") for field in fields):
+        fields.append(TIEBREAK_FIELD)
+    return fields
+
+
+def sort_values(document: dict[str, Any], sort: str | None) -> list | None:
+    """
+    Значения сортировки документа для search_after.
+    Позволяют продолжить выдачу после документа из обычной страницы.
+    :return: Список значений или None, если у документа нет какого-то поля.
+    """
+    values = [document.get(field.lstrip("-")) for field in sort_fields(sort)]
+    if any(value is None for value in values):
+        return None
+    return values
+
 
 class DBManager(ABC):
     """Абстрактный класс для управления базой данных."""
@@ -18,8 +42,14 @@ class DBManager(ABC):
         self.db_name = db_name
 
     @abstractmethod
-    async def get_object_by_id(self, object_id: str) -> dict[str, Any] | None:
-        """Получение объекта по ID."""
+    async def get_object_by_id(
+        self, object_id: str, raise_on_error: bool = False
+    ) -> dict[str, Any] | None:
+        """Получение объекта по ID.
+
+        None означает, что объекта нет; с raise_on_error прочие ошибки
+        пробрасываются, чтобы их нельзя было принять за отсутствие объекта.
+        """
 
     @abstractmethod
     async def get_objects_by_query(
@@ -34,16 +64,40 @@ class DBManager(ABC):
     ) -> list[dict[str, Any]]:
         """Получение объектов по запросу."""
 
+    @abstractmethod
+    async def get_objects_after(
+        self,
+        query: str | None = None,
+        fields: list[str] | None = None,
+        sort: str | None = "-imdb_rating",
+        page_size: int = 10,
+        search_after: list | None = None,
+        pit_id: str | None = None,
+    ) -> tuple[list[dict[str, Any]], list | None, str | None] | None:
+        """Получение страницы объектов после указанной позиции сортировки."""
+
+    @abstractmethod
+    async def open_point_in_time(self) -> str | None:
+        """Открытие снимка индекса для согласованного листания."""
+
 
 class ElasticManager(DBManager):
     """Класс для управления Elasticsearch."""
 
-    def __init__(self, es_client: AsyncElasticsearch, index_name: str):
+    def __init__(
+        self,
+        es_client: AsyncElasticsearch,
+        index_name: str,
+        pit_keep_alive: str = "1m",
+    ):
         super().__init__(es_client, index_name)
         self.es_client = es_client
         self.index_name = index_name
+        self.pit_keep_alive = pit_keep_alive
 
-    async def get_object_by_id(self, object_id: str) -> dict[str, Any] | None:
+    async def get_object_by_id(
+        self, object_id: str, raise_on_error: bool = False
+    ) -> dict[str, Any] | None:
         """Получение объекта из Elasticsearch по ID."""
         try:
             doc = await self.es_client.get(index=self.index_name, id=object_id)
@@ -58,11 +112,15 @@ class ElasticManager(DBManager):
                     object_id, e
                 )
             )
+            if raise_on_error:
+                raise
             return None
         except Exception as e:
             logger.exception(
                 "Неизвестная ошибка при поиске ID {}: {}".format(object_id, e)
             )
+            if raise_on_error:
+                raise
             return None
 
     async def get_objects_by_query(
@@ -114,6 +172,76 @@ class ElasticManager(DBManager):
             )
             return None
 
+    async def get_objects_after(
+        self,
+        query: str | None = None,
+        fields: list[str] | None = None,
+        sort: str | None = "-imdb_rating",
+        page_size: int = 10,
+        search_after: list | None = None,
+        pit_id: str | None = None,
+    ) -> tuple[list[dict[str, Any]], list | None, str | None] | None:
+        """
+        Получение страницы объектов через search_after.
+
+        В отличие от from/size стоимость не растёт с глубиной страницы
+        и нет ограничения index.max_result_window.
+
+        :param search_after: Значения сортировки последнего документа предыдущей страницы.
+        :param pit_id: Снимок индекса; если он истёк, поиск идёт по текущему индексу.
+        :return: Документы, значения сортировки последнего из них и id снимка.
+        """
+        try:
+            search = await self._generate_query(
+                query=query,
+                fields=fields,
+                sort=sort,
+                page_size=page_size,
+                search_after=search_after,
+                pit_id=pit_id,
+            )
+            try:
+                response = await search.execute()
+            except NotFoundError:
+                if pit_id is None:
+                    raise
+                logger.warning("Снимок индекса %s истёк, поиск без него.", self.index_name)
+                return await self.get_objects_after(
+                    query=query,
+                    fields=fields,
+                    sort=sort,
+                    page_size=page_size,
+                    search_after=search_after,
+                )
+            hits = list(response)
+            documents = [hit.to_dict() for hit in hits]
+            last_sort = list(hits[-1].meta.sort) if hits else None
+            return documents, last_sort, getattr(response, "pit_id", None)
+        except ESConnectionError as e:
+            logger.error(
+                "Ошибка подключения к Elasticsearch при выполнении запроса: %s",
+                e,
+            )
+            return None
+        except Exception as e:
+            logger.exception(
+                "Неизвестная ошибка при выполнении запроса: %s", e
+            )
+            return None
+
+    async def open_point_in_time(self) -> str | None:
+        """Открытие снимка индекса на pit_keep_alive."""
+        try:
+            response = await self.es_client.open_point_in_time(
+                index=self.index_name, keep_alive=self.pit_keep_alive
+            )
+            return response["id"]
+        except Exception as e:
+            logger.error(
+                "Не удалось открыть снимок индекса %s: %s", self.index_name, e
+            )
+            return None
+
     async def _generate_query(
         self,
         query: str | None = None,
@@ -123,6 +251,8 @@ class ElasticManager(DBManager):
         sort: str = "-imdb_rating",
         page_size: int = 10,
         page: int = 1,
+        search_after: list | None = None,
+        pit_id: str | None = None,
     ) -> AsyncSearch:
         """
         Генерация запроса для Elasticsearch с учетом поисковой фразы, полей, вложенных фильтров, сортировки и пагинации.
@@ -134,9 +264,15 @@ class ElasticManager(DBManager):
         :param sort: Поле для сортировки с направлением (например, '-imdb_rating').
         :param page_size: Количество записей на странице.
         :param page: Номер страницы.
+        :param search_after: Значения сортировки, после которых начинается страница; вместо page.
+        :param pit_id: Снимок индекса, в котором выполняется поиск.
         :return: Сгенерированный объект запроса AsyncSearch.
         """
-        search = AsyncSearch(using=self.es_client, index=self.index_name)
+        cursor_mode = search_after is not None or pit_id is not None
+        # Поиск в снимке не указывает индекс: он задан при открытии снимка.
+        search = AsyncSearch(
+            using=self.es_client, index=None if pit_id else self.index_name
+        )
 
         # Основной запрос
         if query and fields:
@@ -168,12 +304,24 @@ class ElasticManager(DBManager):
                 nested_filters,
             )
 
-        if sort is not None:
-            for sort_field in sort.split(","):
+        if sort is not None or cursor_mode:
+            # sort() заменяет прежнюю сортировку, поэтому поля передаются разом.
+            keys = []
+            for sort_field in sort_fields(sort):
                 field = sort_field.lstrip("-")
                 order = "desc" if sort_field.startswith("-") else "asc"
-                search = search.sort({field: {"order": order}})
+                keys.append({field: {"order": order}})
                 logger.debug("Добавлена сортировка: %s (%s).", field, order)
+            search = search.sort(*keys)
+
+        if not cursor_mode:
+            return search[(page - 1) * page_size: page * page_size]
 
-        search = search[(page - 1) * page_size: page * page_size]
+        search = search.extra(size=page_size)
+        if search_after is not None:
+            search = search.extra(search_after=search_after)
+        if pit_id is not None:
+            search = search.extra(
+                pit={"id": pit_id, "keep_alive": self.pit_keep_alive}
+            )
         return search
@@ -4,15 +4,19 @@ from functools import lru_cache
 from elasticsearch import AsyncElasticsearch
 from fastapi import Depends
 from redis.asyncio import Redis
+from src.core.config import settings
 from src.db.elastic import get_elastic
 from src.db.redis import get_redis
 from src.models.film import Film
 from src.models.person import ShortFilm
 from src.services.db_managers import DBManager, ElasticManager
-from src.services.redis_service import AbstractCache, RedisCache
+from src.services.local_cache import make_layered_cache
+from src.services.redis_service import AbstractCache
 
 logger = logging.getLogger(__name__)
 
+FILM_SEARCH_FIELDS = ["title", "description"]
+
 
 class FilmService:
     def __init__(self, cache_manager: AbstractCache, db_manager: DBManager):
@@ -25,35 +29,50 @@ class FilmService:
         page_size: int = 10,
         page: int = 1,
     ) -> list[Film] | None:
-        """Получаем список фильмов, кэшируем результаты."""
+        """Получаем список фильмов, кэшируем результаты.
 
-        key = self.cache_manager.get_query_key(sort, page_size, page)
-        films_list = await self.cache_manager.get_object(object_key=key)
-        if films_list is None:
-            films_list = await self.db_manager.get_objects_by_query(
+        Устаревшая страница отдаётся сразу и обновляется в фоне.
+        """
+
+        async def load():
+            films = await self.db_manager.get_objects_by_query(
                 sort=sort, page_size=page_size, page=page
             )
-            if not films_list:
-                return None
-            await self.cache_manager.set_object(object_key=key, value=films_list)
+            return films or None
+
+        key = self.cache_manager.get_query_key(
+            "film_list", sort=sort, page_size=page_size, page=page
+        )
+        ttl = settings.get_cache_ttl("film_list")
+        films_list = await self.cache_manager.get_or_load(
+            key, load, expire=ttl + settings.cache_stale_ttl, soft_expire=ttl
+        )
+        if films_list is None:
+            return None
         return [Film(**film) for film in films_list]
 
     async def get_by_id(self, film_id: str) -> Film | None:
-        """Получаем фильм по ID с кэшированием."""
+        """Получаем фильм по ID с кэшированием, в том числе отсутствующий."""
         try:
-            # film = await self.cache_manager.get_object(object_key=film_id)
-            film = None
+            film = await self.cache_manager.get_or_load(
+                self.cache_manager.get_object_key(film_id),
+                lambda: self.db_manager.get_object_by_id(
+                    film_id, raise_on_error=True
+                ),
+                expire=settings.get_cache_ttl("film"),
+                negative_expire=settings.film_not_found_cache_ttl,
+            )
             if film is None:
-                film = await self.db_manager.get_object_by_id(film_id)
-                # if film is None:
-                #     return None
-                # else:
-                #     await self.cache_manager.set_object(object_key=film_id, value=film)
-                logger.info(f"{film=}")
+                return None
             return Film(**film)
         except Exception as e:
             logger.error(e)
 
+    async def forget_films(self, film_ids: list[str]) -> None:
+        """Сбрасывает кэш фильмов, переиндексированных ETL."""
+        for film_id in film_ids:
+            self.cache_manager.forget(self.cache_manager.get_object_key(film_id))
+
     async def get_films_by_query(
         self,
         query: str,
@@ -62,45 +81,78 @@ class FilmService:
         page: int = 1,
     ) -> list[Film] | None:
         """Получаем фильмы по запросу."""
-        search_fields = ["title", "description"]
-        key = self.cache_manager.get_query_key(query, sort, page_size, page)
-        films_by_query = await self.cache_manager.get_object(object_key=key)
-        if films_by_query is None:
-            films_by_query = await self.db_manager.get_objects_by_query(
+        key = self.cache_manager.get_query_key(
+            "film_search",
+            query=query,
+            sort=sort,
+            page_size=page_size,
+            page=page,
+        )
+        films_by_query = await self.cache_manager.get_or_load(
+            key,
+            lambda: self.db_manager.get_objects_by_query(
                 query=query,
-                fields=search_fields,
+                fields=FILM_SEARCH_FIELDS,
                 sort=sort,
                 page_size=page_size,
                 page=page,
-            )
-            if films_by_query is None:
-                return None
-            else:
-                await self.cache_manager.set_object(
-                    object_key=key, value=films_by_query
-                )
+            ),
+            expire=settings.get_cache_ttl("film_search"),
+        )
+        if films_by_query is None:
+            return None
         return [Film(**film) for film in films_by_query]
 
+    async def get_films_after(
+        self,
+        sort: str = "-imdb_rating",
+        page_size: int = 10,
+        search_after: list | None = None,
+        pit_id: str | None = None,
+        consistent: bool = False,
+        query: str | None = None,
+    ) -> tuple[list[Film], list | None, str | None] | None:
+        """Получаем страницу фильмов после позиции курсора, без кэша.
+
+        С consistent листание идёт по снимку индекса, который открывается
+        на первой странице и передаётся дальше в курсоре.
+        """
+        if consistent and pit_id is None:
+            pit_id = await self.db_manager.open_point_in_time()
+        result = await self.db_manager.get_objects_after(
+            query=query,
+            fields=FILM_SEARCH_FIELDS if query else None,
+            sort=sort,
+            page_size=page_size,
+            search_after=search_after,
+            pit_id=pit_id,
+        )
+        if result is None:
+            return None
+        films, last_sort, pit_id = result
+        return [Film(**film) for film in films], last_sort, pit_id
+
     async def get_person_films(
         self, person_id: str, nested_filters: list[str]
     ) -> list[ShortFilm] | None:
         """Получает все фильмы персоны по id"""
 
-        person_films_key = self.cache_manager.get_query_key(person_id, nested_filters)
-        person_films = await self.cache_manager.get_object(object_key=person_films_key)
-        if person_films is None:
-            person_films = await self.db_manager.get_objects_by_query(
+        person_films_key = self.cache_manager.get_query_key(
+            "person_films", person_id=person_id, nested_filters=nested_filters
+        )
+        person_films = await self.cache_manager.get_or_load(
+            person_films_key,
+            lambda: self.db_manager.get_objects_by_query(
                 person_uuid=person_id, nested_filters=nested_filters
+            ),
+            expire=settings.get_cache_ttl("person_films"),
+        )
+        if person_films is None:
+            logger.warning(
+                "Не найдено фильмов персоны по запросу: %s",
+                person_films_key,
             )
-            if person_films is None:
-                logger.warning(
-                    "Не найдено фильмов персоны по запросу: %s",
-                    person_films_key,
-                )
-                return None
-            await self.cache_manager.set_object(
-                object_key=person_films_key, value=person_films
-            )
+            return None
         return [ShortFilm(**person_film) for person_film in person_films]
 
 
@@ -109,6 +161,7 @@ def get_film_service(
     elastic: AsyncElasticsearch = Depends(get_elastic),
     redis: Redis = Depends(get_redis),
 ) -> FilmService:
-    elastic_manager = ElasticManager(elastic, "movies")
-    redis_manager = RedisCache(redis_client=redis)
-    return FilmService(cache_manager=redis_manager, db_manager=elastic_manager)
+    elastic_manager = ElasticManager(
+        elastic, "movies", pit_keep_alive=settings.pit_keep_alive
+    )
+    return FilmService(cache_manager=make_layered_cache(redis, "movies"), db_manager=elastic_manager)
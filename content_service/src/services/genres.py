@@ -5,11 +5,13 @@ from uuid import UUID
 from elasticsearch import AsyncElasticsearch
 from fastapi import Depends
 from redis.asyncio import Redis
+from src.core.config import settings
 from src.db.elastic import get_elastic
 from src.db.redis import get_redis
 from src.models.genre import Genre
 from src.services.db_managers import DBManager, ElasticManager
-from src.services.redis_service import AbstractCache, RedisCache
+from src.services.local_cache import make_layered_cache
+from src.services.redis_service import AbstractCache
 
 logger = logging.getLogger(__name__)
 
@@ -20,35 +22,39 @@ class GenreService:
         self.db_client = db_client
 
     async def get_by_id(self, genre_id: UUID) -> Genre | None:
-        genre_key = self.redis.get_query_key(genre_id)
-        genre = await self.redis.get_object(genre_key)
+        genre_key = self.redis.get_object_key(genre_id)
+        genre = await self.redis.get_or_load(
+            genre_key,
+            lambda: self.db_client.get_object_by_id(genre_id),
+            expire=settings.get_cache_ttl("genre"),
+        )
         if genre is None:
-            genre = await self.db_client.get_object_by_id(genre_id)
-            if genre is None:
-                logger.warning("Не найден фильм с id %s.", genre_id)
-                return None
-            await self.redis.set_object(object_key=genre_key, value=genre)
+            logger.warning("Не найден фильм с id %s.", genre_id)
+            return None
         return Genre(**genre)
 
     async def get_all_genres(
         self, sort: str | None = "-name", page: int = 1, page_size: int = 10
     ) -> list[Genre]:
+        """Страница жанров; устаревшая отдаётся сразу и обновляется в фоне."""
         genres_key = self.redis.get_query_key(
-            sort=sort, page_size=page_size, page=page
+            "genre_list", sort=sort, page_size=page_size, page=page
         )
-        genres = await self.redis.get_object(object_key=genres_key)
-        if genres is None:
-            genres = await self.db_client.get_objects_by_query(
+        ttl = settings.get_cache_ttl("genre_list")
+        genres = await self.redis.get_or_load(
+            genres_key,
+            lambda: self.db_client.get_objects_by_query(
                 sort=sort, page_size=page_size, page=page
+            ),
+            expire=ttl + settings.cache_stale_ttl,
+            soft_expire=ttl,
+        )
+        if genres is None:
+            logger.warning(
+                "Не найдено данных при запросе с параметрами: %s.",
+                genres_key,
             )
-
-            if genres is None:
-                logger.warning(
-                    "Не найдено данных при запросе с параметрами: %s.",
-                    genres_key,
-                )
-                return None
-            await self.redis.set_object(object_key=genres_key, value=genres)
+            return None
         return genres
 
 
@@ -57,6 +63,6 @@ def get_genre_service(
     redis: Redis = Depends(get_redis),
     elastic: AsyncElasticsearch = Depends(get_elastic),
 ) -> GenreService:
-    redis_client = RedisCache(redis_client=redis)
+    redis_client = make_layered_cache(redis, "genres")
     elastic_manager = ElasticManager(es_client=elastic, index_name="genres")
     return GenreService(redis_client, elastic_manager)
@@ -0,0 +1,172 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+from redis.asyncio import Redis
+from src.core.config import settings
+from src.services.redis_service import AbstractCache, RedisCache
+
+logger = logging.getLogger(__name__)
+
+
+class LocalCache:
+    """
+    Ограниченный LRU-кэш процесса с временем жизни записей.
+    Хранит уже разобранные объекты, поэтому попадание не требует ни сети, ни json.loads.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 10):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._items: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: str) -> Any | None:
+        item = self._items.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._items[key]
+            return None
+        self._items.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        self._items[key] = (time.monotonic() + ttl, value)
+        self._items.move_to_end(key)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        self._items.pop(key, None)
+
+
+class LayeredCache(AbstractCache):
+    """
+    Двухуровневый кэш: LRU процесса перед общим кэшем в Redis.
+    При промахе по ключу в базу идёт только одна корутина,
+    остальные запросы того же ключа ждут её результата.
+    """
+
+    def __init__(self, shared: AbstractCache, local: LocalCache):
+        super().__init__(shared.redis_client)
+        self.shared = shared
+        self.local = local
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    async def get_object(self, object_key: str) -> Any | None:
+        """
+        Получить объект из кэша процесса, а при промахе — из Redis.
+        :param object_key: Ключ объекта.
+        :return: Объект или None, если ключ не найден.
+        """
+        entry = self.local.get(object_key)
+        if entry is None:
+            entry = await self.shared.get_object(object_key)
+            if entry is not None:
+                self._remember(object_key, entry, self.local.ttl)
+        return entry
+
+    async def set_object(
+        self,
+        object_key: str,
+        value: dict[str, Any] | list[dict[str, Any]],
+        expire: int = 60,
+    ) -> None:
+        """
+        Сохранить объект в оба уровня кэша.
+        :param object_key: Ключ объекта.
+        :param value: Сохраняемое значение.
+        :param expire: Время жизни кэша в Redis (в секундах).
+        """
+        self._remember(object_key, value, expire)
+        await self.shared.set_object(object_key, value, expire=expire)
+
+    def _remember(
+        self, object_key: str, entry: dict[str, Any], ttl: float
+    ) -> None:
+        # В кэше процесса запись живёт только пока свежая: устаревшую
+        # обновляет одна фоновая задача, а не каждый воркер по очереди.
+        if entry["fresh_until"] is not None:
+            ttl = min(ttl, entry["fresh_until"] - time.time())
+        if ttl > 0:
+            self.local.set(object_key, entry, ttl=ttl)
+
+    def forget(self, object_key: str) -> None:
+        """
+        Удалить объект только из кэша процесса.
+        Новые запросы не присоединяются к загрузке, начатой до сброса.
+        :param object_key: Ключ объекта.
+        """
+        super().forget(object_key)
+        self.local.delete(object_key)
+        self._inflight.pop(object_key, None)
+
+    def get_object_key(self, object_id: Any) -> str:
+        return self.shared.get_object_key(object_id)
+
+    def get_query_key(self, endpoint: str, **params) -> str:
+        return self.shared.get_query_key(endpoint, **params)
+
+    async def get_or_load(
+        self,
+        object_key: str,
+        loader: Callable[[], Awaitable[Any]],
+        expire: int = 60,
+        negative_expire: int | None = None,
+        soft_expire: int | None = None,
+    ) -> Any:
+        """
+        Получить объект из кэша или загрузить его, объединяя одновременные промахи.
+        :param object_key: Ключ объекта.
+        :param loader: Загрузка объекта из базы; None означает, что объекта нет.
+        :param expire: Время жизни записи в Redis (в секундах), в том числе устаревшей.
+        :param negative_expire: Сколько помнить отсутствие объекта; None — не кэшировать.
+        :param soft_expire: Через сколько секунд запись устаревает; None — никогда.
+        :return: Объект или None, если объекта нет.
+        """
+        entry = self.local.get(object_key)
+        if entry is not None:
+            return entry["value"]
+        future = self._inflight.get(object_key)
+        if future is None:
+            future = asyncio.ensure_future(
+                super().get_or_load(
+                    object_key,
+                    loader,
+                    expire=expire,
+                    negative_expire=negative_expire,
+                    soft_expire=soft_expire,
+                )
+            )
+            self._inflight[object_key] = future
+            future.add_done_callback(
+                lambda done: self._finish_inflight(object_key, done)
+            )
+        # Отмена одного запроса (например, клиент отключился)
+        # не должна прерывать загрузку для остальных ожидающих.
+        return await asyncio.shield(future)
+
+    def _finish_inflight(
+        self, object_key: str, future: asyncio.Future
+    ) -> None:
+        # После сброса ключа под ним может быть уже новая загрузка.
+        if self._inflight.get(object_key) is future:
+            del self._inflight[object_key]
+
+
+def make_layered_cache(redis: Redis, namespace: str) -> LayeredCache:
+    """Кэш сервиса: свой LRU процесса поверх общего Redis."""
+    return LayeredCache(
+        shared=RedisCache(
+            redis_client=redis,
+            namespace=namespace,
+            compress_min_size=settings.cache_compress_min_size,
+        ),
+        local=LocalCache(
+            maxsize=settings.local_cache_size, ttl=settings.local_cache_ttl
+        ),
+    )
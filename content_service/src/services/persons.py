@@ -4,11 +4,13 @@ from functools import lru_cache
 from elasticsearch import AsyncElasticsearch
 from fastapi import Depends
 from redis.asyncio import Redis
+from src.core.config import settings
 from src.db.elastic import get_elastic
 from src.db.redis import get_redis
 from src.models.person import Person
 from src.services.db_managers import DBManager, ElasticManager
-from src.services.redis_service import AbstractCache, RedisCache
+from src.services.local_cache import make_layered_cache
+from src.services.redis_service import AbstractCache
 
 logger = logging.getLogger(__name__)
 
@@ -22,18 +24,15 @@ class PersonService:
 
     async def get_person_by_id(self, person_id: str) -> Person | None:
         """Метод для получения персоны по ID"""
-        person_key = self.redis_client.get_query_key(person_id)
-        person = await self.redis_client.get_object(person_key)
+        person_key = self.redis_client.get_object_key(person_id)
+        person = await self.redis_client.get_or_load(
+            person_key,
+            lambda: self.elastic_client.get_object_by_id(person_id),
+            expire=settings.get_cache_ttl("person"),
+        )
         if person is None:
-            person = await self.elastic_client.get_object_by_id(person_id)
-            if person is None:
-                logger.warning(
-                    "Не удалось получить персону по id %s", person_id
-                )
-                return None
-            await self.redis_client.set_object(
-                object_key=person_key, value=person
-            )
+            logger.warning("Не удалось получить персону по id %s", person_id)
+            return None
         return Person(**person)
 
     async def get_person_by_query(
@@ -47,25 +46,29 @@ class PersonService:
         """Получает список фильмов по поисковому запросу из кэша или из ES"""
 
         persons_key = self.redis_client.get_query_key(
-            query, search_fields, sort, page_size, page
+            "person_search",
+            query=query,
+            search_fields=search_fields,
+            sort=sort,
+            page_size=page_size,
+            page=page,
         )
-        persons = await self.redis_client.get_object(object_key=persons_key)
-        if persons is None:
-            persons = await self.elastic_client.get_objects_by_query(
+        persons = await self.redis_client.get_or_load(
+            persons_key,
+            lambda: self.elastic_client.get_objects_by_query(
                 query=query,
                 fields=search_fields,
                 sort=sort,
                 page_size=page_size,
                 page=page,
+            ),
+            expire=settings.get_cache_ttl("person_search"),
+        )
+        if persons is None:
+            logger.warning(
+                "Данные по запросу %s не были получены.", persons_key
             )
-            if persons is None:
-                logger.warning(
-                    "Данные по запросу %s не были получены.", persons_key
-                )
-                return None
-            await self.redis_client.set_object(
-                object_key=persons_key, value=persons
-            )
+            return None
         return [Person(**person) for person in persons]
 
     async def get_person_list(
@@ -74,21 +77,20 @@ class PersonService:
         """Получает постраничный список людей из кэша или из ES"""
 
         persons_key = self.redis_client.get_query_key(
-            sort=sort, page_size=page_size, page=page
+            "person_list", sort=sort, page_size=page_size, page=page
         )
-        persons = await self.redis_client.get_object(object_key=persons_key)
-        if persons is None:
-            persons = await self.elastic_client.get_objects_by_query(
+        persons = await self.redis_client.get_or_load(
+            persons_key,
+            lambda: self.elastic_client.get_objects_by_query(
                 sort=sort, page_size=page_size, page=page
+            ),
+            expire=settings.get_cache_ttl("person_list"),
+        )
+        if persons is None:
+            logger.warning(
+                "Данные по запросу %s не были получены.", persons_key
             )
-            if persons is None:
-                logger.warning(
-                    "Данные по запросу %s не были получены.", persons_key
-                )
-                return None
-            await self.redis_client.set_object(
-                object_key=persons_key, value=persons
-            )
+            return None
         return [Person(**person) for person in persons]
 
 
@@ -98,7 +100,7 @@ def get_person_service(
     elastic: AsyncElasticsearch = Depends(get_elastic),
 ) -> PersonService:
     """Создает экземпляр класса PersonService для работы с персонами"""
-    redis_client = RedisCache(redis)
+    redis_client = make_layered_cache(redis, "persons")
     elastic_client = ElasticManager(elastic, "persons")
     return PersonService(
         redis_client=redis_client, elastic_client=elastic_client
@@ -1,12 +1,75 @@
-import json
+import asyncio
+import hashlib
 import logging
+import time
+import zlib
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Awaitable, Callable
 
+import orjson
 from redis.asyncio import Redis
 
 logger = logging.getLogger(__name__)
 
+# Общий префикс ключей сервиса и версия формата значений. Версия меняется
+# вместе с форматом или моделями: старые ключи просто перестают читаться
+# и истекают сами.
+KEY_PREFIX = "content"
+SCHEMA_VERSION = 3
+
+# Первый байт значения: как закодировано остальное.
+RAW_JSON = b"j"
+ZLIB_JSON = b"z"
+
+
+def make_entry(value: Any, soft_expire: int | None = None) -> dict[str, Any]:
+    """
+    Запись кэша: значение и время, до которого оно считается свежим.
+    Значение None означает, что объекта нет в базе.
+    :param value: Сохраняемое значение.
+    :param soft_expire: Через сколько секунд запись устаревает; None — никогда.
+    :return: Запись кэша.
+    """
+    fresh_until = None if soft_expire is None else time.time() + soft_expire
+    return {"value": value, "fresh_until": fresh_until}
+
+
+def is_stale(entry: dict[str, Any]) -> bool:
+    """
+    Устарела ли запись: её ещё можно отдать, но пора обновить.
+    :param entry: Запись кэша.
+    :return: True, если запись устарела.
+    """
+    fresh_until = entry["fresh_until"]
+    return fresh_until is not None and fresh_until <= time.time()
+
+
+def encode_value(value: Any, compress_min_size: int) -> bytes:
+    """
+    Кодирует значение для Redis: orjson, большие значения ещё и сжимаются.
+    :param value: Сохраняемое значение.
+    :param compress_min_size: С какого размера (в байтах) сжимать значение.
+    :return: Значение с байтом формата в начале.
+    """
+    data = orjson.dumps(value)
+    if len(data) >= compress_min_size:
+        return ZLIB_JSON + zlib.compress(data, 1)
+    return RAW_JSON + data
+
+
+def decode_value(data: bytes) -> Any:
+    """
+    Разбирает значение, сохранённое encode_value.
+    :param data: Значение из Redis.
+    :return: Исходный объект.
+    """
+    kind, body = data[:1], data[1:]
+    if kind == ZLIB_JSON:
+        body = zlib.decompress(body)
+    elif kind != RAW_JSON:
+        raise ValueError("Неизвестный формат значения: {!r}".format(kind))
+    return orjson.loads(body)
+
 
 class AbstractCache(ABC):
     """
@@ -15,6 +78,11 @@ class AbstractCache(ABC):
 
     def __init__(self, redis_client: Redis):
         self.redis_client = redis_client
+        self._refreshing: dict[str, asyncio.Task] = {}
+        # Число идущих загрузок ключа и номер его последнего сброса: загрузка,
+        # во время которой ключ сбросили, не записывает старое значение.
+        self._loading: dict[str, int] = {}
+        self._epochs: dict[str, int] = {}
 
     @abstractmethod
     async def get_object(
@@ -42,24 +110,128 @@ class AbstractCache(ABC):
         """
         pass
 
+    def forget(self, object_key: str) -> None:
+        """
+        Удалить объект из кэша процесса, если он есть.
+        Общий кэш сбрасывает тот, кто изменил данные; идущие загрузки
+        ключа результат в кэш уже не запишут.
+        :param object_key: Ключ объекта.
+        """
+        if object_key in self._loading:
+            self._epochs[object_key] += 1
+
+    @abstractmethod
+    def get_object_key(self, object_id: Any) -> str:
+        """
+        Генерировать ключ объекта по его id.
+        :param object_id: Идентификатор объекта.
+        :return: Сформированный ключ.
+        """
+        pass
+
     @abstractmethod
-    def get_query_key(self, *args, **kwargs) -> str:
+    def get_query_key(self, endpoint: str, **params) -> str:
         """
         Генерировать ключ для запроса на основе параметров.
-        :param args: Позиционные аргументы.
-        :param kwargs: Именованные аргументы.
+        :param endpoint: Название запроса, разделяет ключи разных запросов.
+        :param params: Параметры запроса.
         :return: Сформированный ключ.
         """
         pass
 
+    async def get_or_load(
+        self,
+        object_key: str,
+        loader: Callable[[], Awaitable[Any]],
+        expire: int = 60,
+        negative_expire: int | None = None,
+        soft_expire: int | None = None,
+    ) -> Any:
+        """
+        Получить объект из кэша, а при промахе загрузить и сохранить его.
+        Устаревшая запись отдаётся сразу и обновляется в фоновой задаче.
+        :param object_key: Ключ объекта.
+        :param loader: Загрузка объекта из базы; None означает, что объекта нет.
+        :param expire: Время жизни записи (в секундах), в том числе устаревшей.
+        :param negative_expire: Сколько помнить отсутствие объекта; None — не кэшировать.
+        :param soft_expire: Через сколько секунд запись устаревает; None — никогда.
+        :return: Объект или None, если объекта нет.
+        """
+        entry = await self.get_object(object_key)
+        if entry is None:
+            return await self._load(
+                object_key, loader, expire, negative_expire, soft_expire
+            )
+        if is_stale(entry) and object_key not in self._refreshing:
+            task = asyncio.create_task(
+                self._load(
+                    object_key, loader, expire, negative_expire, soft_expire
+                )
+            )
+            self._refreshing[object_key] = task
+            task.add_done_callback(
+                lambda done: self._finish_refresh(object_key, done)
+            )
+        return entry["value"]
+
+    async def _load(
+        self,
+        object_key: str,
+        loader: Callable[[], Awaitable[Any]],
+        expire: int,
+        negative_expire: int | None,
+        soft_expire: int | None,
+    ) -> Any:
+        if object_key not in self._loading:
+            self._loading[object_key] = 0
+            self._epochs[object_key] = 0
+        self._loading[object_key] += 1
+        epoch = self._epochs[object_key]
+        try:
+            value = await loader()
+            if self._epochs[object_key] != epoch:
+                return value
+            if value is not None:
+                await self.set_object(
+                    object_key, make_entry(value, soft_expire), expire=expire
+                )
+            elif negative_expire:
+                await self.set_object(
+                    object_key, make_entry(None), expire=negative_expire
+                )
+            return value
+        finally:
+            self._loading[object_key] -= 1
+            if not self._loading[object_key]:
+                del self._loading[object_key]
+                del self._epochs[object_key]
+
+    def _finish_refresh(self, object_key: str, task: asyncio.Task) -> None:
+        self._refreshing.pop(object_key, None)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(
+                "Не удалось обновить кэш с ключом {}: {}".format(
+                    object_key, task.exception()
+                )
+            )
+
 
 class RedisCache(AbstractCache):
     """
     Реализация кэширования с использованием Redis.
+    Ключи имеют вид content:<индекс>:v<версия>:id:<id> для объектов
+    и content:<индекс>:v<версия>:q:<запрос>:<хэш параметров> для запросов.
     """
 
-    def __init__(self, redis_client: Redis):
+    def __init__(
+        self,
+        redis_client: Redis,
+        namespace: str,
+        compress_min_size: int = 4096,
+    ):
         super().__init__(redis_client)
+        self.prefix = "{}:{}:v{}".format(KEY_PREFIX, namespace, SCHEMA_VERSION)
+        self.compress_min_size = compress_min_size
 
     async def get_object(self, object_key: str) -> dict[str, Any] | None:
         """
@@ -71,7 +243,7 @@ class RedisCache(AbstractCache):
             value = await self.redis_client.get(object_key)
             if value is None:
                 return None
-            return json.loads(value)
+            return decode_value(value)
         except Exception as e:
             logger.error(
                 "Ошибка при получении объекта с ключом {}: {}".format(
@@ -95,7 +267,7 @@ class RedisCache(AbstractCache):
         try:
             await self.redis_client.set(
                 name=object_key,
-                value=json.dumps(value),
+                value=encode_value(value, self.compress_min_size),
                 ex=expire,  # Время жизни ключа
             )
         except Exception as e:
@@ -105,15 +277,26 @@ class RedisCache(AbstractCache):
                 )
             )
 
-    def get_query_key(self, *args, **kwargs) -> str:
+    def get_object_key(self, object_id: Any) -> str:
         """
-        Генерировать ключ для кэширования запросов.
-        :param args: Позиционные аргументы.
-        :param kwargs: Именованные аргументы.
+        Генерировать ключ объекта. Ключ читаем, чтобы его мог
+        собрать и сбросить ETL.
+        :param object_id: Идентификатор объекта.
         :return: Сформированный ключ.
         """
+        return "{}:id:{}".format(self.prefix, object_id)
 
-        key = ":".join(map(str, args))
-        if kwargs:
-            key += ":".join(f"{k}={v}" for k, v in sorted(kwargs.items()))
-        return key
+    def get_query_key(self, endpoint: str, **params) -> str:
+        """
+        Генерировать ключ для кэширования запросов.
+        Параметры сериализуются в каноническом виде и хэшируются,
+        поэтому порядок и длина параметров не влияют на ключ.
+        :param endpoint: Название запроса.
+        :param params: Параметры запроса.
+        :return: Сформированный ключ.
+        """
+        canonical = orjson.dumps(
+            params, option=orjson.OPT_SORT_KEYS, default=str
+        )
+        digest = hashlib.blake2b(canonical, digest_size=16).hexdigest()
+        return "{}:q:{}:{}".format(self.prefix, endpoint, digest)
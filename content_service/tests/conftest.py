@@ -0,0 +1,4 @@
+from pathlib import Path
+
+# Логирование сервиса настраивается при импорте src.core.config.
+Path("logs/content_service").mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,86 @@
+import asyncio
+from typing import Any
+
+import pytest
+
+from src.services.local_cache import LayeredCache, LocalCache
+from src.services.redis_service import AbstractCache
+
+
+class MemoryCache(AbstractCache):
+    """Общий кэш в словаре вместо Redis."""
+
+    def __init__(self):
+        super().__init__(redis_client=None)
+        self.items: dict[str, Any] = {}
+
+    async def get_object(self, object_key: str) -> Any | None:
+        return self.items.get(object_key)
+
+    async def set_object(self, object_key: str, value: Any, expire: int = 60):
+        self.items[object_key] = value
+
+    def get_object_key(self, object_id: Any) -> str:
+        return "film:{}".format(object_id)
+
+    def get_query_key(self, endpoint: str, **params) -> str:
+        return endpoint
+
+
+class GatedLoader:
+    """Загрузка, которая отдаёт версию документа по сигналу."""
+
+    def __init__(self):
+        self.calls = 0
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def __call__(self) -> dict[str, Any]:
+        self.calls += 1
+        version = self.calls
+        self.started.set()
+        await self.release.wait()
+        return {"id": "1", "version": version}
+
+
+@pytest.fixture
+def cache() -> LayeredCache:
+    return LayeredCache(shared=MemoryCache(), local=LocalCache())
+
+
+@pytest.mark.asyncio
+async def test_load_started_before_invalidation_is_not_cached(cache):
+    loader = GatedLoader()
+    key = cache.get_object_key("1")
+
+    stale = asyncio.create_task(cache.get_or_load(key, loader, expire=3600))
+    await loader.started.wait()
+    cache.forget(key)
+    loader.release.set()
+
+    assert (await stale)["version"] == 1
+    assert key not in cache.shared.items
+    assert cache.local.get(key) is None
+
+    fresh = await cache.get_or_load(key, loader, expire=3600)
+    assert fresh["version"] == 2
+    assert cache.shared.items[key]["value"] == fresh
+
+
+@pytest.mark.asyncio
+async def test_requests_after_invalidation_do_not_join_stale_load(cache):
+    loader = GatedLoader()
+    key = cache.get_object_key("1")
+
+    stale = asyncio.create_task(cache.get_or_load(key, loader))
+    await loader.started.wait()
+    cache.forget(key)
+    loader.started.clear()
+    fresh = asyncio.create_task(cache.get_or_load(key, loader))
+    await loader.started.wait()
+    loader.release.set()
+
+    assert (await stale)["version"] == 1
+    assert (await fresh)["version"] == 2
+    assert cache.shared.items[key]["value"]["version"] == 2
+    assert cache._loading == {} and cache._epochs == {}
@@ -13770,6 +13770,7 @@ COPY public.django_migrations (id, app, name, applied) FROM stdin;
 17	auth	0012_alter_user_first_name_max_length	2024-06-07 10:39:52.241096+00
 18	movies	0001_initial	2024-06-07 10:42:29.129058+00
 19	sessions	0001_initial	2024-06-07 10:42:30.542793+00
+20	movies	0002_add_change_tracking_indexes	2024-06-07 10:42:31.000000+00
 \.
 
 
@@ -13842,7 +13843,7 @@ SELECT pg_catalog.setval('public.django_content_type_id_seq', 11, true);
 -- Name: django_migrations_id_seq; Type: SEQUENCE SET; Schema: public; Owner: postgres
 --
 
-SELECT pg_catalog.setval('public.django_migrations_id_seq', 19, true);
+SELECT pg_catalog.setval('public.django_migrations_id_seq', 20, true);
 
 
 --
@@ -14042,6 +14043,55 @@ CREATE UNIQUE INDEX film_work_genre_idx ON content.genre_film_work USING btree (
 CREATE UNIQUE INDEX film_work_person_role_idx ON content.person_film_work USING btree (film_work_id, person_id, role);
 
 
+--
+-- Name: film_work_modified_idx; Type: INDEX; Schema: content; Owner: postgres
+--
+
+CREATE INDEX film_work_modified_idx ON content.film_work USING btree (modified, id);
+
+
+--
+-- Name: genre_modified_idx; Type: INDEX; Schema: content; Owner: postgres
+--
+
+CREATE INDEX genre_modified_idx ON content.genre USING btree (modified, id);
+
+
+--
+-- Name: person_modified_idx; Type: INDEX; Schema: content; Owner: postgres
+--
+
+CREATE INDEX person_modified_idx ON content.person USING btree (modified, id);
+
+
+--
+-- Name: genre_film_work_created_idx; Type: INDEX; Schema: content; Owner: postgres
+--
+
+CREATE INDEX genre_film_work_created_idx ON content.genre_film_work USING btree (created, id);
+
+
+--
+-- Name: person_film_work_created_idx; Type: INDEX; Schema: content; Owner: postgres
+--
+
+CREATE INDEX person_film_work_created_idx ON content.person_film_work USING btree (created, id);
+
+
+--
+-- Name: genre_film_work_genre_id_idx; Type: INDEX; Schema: content; Owner: postgres
+--
+
+CREATE INDEX genre_film_work_genre_id_idx ON content.genre_film_work USING btree (genre_id);
+
+
+--
+-- Name: person_film_work_person_id_idx; Type: INDEX; Schema: content; Owner: postgres
+--
+
+CREATE INDEX person_film_work_person_id_idx ON content.person_film_work USING btree (person_id);
+
+
 --
 -- Name: auth_group_name_a6ea08ec_like; Type: INDEX; Schema: public; Owner: postgres
 --
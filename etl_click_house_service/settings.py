@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -7,14 +9,28 @@ class KafkaSettings(BaseSettings):
     bootstrap_service: str = Field(..., validation_alias="KAFKA_BOOTSTRAP_SERVERS")
     kafka_username: str = Field(..., validation_alias="KAFKA_USERNAME")
     kafka_password: str = Field(..., validation_alias="KAFKA_PASSWORD")
+    group_id: str = Field(
+        default="clickhouse_loader", validation_alias="KAFKA_CLICKHOUSE_GROUP_ID"
+    )
+    # Топик для сообщений, которые не удалось разобрать. Если не задан,
+    # такие сообщения только логируются и пропускаются.
+    dead_letter_topic: str | None = Field(
+        default=None, validation_alias="KAFKA_CLICKHOUSE_DEAD_LETTER_TOPIC"
+    )
 
-    def get_init_conf(self) -> dict:
+    def get_connection_conf(self) -> dict:
         return {
             "bootstrap_servers": self.bootstrap_service,
             "security_protocol": "SASL_PLAINTEXT",
             "sasl_mechanism": "PLAIN",
             "sasl_plain_username": self.kafka_username,
             "sasl_plain_password": self.kafka_password,
+        }
+
+    def get_init_conf(self) -> dict:
+        return {
+            **self.get_connection_conf(),
+            "group_id": self.group_id,
             "enable_auto_commit": False,
         }
 
@@ -34,6 +50,25 @@ class ClickHouseSettings(BaseSettings):
 class Settings(BaseSettings):
     debug: bool = Field(..., alias="DEBUG")
     batch_size: int = Field(..., alias="BATCH_SIZE_KAFKA_CLICKHOUSE")
+    # Пачка сбрасывается по первому из порогов: число событий, объём
+    # сообщений или время ожидания первого события пачки.
+    batch_max_bytes: int = Field(
+        16 * 1024 * 1024, alias="BATCH_MAX_BYTES_KAFKA_CLICKHOUSE"
+    )
+    batch_linger_seconds: float = Field(
+        5.0, alias="BATCH_LINGER_SECONDS_KAFKA_CLICKHOUSE"
+    )
+    poll_timeout_ms: int = Field(1000, alias="KAFKA_POLL_TIMEOUT_MS")
+    metrics_port: int = Field(9101, alias="CH_LOADER_METRICS_PORT")
+    # Число потребителей в группе: имеет смысл не больше числа разделов
+    # топика. Процессы обходят GIL при разборе событий, потоки дешевле.
+    workers: int = Field(1, alias="CH_LOADER_WORKERS")
+    worker_mode: Literal["thread", "process"] = Field(
+        "thread", alias="CH_LOADER_WORKER_MODE"
+    )
+    # Миграции схемы применяет только один экземпляр загрузчика, остальные
+    # ждут их завершения перед стартом воркеров.
+    run_migrations: bool = Field(True, alias="CH_LOADER_RUN_MIGRATIONS")
     kafka_settings: KafkaSettings = KafkaSettings()
     clickhouse_settings: ClickHouseSettings = ClickHouseSettings()
 
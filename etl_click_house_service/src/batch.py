@@ -0,0 +1,96 @@
+import time
+
+from kafka.consumer.fetcher import ConsumerRecord
+from kafka.structs import OffsetAndMetadata, TopicPartition
+
+from src.schemas.base_user_event import BaseUserEvent
+
+
+class Batch:
+    """Пачка событий вместе с диапазонами offset'ов, из которых она собрана."""
+
+    def __init__(self):
+        self.events: list[BaseUserEvent] = []
+        self.nbytes = 0
+        self.started_at: float | None = None
+        self._first_offsets: dict[TopicPartition, int] = {}
+        self._last_offsets: dict[TopicPartition, int] = {}
+        # Позиция каждого события в Kafka пишется вместе с ним в ClickHouse.
+        self._topics: list[str] = []
+        self._partitions: list[int] = []
+        self._offsets: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def _track(self, msg: ConsumerRecord):
+        partition = TopicPartition(msg.topic, msg.partition)
+        self._first_offsets.setdefault(partition, msg.offset)
+        self._last_offsets[partition] = msg.offset
+
+    @property
+    def has_offsets(self) -> bool:
+        return bool(self._last_offsets)
+
+    def skip(self, msg: ConsumerRecord):
+        """Учитывает offset пропущенного сообщения без события."""
+        self._track(msg)
+
+    def add(self, msg: ConsumerRecord, event: BaseUserEvent):
+        self._track(msg)
+        self.events.append(event)
+        self._topics.append(msg.topic)
+        self._partitions.append(msg.partition)
+        self._offsets.append(msg.offset)
+        self.nbytes += len(msg.value)
+        if self.started_at is None:
+            self.started_at = time.monotonic()
+
+    @property
+    def age(self) -> float:
+        """Сколько секунд ждёт первое событие пачки."""
+        if self.started_at is None:
+            return 0.0
+        return time.monotonic() - self.started_at
+
+    def flush_reason(
+        self, max_size: int, max_bytes: int, linger: float
+    ) -> str | None:
+        """Причина сброса пачки или None, если пачку можно копить дальше."""
+        if not self.events:
+            return None
+        if len(self.events) >= max_size:
+            return "size"
+        if self.nbytes >= max_bytes:
+            return "bytes"
+        if self.age >= linger:
+            return "linger"
+        return None
+
+    def dedup_token(self) -> str:
+        """Токен дедупликации вставки в ClickHouse.
+
+        Защищает от дублей при повторе вставки той же пачки. Пачка,
+        перечитанная после перезапуска, может закончиться на другом
+        offset'е, поэтому уже вставленные сообщения пропускаются по
+        позициям Kafka, сохранённым в таблице (см. IngestWorker).
+        """
+        return ",".join(
+            f"{tp.topic}:{tp.partition}:{first}-{self._last_offsets[tp]}"
+            for tp, first in sorted(self._first_offsets.items())
+        )
+
+    def commit_offsets(self) -> dict[TopicPartition, OffsetAndMetadata]:
+        """Offset'ы для фиксации: следующая после пачки позиция раздела."""
+        return {
+            tp: OffsetAndMetadata(offset + 1, "", -1)
+            for tp, offset in self._last_offsets.items()
+        }
+
+    def offset_columns(self) -> dict[str, list]:
+        """Колонки с позицией каждого события пачки в Kafka."""
+        return {
+            "kafka_topic": self._topics,
+            "kafka_partition": self._partitions,
+            "kafka_offset": self._offsets,
+        }
@@ -0,0 +1,89 @@
+import clickhouse_connect
+from clickhouse_connect.driver.insert import InsertContext
+from logger import logger
+from settings import settings
+
+from src.helpers.backoff_func_wrapper import backoff
+from src.migrations import migrate, wait_migrated
+from src.queries import queries
+from src.schemas.base_user_event import BaseUserEvent
+from src.table_schema import TableSchema
+
+
+class ClickHouse:
+    def __init__(self):
+        self.client = clickhouse_connect.get_client(
+            **settings.clickhouse_settings.get_init_conf()
+        )
+        # Схема и контекст вставки кэшируются по таблице и сбрасываются
+        # при ошибке вставки, например после изменения схемы.
+        self._schemas: dict[str, TableSchema] = {}
+        self._insert_contexts: dict[str, InsertContext] = {}
+
+    def create_tables(self):
+        migrate(self.client, logger)
+
+    def wait_tables(self):
+        wait_migrated(self.client, logger)
+
+    def _get_table_columns(self, table: str) -> dict:
+        result = self.client.query(
+            "SELECT name, type FROM system.columns "
+            "WHERE table = {table:String} AND database = {database:String} "
+            "ORDER BY position",
+            parameters={
+                "table": table,
+                "database": settings.clickhouse_settings.database,
+            },
+        )
+        return {row[0]: row[1] for row in result.result_rows}
+
+    def _get_insert_context(self, table: str) -> InsertContext:
+        context = self._insert_contexts.get(table)
+        if context is None:
+            columns = self._get_table_columns(table)
+            schema = TableSchema(list(columns), list(columns.values()))
+            context = self.client.create_insert_context(
+                table,
+                column_names=schema.names,
+                column_type_names=schema.types,
+                column_oriented=True,
+                settings={"insert_deduplicate": 1},
+            )
+            self._schemas[table] = schema
+            self._insert_contexts[table] = context
+        return context
+
+    def refresh_schema(self, table: str):
+        self._schemas.pop(table, None)
+        self._insert_contexts.pop(table, None)
+
+    @backoff(0.1, 2, 10, logger)
+    def load_data(
+        self,
+        table: str,
+        data: list[BaseUserEvent],
+        dedup_token: str,
+        extra: dict[str, list] | None = None,
+    ):
+        context = self._get_insert_context(table)
+        context.settings["insert_deduplication_token"] = dedup_token
+        try:
+            self.client.insert(
+                data=self._schemas[table].to_columns(data, extra),
+                context=context,
+            )
+        except Exception:
+            self.refresh_schema(table)
+            raise
+
+    @backoff(0.1, 2, 10, logger)
+    def last_offsets(
+        self, topic: str, partitions: list[int]
+    ) -> dict[int, int]:
+        """Последние offset'ы разделов топика, уже записанные в user_events."""
+        result = self.client.query(
+            queries["last_kafka_offsets"],
+            parameters={"topic": topic, "partitions": partitions},
+        )
+        return {row[0]: row[1] for row in result.result_rows}
@@ -0,0 +1,102 @@
+import json
+from datetime import datetime
+from uuid import UUID
+
+import msgpack
+
+from src.schemas.base_user_event import BaseUserEvent
+
+CONTENT_TYPE_HEADER = "content-type"
+
+
+class EventDecodeError(ValueError):
+    """Сообщение Kafka не удалось разобрать в событие."""
+
+MSGPACK_CONTENT_TYPE = b"application/x-msgpack;schema=client_event;v="
+
+# Схемы компактного кодирования, зеркало analitycal_service
+# (src/infrastructure/codec.py). Новые версии только добавляются.
+SCHEMAS = {
+    1: {
+        "event_types": (
+            "click",
+            "page_view",
+            "quality_change",
+            "video_finished",
+            "search_filter_used",
+            "video_progress",
+        ),
+        "payload_fields": {
+            "click": ("item_id", "item_type"),
+            "page_view": ("page_type", "duration_seconds"),
+            "quality_change": (
+                "video_id",
+                "from_quality",
+                "to_quality",
+                "current_time_seconds",
+            ),
+            "video_finished": ("video_id", "total_duration_seconds"),
+            "search_filter_used": ("filters",),
+            "video_progress": ("video_id", "watched_seconds"),
+        },
+    },
+}
+
+
+def _content_type(headers: list[tuple[str, bytes]] | None) -> bytes | None:
+    for key, value in headers or ():
+        if key == CONTENT_TYPE_HEADER:
+            return value
+    return None
+
+
+def decode_msgpack(value: bytes, version: int) -> BaseUserEvent:
+    schema = SCHEMAS[version]
+    user_id, ip_address, user_agent, code, timestamp_us, fields = (
+        msgpack.unpackb(value)
+    )
+    event_type = schema["event_types"][code]
+    return BaseUserEvent.model_validate(
+        {
+            "user_id": UUID(bytes=user_id)
+            if isinstance(user_id, bytes)
+            else user_id,
+            "ip_address": ip_address,
+            "user_agent": user_agent,
+            "event_type": event_type,
+            "timestamp": datetime.fromtimestamp(timestamp_us / 1_000_000),
+            "payload": dict(
+                zip(schema["payload_fields"][event_type], fields)
+            ),
+        }
+    )
+
+
+def decode_json(value: bytes) -> BaseUserEvent:
+    """Разбирает событие в JSON.
+
+    Старый формат кладёт в сообщение событие, уже сериализованное в
+    JSON-строку: внешний слой снимается json.loads, а само событие
+    разбирается и валидируется pydantic за один проход.
+    """
+    if value[:1] == b'"':
+        value = json.loads(value)
+    return BaseUserEvent.model_validate_json(value)
+
+
+def decode_event(
+    value: bytes, headers: list[tuple[str, bytes]] | None = None
+) -> BaseUserEvent:
+    """Разбирает сообщение Kafka по заголовку content-type.
+
+    Сообщения без заголовка считаются JSON старого формата. Любая ошибка
+    разбора или валидации поднимается как EventDecodeError.
+    """
+    content_type = _content_type(headers)
+    try:
+        if content_type and content_type.startswith(MSGPACK_CONTENT_TYPE):
+            version = int(content_type[len(MSGPACK_CONTENT_TYPE) :])
+            return decode_msgpack(value, version)
+        return decode_json(value)
+    except (ValueError, TypeError, KeyError, IndexError) as e:
+        raise EventDecodeError(f"{type(e).__name__}: {e}") from e
@@ -0,0 +1,29 @@
+from prometheus_client import Counter, Histogram
+
+BATCH_EVENTS = Histogram(
+    "ch_loader_batch_events",
+    "Число событий в пачке, вставленной в ClickHouse",
+    ["reason"],
+    buckets=(10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000),
+)
+BATCH_BYTES = Histogram(
+    "ch_loader_batch_bytes",
+    "Размер пачки в байтах сообщений Kafka",
+    ["reason"],
+    buckets=(1 << 10, 1 << 14, 1 << 17, 1 << 20, 1 << 23, 1 << 26),
+)
+BATCH_AGE = Histogram(
+    "ch_loader_batch_age_seconds",
+    "Время от первого события пачки до её сброса",
+    ["reason"],
+    buckets=(0.1, 0.5, 1, 2, 5, 10, 30, 60),
+)
+FLUSHES = Counter(
+    "ch_loader_flushes",
+    "Число сбросов пачек в ClickHouse по причинам",
+    ["reason"],
+)
+DECODE_ERRORS = Counter(
+    "ch_loader_decode_errors",
+    "Число сообщений Kafka, пропущенных из-за ошибки разбора",
+)
@@ -0,0 +1,149 @@
+import time
+from logging import Logger
+
+from clickhouse_connect.driver.client import Client
+
+from src.queries import queries
+
+# Версионированные миграции схемы: версия, имя и запросы по порядку.
+# Применённые версии записываются в schema_migrations, а выполненные шаги
+# незавершённой миграции — в schema_migration_steps, поэтому после падения
+# миграция продолжается со следующего шага. Шаги должны переживать повтор:
+# таблицы создаются с IF NOT EXISTS, перед переносом данных целевая
+# таблица очищается (BACKFILL_TARGETS), а шаги, которые нельзя повторить, проверяются запросом
+# из APPLIED_CHECKS. Миграции запускает один процесс загрузчика до старта
+# потребителей, так что перенос данных не пересекается с вставками.
+MIGRATIONS = [
+    (
+        1,
+        "user_events",
+        [
+            "create_user_events_table",
+            "enable_user_events_deduplication",
+        ],
+    ),
+    (
+        2,
+        "partitioned_user_events",
+        [
+            "create_user_events_v2_table",
+            "backfill_user_events_v2",
+            "swap_user_events_v2",
+            "keep_user_events_legacy",
+        ],
+    ),
+    (
+        3,
+        "daily_rollups",
+        [
+            "create_film_views_daily_table",
+            "create_film_views_daily_mv",
+            "backfill_film_views_daily",
+            "create_user_watch_time_daily_table",
+            "create_user_watch_time_daily_mv",
+            "backfill_user_watch_time_daily",
+            "create_quality_switches_daily_table",
+            "create_quality_switches_daily_mv",
+            "backfill_quality_switches_daily",
+        ],
+    ),
+    (
+        4,
+        "kafka_offsets",
+        [
+            "add_user_events_kafka_offsets",
+        ],
+    ),
+    (
+        5,
+        "kafka_offsets_table",
+        [
+            "create_kafka_offsets_table",
+            "create_kafka_offsets_mv",
+            "backfill_kafka_offsets",
+        ],
+    ),
+]
+
+
+# Целевые таблицы шагов переноса данных: прерванный перенос повторяется
+# целиком, поэтому перед ним таблица очищается.
+BACKFILL_TARGETS = {
+    "backfill_user_events_v2": "user_events_v2",
+    "backfill_film_views_daily": "film_views_daily",
+    "backfill_user_watch_time_daily": "user_watch_time_daily",
+    "backfill_quality_switches_daily": "quality_switches_daily",
+    "backfill_kafka_offsets": "kafka_offsets",
+}
+
+# Шаг уже выполнен, если запрос возвращает ненулевое значение.
+APPLIED_CHECKS = {
+    "create_user_events_v2_table": "user_events_swapped",
+    "backfill_user_events_v2": "user_events_swapped",
+    "swap_user_events_v2": "user_events_swapped",
+    "keep_user_events_legacy": "user_events_legacy_exists",
+}
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_applied_versions(client: Client) -> set[int]:
+    result = client.query("SELECT version FROM schema_migrations")
+    return {row[0] for row in result.result_rows}
+
+
+def get_applied_steps(client: Client, version: int) -> set[str]:
+    result = client.query(
+        "SELECT step FROM schema_migration_steps "
+        "WHERE version = {version:UInt32}",
+        parameters={"version": version},
+    )
+    return {row[0] for row in result.result_rows}
+
+
+def is_step_applied(client: Client, step: str) -> bool:
+    check = APPLIED_CHECKS.get(step)
+    return check is not None and bool(client.command(queries[check]))
+
+
+def migrate(client: Client, logger: Logger):
+    """Применяет к базе ещё не применённые миграции по возрастанию версии.
+
+    Должна выполняться в одном процессе: параллельные миграции одной базы
+    не согласуются между собой.
+    """
+    client.command(queries["create_schema_migrations_table"])
+    client.command(queries["create_schema_migration_steps_table"])
+    applied = get_applied_versions(client)
+    for version, name, steps in MIGRATIONS:
+        if version in applied:
+            continue
+        logger.info("Применяется миграция %s_%s", version, name)
+        done = get_applied_steps(client, version)
+        for step in steps:
+            if step in done:
+                continue
+            if is_step_applied(client, step):
+                logger.info("Шаг %s уже выполнен", step)
+            else:
+                if step in BACKFILL_TARGETS:
+                    client.command(f"TRUNCATE TABLE {BACKFILL_TARGETS[step]}")
+                client.command(queries[step])
+            client.insert(
+                "schema_migration_steps",
+                [[version, step]],
+                column_names=["version", "step"],
+            )
+        client.insert(
+            "schema_migrations",
+            [[version, name]],
+            column_names=["version", "name"],
+        )
+
+
+def wait_migrated(client: Client, logger: Logger, interval: float = 5.0):
+    """Ждёт, пока миграции применит процесс, который за них отвечает."""
+    client.command(queries["create_schema_migrations_table"])
+    while LATEST_VERSION not in get_applied_versions(client):
+        logger.info("Ожидаем миграцию схемы до версии %s", LATEST_VERSION)
+        time.sleep(interval)
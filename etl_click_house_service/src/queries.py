@@ -1,4 +1,72 @@
+film_views_daily_select = """
+        SELECT
+            toDate(timestamp) AS day,
+            assumeNotNull(video_id) AS video_id,
+            uniqState(user_id) AS viewers,
+            countIfState(event_type = 'video_finished') AS finishes
+        FROM user_events
+        WHERE video_id IS NOT NULL
+        GROUP BY day, video_id
+"""
+
+user_watch_time_daily_select = """
+        SELECT
+            toDate(timestamp) AS day,
+            user_id,
+            assumeNotNull(video_id) AS video_id,
+            maxState(assumeNotNull(watched_seconds)) AS watched_seconds
+        FROM user_events
+        WHERE event_type = 'video_progress'
+            AND video_id IS NOT NULL
+            AND watched_seconds IS NOT NULL
+        GROUP BY day, user_id, video_id
+"""
+
+kafka_offsets_select = """
+        SELECT
+            kafka_topic AS topic,
+            kafka_partition AS partition,
+            max(kafka_offset) AS offset
+        FROM user_events
+        WHERE kafka_topic != ''
+        GROUP BY topic, partition
+"""
+
+quality_switches_daily_select = """
+        SELECT
+            toDate(timestamp) AS day,
+            assumeNotNull(video_id) AS video_id,
+            assumeNotNull(from_quality) AS from_quality,
+            assumeNotNull(to_quality) AS to_quality,
+            countState() AS switches,
+            uniqState(user_id) AS users
+        FROM user_events
+        WHERE event_type = 'quality_change'
+            AND video_id IS NOT NULL
+            AND from_quality IS NOT NULL
+            AND to_quality IS NOT NULL
+        GROUP BY day, video_id, from_quality, to_quality
+"""
+
 queries = {
+    "create_schema_migrations_table": """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version UInt32,
+            name String,
+            applied_at DateTime DEFAULT now()
+        )
+        ENGINE = MergeTree()
+        ORDER BY version;
+    """,
+    "create_schema_migration_steps_table": """
+        CREATE TABLE IF NOT EXISTS schema_migration_steps (
+            version UInt32,
+            step String,
+            applied_at DateTime DEFAULT now()
+        )
+        ENGINE = MergeTree()
+        ORDER BY (version, step);
+    """,
     "create_user_events_table": """
         CREATE TABLE IF NOT EXISTS user_events (
             user_id UUID,
@@ -19,6 +87,215 @@ queries = {
             watched_seconds Nullable(Int32)
         )
         ENGINE = MergeTree()
-        ORDER BY (user_id, timestamp);
-    """
+        ORDER BY (user_id, timestamp)
+        SETTINGS non_replicated_deduplication_window = 1000;
+    """,
+    # Для таблиц, созданных до включения дедупликации вставок.
+    "enable_user_events_deduplication": """
+        ALTER TABLE user_events
+        MODIFY SETTING non_replicated_deduplication_window = 1000;
+    """,
+    # Помесячные партиции: TTL удаляет старые месяцы целиком, а запросы
+    # за период читают только свои партиции.
+    "create_user_events_v2_table": """
+        CREATE TABLE IF NOT EXISTS user_events_v2 (
+            user_id UUID,
+            ip_address String,
+            user_agent String,
+            event_type LowCardinality(String),
+            timestamp DateTime,
+            item_id Nullable(String),
+            item_type LowCardinality(Nullable(String)),
+            page_type LowCardinality(Nullable(String)),
+            duration_seconds Nullable(Int32),
+            video_id Nullable(String),
+            from_quality LowCardinality(Nullable(String)),
+            to_quality LowCardinality(Nullable(String)),
+            current_time_seconds Nullable(Int32),
+            total_duration_seconds Nullable(Int32),
+            filters Array(LowCardinality(String)),
+            watched_seconds Nullable(Int32)
+        )
+        ENGINE = MergeTree()
+        PARTITION BY toYYYYMM(timestamp)
+        ORDER BY (event_type, user_id, timestamp)
+        TTL timestamp + INTERVAL 1 YEAR DELETE
+        SETTINGS
+            non_replicated_deduplication_window = 1000,
+            ttl_only_drop_parts = 1;
+    """,
+    "backfill_user_events_v2": """
+        INSERT INTO user_events_v2
+        SELECT
+            user_id,
+            ip_address,
+            user_agent,
+            event_type,
+            timestamp,
+            item_id,
+            item_type,
+            page_type,
+            duration_seconds,
+            video_id,
+            from_quality,
+            to_quality,
+            current_time_seconds,
+            total_duration_seconds,
+            arrayMap(x -> assumeNotNull(x), arrayFilter(x -> x IS NOT NULL, filters)),
+            watched_seconds
+        FROM user_events;
+    """,
+    "swap_user_events_v2": """
+        EXCHANGE TABLES user_events AND user_events_v2;
+    """,
+    # Обмен уже выполнен, если user_events разбита на партиции.
+    "user_events_swapped": """
+        SELECT count() FROM system.tables
+        WHERE database = currentDatabase()
+            AND name = 'user_events'
+            AND partition_key = 'toYYYYMM(timestamp)';
+    """,
+    # Старая таблица остаётся под этим именем до ручного удаления.
+    "keep_user_events_legacy": """
+        RENAME TABLE user_events_v2 TO user_events_legacy;
+    """,
+    "user_events_legacy_exists": """
+        EXISTS TABLE user_events_legacy;
+    """,
+    "create_film_views_daily_table": """
+        CREATE TABLE IF NOT EXISTS film_views_daily (
+            day Date,
+            video_id String,
+            viewers AggregateFunction(uniq, UUID),
+            finishes AggregateFunction(countIf, UInt8)
+        )
+        ENGINE = AggregatingMergeTree()
+        PARTITION BY toYYYYMM(day)
+        ORDER BY (video_id, day)
+        TTL day + INTERVAL 2 YEAR DELETE;
+    """,
+    "create_film_views_daily_mv": (
+        "CREATE MATERIALIZED VIEW IF NOT EXISTS film_views_daily_mv "
+        "TO film_views_daily AS" + film_views_daily_select
+    ),
+    "backfill_film_views_daily": (
+        "INSERT INTO film_views_daily" + film_views_daily_select
+    ),
+    "create_user_watch_time_daily_table": """
+        CREATE TABLE IF NOT EXISTS user_watch_time_daily (
+            day Date,
+            user_id UUID,
+            video_id String,
+            watched_seconds AggregateFunction(max, Int32)
+        )
+        ENGINE = AggregatingMergeTree()
+        PARTITION BY toYYYYMM(day)
+        ORDER BY (user_id, day, video_id)
+        TTL day + INTERVAL 2 YEAR DELETE;
+    """,
+    "create_user_watch_time_daily_mv": (
+        "CREATE MATERIALIZED VIEW IF NOT EXISTS user_watch_time_daily_mv "
+        "TO user_watch_time_daily AS" + user_watch_time_daily_select
+    ),
+    "backfill_user_watch_time_daily": (
+        "INSERT INTO user_watch_time_daily" + user_watch_time_daily_select
+    ),
+    "create_quality_switches_daily_table": """
+        CREATE TABLE IF NOT EXISTS quality_switches_daily (
+            day Date,
+            video_id String,
+            from_quality LowCardinality(String),
+            to_quality LowCardinality(String),
+            switches AggregateFunction(count),
+            users AggregateFunction(uniq, UUID)
+        )
+        ENGINE = AggregatingMergeTree()
+        PARTITION BY toYYYYMM(day)
+        ORDER BY (video_id, day, from_quality, to_quality)
+        TTL day + INTERVAL 2 YEAR DELETE;
+    """,
+    "create_quality_switches_daily_mv": (
+        "CREATE MATERIALIZED VIEW IF NOT EXISTS quality_switches_daily_mv "
+        "TO quality_switches_daily AS" + quality_switches_daily_select
+    ),
+    "backfill_quality_switches_daily": (
+        "INSERT INTO quality_switches_daily" + quality_switches_daily_select
+    ),
+    # Позиция сообщения Kafka, из которого получено событие: по ней
+    # загрузчик пропускает уже вставленные сообщения при перечитывании.
+    "add_user_events_kafka_offsets": """
+        ALTER TABLE user_events
+            ADD COLUMN IF NOT EXISTS kafka_topic LowCardinality(String) DEFAULT '',
+            ADD COLUMN IF NOT EXISTS kafka_partition UInt32 DEFAULT 0,
+            ADD COLUMN IF NOT EXISTS kafka_offset UInt64 DEFAULT 0;
+    """,
+    # Последний вставленный offset каждого раздела. Представление пишет
+    # его вместе с каждой вставкой в user_events, поэтому при назначении
+    # разделов загрузчик читает маленькую таблицу, а не все события.
+    "create_kafka_offsets_table": """
+        CREATE TABLE IF NOT EXISTS kafka_offsets (
+            topic LowCardinality(String),
+            partition UInt32,
+            offset UInt64
+        )
+        ENGINE = ReplacingMergeTree(offset)
+        ORDER BY (topic, partition);
+    """,
+    "create_kafka_offsets_mv": (
+        "CREATE MATERIALIZED VIEW IF NOT EXISTS kafka_offsets_mv "
+        "TO kafka_offsets AS" + kafka_offsets_select
+    ),
+    "backfill_kafka_offsets": (
+        "INSERT INTO kafka_offsets" + kafka_offsets_select
+    ),
+    "last_kafka_offsets": """
+        SELECT partition, max(offset)
+        FROM kafka_offsets
+        WHERE topic = {topic:String}
+            AND partition IN {partitions:Array(UInt32)}
+        GROUP BY partition;
+    """,
+    # Аналитические запросы читают только агрегаты.
+    "film_views_per_day": """
+        SELECT
+            day,
+            video_id,
+            uniqMerge(viewers) AS viewers,
+            countIfMerge(finishes) AS finishes
+        FROM film_views_daily
+        WHERE day BETWEEN {date_from:Date} AND {date_to:Date}
+        GROUP BY day, video_id
+        ORDER BY day, viewers DESC;
+    """,
+    "watch_time_per_user": """
+        SELECT user_id, sum(watched) AS watched_seconds
+        FROM (
+            SELECT user_id, video_id, maxMerge(watched_seconds) AS watched
+            FROM user_watch_time_daily
+            WHERE day BETWEEN {date_from:Date} AND {date_to:Date}
+            GROUP BY user_id, video_id
+        )
+        GROUP BY user_id
+        ORDER BY watched_seconds DESC;
+    """,
+    "quality_switch_rate": """
+        SELECT
+            video_id,
+            switches,
+            viewers,
+            switches / viewers AS switches_per_viewer
+        FROM (
+            SELECT video_id, countMerge(switches) AS switches
+            FROM quality_switches_daily
+            WHERE day BETWEEN {date_from:Date} AND {date_to:Date}
+            GROUP BY video_id
+        ) AS q
+        INNER JOIN (
+            SELECT video_id, uniqMerge(viewers) AS viewers
+            FROM film_views_daily
+            WHERE day BETWEEN {date_from:Date} AND {date_to:Date}
+            GROUP BY video_id
+        ) AS v USING video_id
+        ORDER BY switches_per_viewer DESC;
+    """,
 }
@@ -1,5 +1,5 @@
 from typing import Literal
-from pydantic import BaseModel, Field
+from pydantic import AliasChoices, BaseModel, Field
 from uuid import UUID
 from datetime import datetime
 
@@ -37,7 +37,10 @@ class VideoProgressPayload(BaseModel):
 
 class BaseUserEvent(BaseModel):
     user_id: UUID
-    ip_address: str
+    # В analitycal_service это поле клиентского события называется user_ip.
+    ip_address: str = Field(
+        validation_alias=AliasChoices("ip_address", "user_ip")
+    )
     user_agent: str
     event_type: Literal[
         "click",
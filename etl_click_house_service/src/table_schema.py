@@ -0,0 +1,50 @@
+from dataclasses import dataclass, field
+from itertools import chain
+from typing import Any
+
+from src.schemas.base_user_event import BaseUserEvent
+
+
+@dataclass
+class TableSchema:
+    """Колонки таблицы ClickHouse в порядке их объявления."""
+
+    names: list[str]
+    types: list[str]
+    defaults: list[Any] = field(init=False)
+
+    def __post_init__(self):
+        # Для массивов значение по умолчанию — пустой массив, остальные
+        # колонки событий других типов остаются NULL.
+        self.defaults = [
+            [] if column_type.startswith("Array(") else None
+            for column_type in self.types
+        ]
+
+    def to_columns(
+        self,
+        events: list[BaseUserEvent],
+        extra: dict[str, list[Any]] | None = None,
+    ) -> list[list[Any]]:
+        """Раскладывает пачку событий по колонкам за один проход.
+
+        Поля события и его payload пишутся сразу в позицию строки в
+        массиве колонки, без промежуточных словарей на каждое событие.
+        Колонки из extra берутся готовыми, по значению на событие.
+        """
+        size = len(events)
+        columns = {
+            name: [default] * size
+            for name, default in zip(self.names, self.defaults)
+        }
+        for name, values in (extra or {}).items():
+            if name in columns:
+                columns[name] = values
+        for row, event in enumerate(events):
+            for key, value in chain(
+                event.__dict__.items(), event.payload.__dict__.items()
+            ):
+                column = columns.get(key)
+                if column is not None and value is not None:
+                    column[row] = value
+        return [columns[name] for name in self.names]
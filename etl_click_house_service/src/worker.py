@@ -0,0 +1,203 @@
+import signal
+import threading
+from multiprocessing.synchronize import Event as ProcessEvent
+
+from kafka import ConsumerRebalanceListener, KafkaConsumer, KafkaProducer
+from kafka.consumer.fetcher import ConsumerRecord
+from logger import logger
+from prometheus_client import start_http_server
+from settings import settings
+
+from src.batch import Batch
+from src.clickhouse import ClickHouse
+from src.decoding import EventDecodeError, decode_event
+from src.helpers.backoff_func_wrapper import backoff
+from src.metrics import (
+    BATCH_AGE,
+    BATCH_BYTES,
+    BATCH_EVENTS,
+    DECODE_ERRORS,
+    FLUSHES,
+)
+
+TABLE = "user_events"
+DECODE_ERROR_HEADER = "x-decode-error"
+
+
+class FlushOnRevoke(ConsumerRebalanceListener):
+    """Сбрасывает пачку воркера до того, как его разделы уйдут другому."""
+
+    def __init__(self, worker: "IngestWorker"):
+        self._worker = worker
+
+    def on_partitions_revoked(self, revoked):
+        logger.info("Воркер %s: отзыв разделов %s", self._worker.id, revoked)
+        self._worker.flush("rebalance")
+
+    def on_partitions_assigned(self, assigned):
+        logger.info("Воркер %s: назначены разделы %s", self._worker.id, assigned)
+        self._worker.skip_loaded(assigned)
+
+
+class IngestWorker:
+    """Один потребитель группы со своей пачкой и клиентом ClickHouse.
+
+    Все воркеры подписаны на топик в одной группе, поэтому Kafka сама
+    распределяет между ними разделы. Перед перераспределением воркер
+    вставляет накопленную пачку и фиксирует её offset'ы, иначе новый
+    владелец раздела прочитал бы те же сообщения повторно. Сообщения,
+    которые не удалось разобрать, пропускаются и при заданном
+    KAFKA_CLICKHOUSE_DEAD_LETTER_TOPIC перекладываются в этот топик.
+    """
+
+    def __init__(
+        self, worker_id: int, stop: threading.Event | ProcessEvent
+    ):
+        self.id = worker_id
+        self._stop = stop
+        self._batch = Batch()
+        self._ch = ClickHouse()
+        self._consumer = KafkaConsumer(
+            **settings.kafka_settings.get_init_conf(),
+            client_id=f"clickhouse-loader-{worker_id}",
+        )
+        self._consumer.subscribe(
+            [settings.kafka_settings.topic_name],
+            listener=FlushOnRevoke(self),
+        )
+        self._dead_letters = None
+        if settings.kafka_settings.dead_letter_topic:
+            self._dead_letters = KafkaProducer(
+                **settings.kafka_settings.get_connection_conf()
+            )
+
+    @backoff(0.1, 2, 10, logger)
+    def _send_dead_letter(self, msg: ConsumerRecord, error: str):
+        headers = list(msg.headers or ())
+        headers.append((DECODE_ERROR_HEADER, error.encode()))
+        self._dead_letters.send(
+            settings.kafka_settings.dead_letter_topic,
+            value=msg.value,
+            key=msg.key,
+            headers=headers,
+        ).get(timeout=30)
+
+    def _reject(self, msg: ConsumerRecord, error: EventDecodeError):
+        """Пропускает сообщение, которое не удалось разобрать.
+
+        Offset сообщения фиксируется вместе с пачкой, поэтому после
+        перезапуска воркер не упирается в него снова.
+        """
+        logger.warning(
+            "Воркер %s: пропущено сообщение %s:%s:%s: %s",
+            self.id,
+            msg.topic,
+            msg.partition,
+            msg.offset,
+            error,
+        )
+        DECODE_ERRORS.inc()
+        if self._dead_letters is not None:
+            self._send_dead_letter(msg, str(error))
+        self._batch.skip(msg)
+
+    def flush(self, reason: str):
+        batch = self._batch
+        if not batch.has_offsets:
+            return
+        if batch.events:
+            self._ch.load_data(
+                TABLE,
+                batch.events,
+                batch.dedup_token(),
+                batch.offset_columns(),
+            )
+        self._consumer.commit(batch.commit_offsets())
+        self._batch = Batch()
+        if not batch.events:
+            return
+
+        FLUSHES.labels(reason).inc()
+        BATCH_EVENTS.labels(reason).observe(len(batch))
+        BATCH_BYTES.labels(reason).observe(batch.nbytes)
+        BATCH_AGE.labels(reason).observe(batch.age)
+        logger.debug(
+            "Воркер %s: сброшено %s событий (%s)", self.id, len(batch), reason
+        )
+
+    def skip_loaded(self, partitions):
+        """Пропускает сообщения разделов, уже вставленные в ClickHouse.
+
+        Пачка могла быть вставлена, но не зафиксирована в Kafka. Границы
+        перечитанной пачки зависят от времени и объёма, поэтому токен
+        дедупликации не совпал бы с прежним, и события задвоились бы.
+        """
+        if not partitions:
+            return
+        loaded = self._ch.last_offsets(
+            settings.kafka_settings.topic_name,
+            [tp.partition for tp in partitions],
+        )
+        for tp in partitions:
+            last = loaded.get(tp.partition)
+            if last is None:
+                continue
+            committed = self._consumer.committed(tp)
+            if committed is None or committed <= last:
+                logger.warning(
+                    "Воркер %s: %s уже загружен до offset'а %s",
+                    self.id,
+                    tp,
+                    last,
+                )
+                self._consumer.seek(tp, last + 1)
+
+    def _poll_timeout_ms(self) -> int:
+        """Ожидание poll не дольше, чем осталось до сброса пачки по времени."""
+        if not self._batch.events:
+            return settings.poll_timeout_ms
+        remaining = settings.batch_linger_seconds - self._batch.age
+        return max(0, min(settings.poll_timeout_ms, int(remaining * 1000)))
+
+    def run(self):
+        # Offset'ы фиксируются только после успешной вставки пачки. Пачка,
+        # вставленная до падения, но не зафиксированная, при назначении
+        # раздела пропускается по позициям Kafka в таблице (skip_loaded).
+        try:
+            while not self._stop.is_set():
+                records = self._consumer.poll(
+                    timeout_ms=self._poll_timeout_ms(),
+                    max_records=settings.batch_size - len(self._batch),
+                )
+                for messages in records.values():
+                    for msg in messages:
+                        try:
+                            event = decode_event(msg.value, msg.headers)
+                        except EventDecodeError as e:
+                            self._reject(msg, e)
+                            continue
+                        self._batch.add(msg, event)
+
+                reason = self._batch.flush_reason(
+                    settings.batch_size,
+                    settings.batch_max_bytes,
+                    settings.batch_linger_seconds,
+                )
+                if reason:
+                    self.flush(reason)
+            self.flush("shutdown")
+        finally:
+            self._consumer.close(autocommit=False)
+            if self._dead_letters is not None:
+                self._dead_letters.close()
+
+
+def run_worker(worker_id: int, stop: threading.Event | ProcessEvent):
+    """Точка входа воркера в отдельном потоке или процессе."""
+    if settings.worker_mode == "process":
+        # Остановкой управляет главный процесс через stop.
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        # У каждого процесса свой реестр метрик и свой порт.
+        start_http_server(settings.metrics_port + worker_id)
+    logger.info("Воркер %s запущен", worker_id)
+    IngestWorker(worker_id, stop).run()
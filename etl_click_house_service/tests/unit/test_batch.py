@@ -0,0 +1,94 @@
+from uuid import uuid4
+
+from kafka.consumer.fetcher import ConsumerRecord
+from kafka.structs import OffsetAndMetadata, TopicPartition
+
+from src.batch import Batch
+from src.schemas.base_user_event import BaseUserEvent
+from src.table_schema import TableSchema
+
+
+def make_record(partition: int, offset: int) -> ConsumerRecord:
+    return ConsumerRecord(
+        topic="event_topic",
+        partition=partition,
+        leader_epoch=0,
+        offset=offset,
+        timestamp=0,
+        timestamp_type=0,
+        key=None,
+        value=b"x" * 10,
+        headers=[],
+        checksum=None,
+        serialized_key_size=-1,
+        serialized_value_size=10,
+        serialized_header_size=-1,
+    )
+
+
+def make_event() -> BaseUserEvent:
+    return BaseUserEvent(
+        user_id=uuid4(),
+        ip_address="127.0.0.1",
+        user_agent="pytest",
+        event_type="video_progress",
+        payload={"video_id": "v1", "watched_seconds": 30},
+    )
+
+
+def make_batch(positions) -> Batch:
+    batch = Batch()
+    for partition, offset in positions:
+        batch.add(make_record(partition, offset), make_event())
+    return batch
+
+
+def test_commit_offsets_point_after_last_message():
+    batch = make_batch([(0, 5), (1, 7), (0, 6)])
+
+    assert batch.commit_offsets() == {
+        TopicPartition("event_topic", 0): OffsetAndMetadata(7, "", -1),
+        TopicPartition("event_topic", 1): OffsetAndMetadata(8, "", -1),
+    }
+
+
+def test_dedup_token_does_not_depend_on_partition_order():
+    first = make_batch([(0, 5), (1, 7)])
+    second = make_batch([(1, 7), (0, 5)])
+
+    assert first.dedup_token() == second.dedup_token()
+    assert first.dedup_token() == "event_topic:0:5-5,event_topic:1:7-7"
+
+
+def test_flush_reason_thresholds():
+    batch = make_batch([(0, 1), (0, 2)])
+
+    assert Batch().flush_reason(2, 100, 60) is None
+    assert batch.flush_reason(2, 100, 60) == "size"
+    assert batch.flush_reason(10, 20, 60) == "bytes"
+    assert batch.flush_reason(10, 100, 0) == "linger"
+    assert batch.flush_reason(10, 100, 60) is None
+
+
+def test_columns_carry_kafka_position():
+    batch = make_batch([(0, 5), (1, 7)])
+    schema = TableSchema(
+        ["user_id", "video_id", "kafka_partition", "kafka_offset"],
+        ["UUID", "Nullable(String)", "UInt32", "UInt64"],
+    )
+
+    columns = schema.to_columns(batch.events, batch.offset_columns())
+
+    assert columns[1] == ["v1", "v1"]
+    assert columns[2] == [0, 1]
+    assert columns[3] == [5, 7]
+
+
+def test_skipped_message_is_committed_without_event():
+    batch = make_batch([(0, 5)])
+    batch.skip(make_record(0, 6))
+
+    assert len(batch) == 1
+    assert batch.commit_offsets() == {
+        TopicPartition("event_topic", 0): OffsetAndMetadata(7, "", -1),
+    }
@@ -0,0 +1,50 @@
+import json
+from uuid import uuid4
+
+import msgpack
+import pytest
+
+from src.decoding import (
+    CONTENT_TYPE_HEADER,
+    MSGPACK_CONTENT_TYPE,
+    EventDecodeError,
+    decode_event,
+)
+
+EVENT = {
+    "user_id": str(uuid4()),
+    "user_ip": "127.0.0.1",
+    "user_agent": "pytest",
+    "event_type": "click",
+    "payload": {"item_id": "1", "item_type": "film"},
+}
+
+
+def test_decodes_double_encoded_json():
+    event = decode_event(json.dumps(json.dumps(EVENT)).encode())
+
+    assert event.ip_address == "127.0.0.1"
+    assert event.payload.item_id == "1"
+
+
+@pytest.mark.parametrize(
+    "value, headers",
+    [
+        (b"not json", None),
+        (json.dumps({**EVENT, "event_type": "unknown"}).encode(), None),
+        (json.dumps({**EVENT, "payload": {}}).encode(), None),
+        (b"\xc1", [(CONTENT_TYPE_HEADER, MSGPACK_CONTENT_TYPE + b"1")]),
+        (
+            msgpack.packb([b"x" * 16, "ip", "ua", 99, 0, []]),
+            [(CONTENT_TYPE_HEADER, MSGPACK_CONTENT_TYPE + b"1")],
+        ),
+        (
+            msgpack.packb([b"x" * 16, "ip", "ua", 0, 0, []]),
+            [(CONTENT_TYPE_HEADER, MSGPACK_CONTENT_TYPE + b"99")],
+        ),
+        (b"{}", [(CONTENT_TYPE_HEADER, MSGPACK_CONTENT_TYPE + b"v1")]),
+    ],
+)
+def test_invalid_messages_raise_decode_error(value, headers):
+    with pytest.raises(EventDecodeError):
+        decode_event(value, headers)
@@ -0,0 +1,117 @@
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+from src.migrations import (
+    BACKFILL_TARGETS,
+    LATEST_VERSION,
+    MIGRATIONS,
+    migrate,
+)
+from src.queries import queries
+
+logger = logging.getLogger("test")
+QUERY_NAMES = {query: name for name, query in queries.items()}
+
+
+class Crash(Exception):
+    pass
+
+
+class FakeClient:
+    """Записывает выполненные шаги миграций и может «упасть» после шага."""
+
+    def __init__(self) -> None:
+        self.executed: list[str] = []
+        self.tables: dict[str, list[list]] = {
+            "schema_migrations": [],
+            "schema_migration_steps": [],
+        }
+        self.swapped = False
+        self.legacy = False
+        self.crash_after: str | None = None
+
+    def command(self, query: str):
+        name = QUERY_NAMES.get(query, query)
+        if name == "user_events_swapped":
+            return int(self.swapped)
+        if name == "user_events_legacy_exists":
+            return int(self.legacy)
+        self.executed.append(name)
+        if name == "swap_user_events_v2":
+            self.swapped = not self.swapped
+        if name == "keep_user_events_legacy":
+            self.legacy = True
+        if name == self.crash_after:
+            self.crash_after = None
+            raise Crash(name)
+
+    def query(self, query: str, parameters: dict | None = None):
+        if "schema_migration_steps" in query:
+            rows = [
+                [step]
+                for version, step in self.tables["schema_migration_steps"]
+                if version == parameters["version"]
+            ]
+        else:
+            rows = [[v] for v, _ in self.tables["schema_migrations"]]
+        return SimpleNamespace(result_rows=rows)
+
+    def insert(self, table: str, data: list[list], column_names: list[str]):
+        self.tables[table].extend(data)
+
+
+def test_fresh_database_applies_every_step_once():
+    client = FakeClient()
+
+    migrate(client, logger)
+    migrate(client, logger)
+
+    steps = [step for _, _, names in MIGRATIONS for step in names]
+    assert [name for name in client.executed if name in steps] == steps
+    assert {v for v, _ in client.tables["schema_migrations"]} == set(
+        range(1, LATEST_VERSION + 1)
+    )
+
+
+@pytest.mark.parametrize(
+    "crash_after",
+    [
+        "backfill_user_events_v2",
+        "swap_user_events_v2",
+        "backfill_film_views_daily",
+        "backfill_kafka_offsets",
+    ],
+)
+def test_crash_resumes_without_repeating_steps(crash_after):
+    client = FakeClient()
+    client.crash_after = crash_after
+
+    with pytest.raises(Crash):
+        migrate(client, logger)
+    migrate(client, logger)
+
+    assert client.swapped
+    assert client.executed.count("swap_user_events_v2") == 1
+    if crash_after.startswith("backfill_"):
+        # Повторный перенос начинается с очистки целевой таблицы.
+        truncate = f"TRUNCATE TABLE {BACKFILL_TARGETS[crash_after]}"
+        assert client.executed.count(truncate) == 2
+        assert client.executed.count(crash_after) == 2
+    else:
+        assert client.executed.count("backfill_user_events_v2") == 1
+
+
+def test_swapped_tables_are_not_refilled_or_swapped_back():
+    # Обмен выполнен, но ни версия, ни шаги миграции не записаны.
+    client = FakeClient()
+    client.tables["schema_migrations"].append([1, "user_events"])
+    client.swapped = True
+
+    migrate(client, logger)
+
+    assert client.swapped
+    assert "TRUNCATE TABLE user_events_v2" not in client.executed
+    assert "backfill_user_events_v2" not in client.executed
+    assert "keep_user_events_legacy" in client.executed
@@ -1,22 +1,114 @@
 from datetime import datetime
 from typing import Generator
+from uuid import UUID
 
 from elasticsearch_dsl import Document
 from psycopg import ServerCursor
 from psycopg import connection as _connection
-from psycopg.rows import class_row
+from psycopg.rows import RowFactory
 
-from .queries import queries
+from .queries import (
+    changed_ids_query,
+    latest_change_query,
+    movie_by_id_range_query,
+    movie_by_ids_query,
+    queries,
+)
+from .serializers import SerializedDocument, register_raw_json
 
 
 def get_index_data(
     conn: _connection,
     index: Document,
+    row_factory: RowFactory[SerializedDocument],
     last_sync_state: datetime,
+    last_sync_id: str,
     batch_size: int = 100,
-) -> Generator[list, None, None]:
+) -> Generator[list[SerializedDocument], None, None]:
+    """Выгружает изменённые записи индекса, начиная с водяного знака.
 
-    with ServerCursor(conn, "fetcher", row_factory=class_row(index)) as cursor:
-        cursor.execute(queries[index], (last_sync_state,))
+    Записи отдаются в порядке (last_change_date, id), поэтому пара
+    значений последней записи пачки однозначно задаёт точку продолжения.
+    """
+
+    with ServerCursor(conn, "fetcher", row_factory=row_factory) as cursor:
+        register_raw_json(cursor.adapters)
+        cursor.execute(queries[index], (last_sync_state, last_sync_id))
+        while results := cursor.fetchmany(size=batch_size):
+            yield results
+
+
+def get_changed_ids(
+    conn: _connection,
+    table: str,
+    column: str,
+    last_sync_state: datetime,
+    last_sync_id: str,
+    batch_size: int = 100,
+) -> Generator[list[tuple[UUID, datetime]], None, None]:
+    """Отдаёт пачки (id, last_change_date) изменённых записей таблицы.
+
+    Каждая пачка — отдельный запрос по индексу с продолжением от последней
+    записи предыдущей пачки, без долгоживущего курсора.
+    """
+    query = changed_ids_query.format(table=table, column=column)
+    while True:
+        with conn.cursor() as cursor:
+            cursor.execute(query, (last_sync_state, last_sync_id, batch_size))
+            results = cursor.fetchall()
+        if not results:
+            return
+        yield results
+        last_sync_id, last_sync_state = results[-1]
+
+
+def get_latest_change(
+    conn: _connection, table: str, column: str
+) -> tuple[UUID, datetime] | None:
+    """Возвращает (id, last_change_date) самой свежей записи таблицы."""
+    with conn.cursor() as cursor:
+        cursor.execute(latest_change_query.format(table=table, column=column))
+        return cursor.fetchone()
+
+
+def get_film_work_ids(
+    conn: _connection, query: str, ids: list[UUID]
+) -> list[UUID]:
+    """Возвращает id фильмов, затронутых изменением записей ids."""
+    with conn.cursor() as cursor:
+        cursor.execute(query, (ids,))
+        return [row[0] for row in cursor.fetchall()]
+
+
+def get_movies_by_ids(
+    conn: _connection,
+    row_factory: RowFactory[SerializedDocument],
+    film_work_ids: list[UUID],
+    batch_size: int = 100,
+) -> Generator[list[SerializedDocument], None, None]:
+    """Собирает документы фильмов только для переданных id, пачками."""
+    for start in range(0, len(film_work_ids), batch_size):
+        with conn.cursor(row_factory=row_factory) as cursor:
+            register_raw_json(cursor.adapters)
+            cursor.execute(
+                movie_by_ids_query,
+                (film_work_ids[start : start + batch_size],),
+            )
+            yield cursor.fetchall()
+
+
+def get_movies_by_id_range(
+    conn: _connection,
+    row_factory: RowFactory[SerializedDocument],
+    lower_id: str,
+    upper_id: str,
+    batch_size: int = 100,
+) -> Generator[list[SerializedDocument], None, None]:
+    """Выгружает фильмы с id в диапазоне (lower_id, upper_id] по порядку id."""
+    with ServerCursor(
+        conn, "movie_shard_fetcher", row_factory=row_factory
+    ) as cursor:
+        register_raw_json(cursor.adapters)
+        cursor.execute(movie_by_id_range_query, (lower_id, upper_id))
         while results := cursor.fetchmany(size=batch_size):
             yield results
@@ -1,10 +1,8 @@
 from documents.person import Person
 
 from .genre import Genre
-from .movie import Movie
 
-queries = {
-    Movie: """
+movie_select = """
             SELECT
                 fw.id,
                 fw.title,
@@ -51,16 +49,94 @@ queries = {
                 LEFT JOIN content.genre_film_work gfw ON gfw.film_work_id = fw.id
                 LEFT JOIN content.genre g ON g.id = gfw.genre_id
                 cross join lateral (values (fw.modified), (pfw.created), (p.modified), (gfw.created), (g.modified)) v(last_change_date)
+                """
+
+movie_by_ids_query = (
+    movie_select
+    + """
+                WHERE fw.id = ANY(%s)
+                GROUP BY fw.id
+                """
+)
+
+# Диапазон (нижняя граница, верхняя граница] по id фильма для
+# шардированной перестройки индекса.
+movie_by_id_range_query = (
+    movie_select
+    + """
+                WHERE fw.id > %s::uuid AND fw.id <= %s::uuid
                 GROUP BY fw.id
-                having max(v.last_change_date) > %s
-                ORDER BY fw.modified
-                """,
+                ORDER BY fw.id
+                """
+)
+
+# Поиск изменённых записей по собственной индексированной колонке времени.
+# Выборка идёт пачками по ключу (время, id), чтобы пачку можно было
+# зафиксировать водяным знаком.
+changed_ids_query = """
+            SELECT id, {column} AS last_change_date
+            FROM content.{table}
+            WHERE ({column}, id) > (%s, %s::uuid)
+            ORDER BY {column}, id
+            LIMIT %s
+            """
+
+latest_change_query = """
+            SELECT id, {column} AS last_change_date
+            FROM content.{table}
+            WHERE {column} IS NOT NULL
+            ORDER BY {column} DESC, id DESC
+            LIMIT 1
+            """
+
+# Стадии поиска изменений для индекса фильмов: таблица-источник, колонка
+# времени и запрос, переводящий id изменённых записей в id затронутых
+# фильмов (None — записи сами являются фильмами).
+movie_change_producers = {
+    "film_work": ("modified", None),
+    "person": (
+        "modified",
+        """
+            SELECT DISTINCT pfw.film_work_id
+            FROM content.person_film_work pfw
+            WHERE pfw.person_id = ANY(%s)
+            """,
+    ),
+    "genre": (
+        "modified",
+        """
+            SELECT DISTINCT gfw.film_work_id
+            FROM content.genre_film_work gfw
+            WHERE gfw.genre_id = ANY(%s)
+            """,
+    ),
+    "person_film_work": (
+        "created",
+        """
+            SELECT DISTINCT pfw.film_work_id
+            FROM content.person_film_work pfw
+            WHERE pfw.id = ANY(%s)
+            """,
+    ),
+    "genre_film_work": (
+        "created",
+        """
+            SELECT DISTINCT gfw.film_work_id
+            FROM content.genre_film_work gfw
+            WHERE gfw.id = ANY(%s)
+            """,
+    ),
+}
+
+queries = {
     Genre: """
             SELECT
                 gr.id,
-                gr.name
+                gr.name,
+                gr.modified as last_change_date
             FROM content.genre AS gr
-            WHERE gr.modified > %s
+            WHERE (gr.modified, gr.id) > (%s, %s::uuid)
+            ORDER BY gr.modified, gr.id
             """,
     Person: """
             SELECT
@@ -74,7 +150,8 @@ queries = {
                         )
                     ),
                     '[]'
-                ) as films
+                ) as films,
+                max(v.last_change_date) last_change_date
             FROM content.person AS p
             LEFT JOIN content.person_film_work pwf ON pwf.person_id = p.id
             LEFT JOIN (
@@ -86,6 +163,7 @@ queries = {
             ) AS roles_array ON roles_array.film_work_id = pwf.film_work_id
             cross join lateral (values (pwf.created), (p.modified)) v(last_change_date)
             GROUP BY p.id
-            having max(v.last_change_date) > %s
+            HAVING (max(v.last_change_date), p.id) > (%s, %s::uuid)
+            ORDER BY last_change_date, p.id
         """,
 }
@@ -0,0 +1,110 @@
+import random
+from logging import Logger
+from typing import Any, NamedTuple
+
+import orjson
+from elasticsearch_dsl import Document
+from psycopg import Cursor
+from psycopg.adapt import AdaptersMap
+from psycopg.postgres import types as pg_types
+from psycopg.rows import RowFactory, RowMaker
+from psycopg.types.string import TextLoader
+
+JSON_OIDS = {pg_types["json"].oid, pg_types["jsonb"].oid}
+
+
+class SerializedDocument(NamedTuple):
+    """Строка выборки, уже превращённая в тело документа Elasticsearch."""
+
+    id: str
+    last_change_date: Any
+    source: bytes
+
+
+def register_raw_json(adapters: AdaptersMap) -> None:
+    """Отдавать json/jsonb текстом, без разбора в объекты Python.
+
+    Агрегаты json_agg из запросов уже имеют вид вложенных документов и
+    вставляются в тело документа как есть.
+    """
+    adapters.register_loader("json", TextLoader)
+    adapters.register_loader("jsonb", TextLoader)
+
+
+def _validate(
+    index: type[Document],
+    names: list[str],
+    raw_json: list[bool],
+    values: tuple,
+    source: bytes,
+    logger: Logger,
+) -> None:
+    """Сверяет быстрый путь с построением документа через elasticsearch_dsl."""
+    data = {
+        name: orjson.loads(value) if raw and value is not None else value
+        for name, raw, value in zip(names, raw_json, values)
+    }
+    try:
+        document = index(**data)
+        document.full_clean()
+        expected = orjson.loads(
+            orjson.dumps(document.to_dict(skip_empty=False))
+        )
+    except Exception as e:
+        logger.warning(
+            "Документ %s %s не прошёл проверку: %s",
+            index.Index.name,
+            data.get("id"),
+            e,
+        )
+        return
+    if orjson.loads(source) != expected:
+        logger.warning(
+            "Документ %s %s отличается от эталонной сериализации",
+            index.Index.name,
+            data.get("id"),
+        )
+
+
+def serialized_row(
+    index: type[Document], logger: Logger, validate_rate: float = 0.0
+) -> RowFactory[SerializedDocument]:
+    """Фабрика строк psycopg, собирающая тело документа сразу в байты.
+
+    Имена колонок и признаки json-колонок вычисляются один раз на запрос,
+    дальше каждая строка кодируется конкатенацией готовых префиксов
+    "<поле>": и значений, закодированных orjson. Для доли validate_rate
+    строк результат сверяется с elasticsearch_dsl.
+    """
+
+    def factory(cursor: Cursor) -> RowMaker[SerializedDocument]:
+        names = [column.name for column in cursor.description]
+        prefixes = [orjson.dumps(name) + b":" for name in names]
+        raw_json = [column.type_code in JSON_OIDS for column in cursor.description]
+        fields = list(zip(prefixes, raw_json))
+        id_position = names.index("id")
+        date_position = names.index("last_change_date")
+
+        def make_row(values: tuple) -> SerializedDocument:
+            source = (
+                b"{"
+                + b",".join(
+                    prefix
+                    + (
+                        value.encode()
+                        if raw and value is not None
+                        else orjson.dumps(value)
+                    )
+                    for (prefix, raw), value in zip(fields, values)
+                )
+                + b"}"
+            )
+            if validate_rate and random.random() < validate_rate:
+                _validate(index, names, raw_json, values, source, logger)
+            return SerializedDocument(
+                str(values[id_position]), values[date_position], source
+            )
+
+        return make_row
+
+    return factory
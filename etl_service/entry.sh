@@ -20,4 +20,4 @@ done
 echo "✅ Elasticsearch доступен"
 
 echo "🚀 Запускаем ETL"
-exec python /opt/app/main.py
\ No newline at end of file
+exec python /opt/app/main.py "$@"
\ No newline at end of file
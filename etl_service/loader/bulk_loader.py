@@ -0,0 +1,240 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from logging import Logger
+from queue import Queue
+from typing import Any, Callable, Iterable
+
+from documents.serializers import SerializedDocument
+from elasticsearch import Elasticsearch
+from elasticsearch.helpers import streaming_bulk
+from helpers.backoff_func_wrapper import backoff
+
+
+class BulkLoadError(Exception):
+    """Часть документов пачки не записана в Elasticsearch."""
+
+
+@dataclass
+class Batch:
+    """Пачка bulk-действий и отметка, которую она закрывает.
+
+    checkpoint вызывается только после того, как эта пачка и все пачки,
+    поставленные в очередь до неё, записаны в Elasticsearch.
+    """
+
+    actions: list[dict[str, Any]]
+    nbytes: int
+    checkpoint: Callable[[], None] | None = None
+    enqueued_at: float = 0.0
+
+
+@dataclass
+class LoadStats:
+    """Метрики одной загрузки."""
+
+    docs: int = 0
+    bytes: int = 0
+    batches: int = 0
+    failed: int = 0
+    queue_wait: float = 0.0
+    errors: list[dict[str, Any]] = field(default_factory=list)
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: float | None = None
+
+    @property
+    def elapsed(self) -> float:
+        finished_at = self.finished_at or time.monotonic()
+        return max(finished_at - self.started_at, 1e-9)
+
+    @property
+    def docs_per_second(self) -> float:
+        return self.docs / self.elapsed
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes / self.elapsed
+
+    @property
+    def avg_queue_wait(self) -> float:
+        """Среднее время ожидания пачки в очереди.
+
+        Близко к нулю — узкое место в чтении из Postgres, растёт —
+        в записи в Elasticsearch.
+        """
+        if not self.batches:
+            return 0.0
+        return self.queue_wait / self.batches
+
+    @classmethod
+    def merge(cls, parts: list["LoadStats"], started_at: float) -> "LoadStats":
+        """Сводит метрики параллельных загрузок в одну.
+
+        Время берётся общее для всех частей, поэтому скорость отражает
+        суммарную пропускную способность.
+        """
+        total = cls(started_at=started_at, finished_at=time.monotonic())
+        for part in parts:
+            total.docs += part.docs
+            total.bytes += part.bytes
+            total.batches += part.batches
+            total.failed += part.failed
+            total.queue_wait += part.queue_wait
+            total.errors.extend(part.errors)
+        return total
+
+    def log(self, logger: Logger, name: str) -> None:
+        logger.info(
+            "%s: %s документов, %s байт за %.1f с "
+            "(%.0f docs/s, %.0f B/s), ожидание в очереди %.3f с, ошибок %s",
+            name,
+            self.docs,
+            self.bytes,
+            self.elapsed,
+            self.docs_per_second,
+            self.bytes_per_second,
+            self.avg_queue_wait,
+            self.failed,
+        )
+
+
+class BulkLoader:
+    """Конвейерная загрузка в Elasticsearch.
+
+    Чтение из источника и запись в Elasticsearch идут одновременно:
+    читатель кладёт готовые пачки в ограниченную очередь, пул писателей
+    отправляет их через streaming_bulk. Ошибки соединения повторяются.
+    Если не записался хотя бы один документ пачки, её отметка и все
+    следующие не срабатывают, а загрузка завершается BulkLoadError:
+    водяной знак остаётся перед пачкой, и следующий цикл повторит её.
+    """
+
+    def __init__(
+        self,
+        client: Elasticsearch,
+        logger: Logger,
+        workers: int = 2,
+        queue_size: int = 4,
+        chunk_size: int = 500,
+        max_chunk_bytes: int = 10 * 1024 * 1024,
+        max_retries: int = 3,
+        max_errors: int = 100,
+    ) -> None:
+        self._client = client
+        self._logger = logger
+        self._workers = workers
+        self._queue_size = queue_size
+        self._chunk_size = chunk_size
+        self._max_chunk_bytes = max_chunk_bytes
+        self._max_retries = max_retries
+        self._max_errors = max_errors
+        self._write = backoff(0.1, 2, 10, logger)(self._bulk)
+
+    def make_actions(
+        self, index_name: str, documents: list[SerializedDocument]
+    ) -> list[dict[str, Any]]:
+        """Готовит bulk-действия с уже сериализованным телом документа."""
+        return [
+            {"_index": index_name, "_id": doc.id, "_source": doc.source}
+            for doc in documents
+        ]
+
+    def make_batch(
+        self,
+        actions: list[dict[str, Any]],
+        checkpoint: Callable[[], None] | None = None,
+    ) -> Batch:
+        return Batch(
+            actions=actions,
+            nbytes=sum(len(action["_source"]) for action in actions),
+            checkpoint=checkpoint,
+        )
+
+    def load(self, batches: Iterable[Batch]) -> LoadStats:
+        """Загружает пачки и возвращает метрики загрузки."""
+        stats = LoadStats()
+        queue: Queue[tuple[int, Batch] | None] = Queue(
+            maxsize=self._queue_size
+        )
+        done: dict[int, Batch] = {}
+        lock = threading.Lock()
+        failures: list[Exception] = []
+        next_commit = 0
+
+        def complete(seq: int, batch: Batch, errors: list[dict]) -> None:
+            nonlocal next_commit
+            with lock:
+                stats.docs += len(batch.actions) - len(errors)
+                stats.bytes += batch.nbytes
+                stats.batches += 1
+                stats.failed += len(errors)
+                free = self._max_errors - len(stats.errors)
+                stats.errors.extend(errors[: max(free, 0)])
+                if errors:
+                    failures.append(
+                        BulkLoadError(
+                            f"Не записано {len(errors)} документов пачки {seq}"
+                        )
+                    )
+                    return
+                # Отметки фиксируются строго по порядку постановки в
+                # очередь, чтобы не перескочить незаписанную пачку.
+                done[seq] = batch
+                while next_commit in done:
+                    committed = done.pop(next_commit)
+                    if committed.checkpoint is not None:
+                        committed.checkpoint()
+                    next_commit += 1
+
+        def writer() -> None:
+            while (item := queue.get()) is not None:
+                if failures:
+                    # Очередь дочитывается, чтобы читатель не завис на put.
+                    continue
+                seq, batch = item
+                with lock:
+                    stats.queue_wait += time.monotonic() - batch.enqueued_at
+                try:
+                    errors = self._write(batch)
+                    for error in errors:
+                        self._logger.warning("Документ не загружен: %s", error)
+                    complete(seq, batch, errors)
+                except Exception as e:
+                    failures.append(e)
+
+        threads = [
+            threading.Thread(target=writer, daemon=True)
+            for _ in range(self._workers)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for seq, batch in enumerate(batches):
+                if failures:
+                    break
+                batch.enqueued_at = time.monotonic()
+                queue.put((seq, batch))
+        finally:
+            for _ in threads:
+                queue.put(None)
+            for thread in threads:
+                thread.join()
+        stats.finished_at = time.monotonic()
+        if failures:
+            raise failures[0]
+        return stats
+
+    def _bulk(self, batch: Batch) -> list[dict[str, Any]]:
+        errors = []
+        for ok, item in streaming_bulk(
+            self._client,
+            batch.actions,
+            chunk_size=self._chunk_size,
+            max_chunk_bytes=self._max_chunk_bytes,
+            max_retries=self._max_retries,
+            raise_on_error=False,
+            yield_ok=False,
+        ):
+            if not ok:
+                errors.append(item)
+        return errors
@@ -0,0 +1,89 @@
+import json
+import threading
+import time
+from logging import Logger
+from typing import Callable
+
+from redis import Redis
+
+
+class CacheInvalidator:
+    """Сбрасывает кэш content_service для переиндексированных документов.
+
+    Ключи удаляются из Redis напрямую, а id публикуются в канал, чтобы
+    воркеры content_service выбросили свои копии из кэша процесса. Через
+    redelete_delay секунд ключи удаляются ещё раз: загрузка, прочитавшая
+    документ до переиндексации, могла успеть записать его обратно.
+
+    Сброс выполняется из отметки пачки под блокировкой загрузчика, поэтому
+    делается не больше attempts попыток: если Redis недоступен, ошибка
+    записывается в лог, а загрузка продолжается. Устаревшие копии тогда
+    живут в кэше до истечения TTL.
+    """
+
+    def __init__(
+        self,
+        client: Redis,
+        logger: Logger,
+        key_template: str = "content:movies:v3:id:{id}",
+        channel: str = "content:invalidate:movies",
+        redelete_delay: float = 2,
+        attempts: int = 3,
+        retry_delay: float = 0.1,
+    ) -> None:
+        self._client = client
+        self._logger = logger
+        self._key_template = key_template
+        self._channel = channel
+        self._redelete_delay = redelete_delay
+        self._attempts = attempts
+        self._retry_delay = retry_delay
+
+    def _keys(self, ids: list[str]) -> list[str]:
+        return [self._key_template.format(id=id_) for id_ in ids]
+
+    def _send(self, ids: list[str]) -> None:
+        pipe = self._client.pipeline(transaction=False)
+        pipe.delete(*self._keys(ids))
+        pipe.publish(self._channel, json.dumps(ids))
+        pipe.execute()
+
+    def _invalidate(self, ids: list[str]) -> bool:
+        for attempt in range(1, self._attempts + 1):
+            try:
+                self._send(ids)
+                return True
+            except Exception as e:
+                self._logger.warning(
+                    "Не удалось сбросить кэш (попытка %s из %s): %s",
+                    attempt,
+                    self._attempts,
+                    e,
+                )
+                if attempt < self._attempts:
+                    time.sleep(self._retry_delay * 2 ** (attempt - 1))
+        return False
+
+    def _redelete(self, ids: list[str]) -> None:
+        try:
+            self._client.delete(*self._keys(ids))
+        except Exception as e:
+            self._logger.warning("Не удалось повторно сбросить кэш: %s", e)
+
+    def invalidate(self, ids: list[str]) -> None:
+        if not ids:
+            return
+        if not self._invalidate(ids):
+            self._logger.error("Кэш %s документов не сброшен", len(ids))
+            return
+        self._logger.debug("Сброшен кэш %s документов", len(ids))
+        if self._redelete_delay:
+            timer = threading.Timer(
+                self._redelete_delay, self._redelete, args=(ids,)
+            )
+            timer.daemon = True
+            timer.start()
+
+    def callback(self, ids: list[str]) -> Callable[[], None]:
+        """Отметка пачки: кэш сбрасывается, когда документы уже записаны."""
+        return lambda: self.invalidate(ids)
@@ -0,0 +1,118 @@
+from datetime import datetime, timezone
+from logging import Logger
+
+from documents.index_settings import index_settings
+from elasticsearch import Elasticsearch
+from elasticsearch_dsl import Document
+
+
+def _versioned_name(alias: str) -> str:
+    return f"{alias}_{datetime.now(timezone.utc):%Y%m%d%H%M%S%f}"
+
+
+def _aliased_indices(client: Elasticsearch, alias: str) -> list[str]:
+    if not client.indices.exists_alias(name=alias):
+        return []
+    return list(client.indices.get_alias(name=alias).body)
+
+
+def init_index(document: type[Document], client: Elasticsearch) -> None:
+    """Готовит индекс к инкрементальной загрузке через алиас.
+
+    Если индекса ещё нет, создаётся версионный индекс и на него вешается
+    алиас с именем документа; иначе обновляется маппинг существующего.
+    Настройки индекса Elasticsearch отдаёт под его настоящим именем, поэтому
+    за алиасом обновляется каждый индекс, на который он указывает.
+    """
+    alias = document.Index.name
+    published = _aliased_indices(client, alias)
+    if published:
+        for name in published:
+            document._index.clone(name=name).save(using=client)
+        return
+    if client.indices.exists(index=alias):
+        # Индекс, созданный до перехода на алиасы.
+        document.init(using=client)
+        return
+    name = _versioned_name(alias)
+    document.init(index=name, using=client)
+    client.indices.update_aliases(
+        actions=[{"add": {"index": name, "alias": alias}}]
+    )
+
+
+def create_build_index(
+    document: type[Document],
+    client: Elasticsearch,
+    logger: Logger,
+    resume: str | None = None,
+) -> str:
+    """Создаёт версионный индекс для полной перестройки.
+
+    Обновление отключено и реплик нет, чтобы bulk-загрузка шла на полной
+    скорости; настройки восстанавливаются в publish_index. Недостроенный
+    индекс resume прерванной перестройки не удаляется, а возвращается,
+    чтобы загрузка продолжилась в него; остальные недостроенные удаляются.
+    """
+    alias = document.Index.name
+    published = _aliased_indices(client, alias)
+    for orphan in client.indices.get(index=f"{alias}_*").body:
+        if orphan not in published and orphan != resume:
+            logger.warning("Удаляем недостроенный индекс %s", orphan)
+            client.indices.delete(index=orphan)
+
+    if (
+        resume is not None
+        and resume not in published
+        and client.indices.exists(index=resume)
+    ):
+        logger.info("Продолжаем перестройку %s в индексе %s", alias, resume)
+        return resume
+
+    name = _versioned_name(alias)
+    index = document._index.clone(name=name)
+    index.settings(number_of_replicas=0, refresh_interval="-1")
+    index.create(using=client)
+    logger.info("Создан индекс %s для перестройки %s", name, alias)
+    return name
+
+
+def publish_index(
+    document: type[Document],
+    client: Elasticsearch,
+    name: str,
+    replicas: int,
+    logger: Logger,
+) -> None:
+    """Доводит построенный индекс до боевого состояния и переключает алиас.
+
+    Старые индексы удаляются только после атомарной смены алиаса, так что
+    читатели всегда видят полностью построенный индекс.
+    """
+    alias = document.Index.name
+    client.options(request_timeout=3600).indices.forcemerge(
+        index=name, max_num_segments=1
+    )
+    client.indices.put_settings(
+        index=name,
+        settings={
+            "number_of_replicas": replicas,
+            "refresh_interval": index_settings["refresh_interval"],
+        },
+    )
+    client.indices.refresh(index=name)
+    client.cluster.health(index=name, wait_for_status="yellow")
+
+    previous = _aliased_indices(client, alias)
+    actions = [{"remove": {"index": old, "alias": alias}} for old in previous]
+    if not previous and client.indices.exists(index=alias):
+        # Индекс, созданный до перехода на алиасы, удаляется той же
+        # атомарной операцией, чтобы имя освободилось под алиас.
+        actions.append({"remove_index": {"index": alias}})
+    actions.append({"add": {"index": name, "alias": alias}})
+    client.indices.update_aliases(actions=actions)
+    logger.info("Алиас %s переключён на %s", alias, name)
+
+    for old in previous:
+        client.indices.delete(index=old)
+        logger.info("Удалён старый индекс %s", old)
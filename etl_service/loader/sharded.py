@@ -0,0 +1,112 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Generator
+from uuid import UUID
+
+import psycopg
+from documents.load_data import get_movies_by_id_range
+from documents.movie import Movie
+from documents.serializers import serialized_row
+from elasticsearch_dsl import connections
+from loader.bulk_loader import Batch, BulkLoader, LoadStats
+from logger import logger
+from psycopg.conninfo import make_conninfo
+from settings import settings
+from state_manager.factory import get_storage
+from state_manager.state_manager import StateManager
+from state_manager.watermark import MIN_SYNC_ID, Watermark, get_state_key
+
+MAX_SYNC_ID = "ffffffff-ffff-ffff-ffff-ffffffffffff"
+
+
+def get_shard_bounds(shards: int) -> list[tuple[str, str]]:
+    """Делит пространство UUID на shards равных диапазонов (lower, upper]."""
+    step = (1 << 128) // shards
+    bounds = [str(UUID(int=step * shard)) for shard in range(shards)]
+    bounds.append(MAX_SYNC_ID)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def get_shard_state_key(index_name: str, shard: int) -> str:
+    return get_state_key(index_name, f"shard_{shard}")
+
+
+def _shard_batches(
+    conn: psycopg.Connection,
+    loader: BulkLoader,
+    watermark: Watermark,
+    index_name: str,
+    lower_id: str,
+    upper_id: str,
+) -> Generator[Batch, None, None]:
+    row_factory = serialized_row(
+        Movie, logger, settings.loader_settings.validate_sample_rate
+    )
+    for movies in get_movies_by_id_range(
+        conn,
+        row_factory,
+        lower_id,
+        upper_id,
+        settings.loader_settings.fetch_size,
+    ):
+        yield loader.make_batch(
+            loader.make_actions(index_name, movies),
+            watermark.checkpoint(movies[-1].last_change_date, movies[-1].id),
+        )
+
+
+def load_movie_shard(
+    index_name: str, shard: int, lower_id: str, upper_id: str
+) -> LoadStats:
+    """Загружает в index_name фильмы одного диапазона id.
+
+    Выполняется в отдельном процессе со своими соединениями с Postgres и
+    Elasticsearch. Прогресс шарда хранится в общем хранилище состояния
+    под именем строящегося индекса; перестройка, повторённая после падения,
+    продолжает в тот же индекс, и шард начинает с последней отметки. Ключи
+    шардов удаляются после публикации индекса.
+    """
+    client = connections.create_connection(
+        hosts=settings.elasticsearch_settings.get_host()
+    )
+    loader = BulkLoader(
+        client, logger, **settings.loader_settings.get_loader_conf()
+    )
+    state_manager = StateManager(get_storage(settings, logger))
+    watermark = Watermark(
+        state_manager, get_shard_state_key(index_name, shard)
+    )
+    _, last_sync_id = watermark.position
+    if last_sync_id != MIN_SYNC_ID:
+        lower_id = last_sync_id
+    logger.info("Шард %s: фильмы с id в (%s, %s]", shard, lower_id, upper_id)
+
+    dsn = make_conninfo(**settings.database_settings.get_dsn())
+    with psycopg.connect(dsn) as conn:
+        stats = loader.load(
+            _shard_batches(
+                conn, loader, watermark, index_name, lower_id, upper_id
+            )
+        )
+    stats.log(logger, f"{index_name} шард {shard}")
+    return stats
+
+
+def load_movies_sharded(index_name: str, workers: int) -> LoadStats:
+    """Загружает все фильмы в index_name пулом из workers процессов.
+
+    Каждый процесс сам читает, сериализует и отправляет свой диапазон id,
+    так что построение документов не упирается в одно ядро.
+    """
+    started_at = time.monotonic()
+    # spawn: дочерние процессы не должны наследовать открытые соединения.
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=get_context("spawn")
+    ) as pool:
+        futures = [
+            pool.submit(load_movie_shard, index_name, shard, lower, upper)
+            for shard, (lower, upper) in enumerate(get_shard_bounds(workers))
+        ]
+        parts = [future.result() for future in futures]
+    return LoadStats.merge(parts, started_at)
@@ -1,77 +1,303 @@
+import argparse
 import time
-from datetime import datetime
-from typing import Any, Generator
+from typing import Generator
 
 import psycopg
-import pytz
-from dateutil import parser
 from documents.genre import Genre
-from documents.load_data import get_index_data
+from documents.load_data import (
+    get_changed_ids,
+    get_film_work_ids,
+    get_index_data,
+    get_latest_change,
+    get_movies_by_ids,
+)
 from documents.movie import Movie
 from documents.person import Person
-from elasticsearch.helpers import bulk
-from elasticsearch_dsl import connections
-from helpers.backoff_func_wrapper import backoff
+from documents.queries import movie_change_producers
+from documents.serializers import serialized_row
+from elasticsearch_dsl import Document, connections
+from elasticsearch import Elasticsearch
+from loader.bulk_loader import Batch, BulkLoader
+from loader.cache_invalidation import CacheInvalidator
+from loader.reindex import create_build_index, init_index, publish_index
+from loader.sharded import get_shard_state_key, load_movies_sharded
 from logger import logger
 from psycopg.conninfo import make_conninfo
 from settings import settings
-from state_manager.json_file_storage import JsonFileStorage
+from state_manager.factory import get_storage
 from state_manager.state_manager import StateManager
+from state_manager.watermark import Watermark, get_state_key, make_state
 
+indexes = [
+    index
+    for index in (Genre, Movie, Person)
+    if index.Index.name in settings.index_names
+]
 
-@backoff(0.1, 2, 10, logger)
-def _send_to_es(es_load_data: Generator[dict[str, Any], Any, None]):
-    bulk(
-        connections.get_connection(),
-        es_load_data,
+
+def index_batches(
+    conn: psycopg.Connection,
+    loader: BulkLoader,
+    state_manager: StateManager,
+    index: type[Document],
+    index_name: str,
+) -> Generator[Batch, None, None]:
+    watermark = Watermark(state_manager, get_state_key(index_name))
+    last_sync_state, last_sync_id = watermark.position
+    logger.info(
+        "Синхронизация %s с %s (%s)",
+        index_name,
+        last_sync_state,
+        last_sync_id,
+    )
+
+    row_factory = serialized_row(
+        index, logger, settings.loader_settings.validate_sample_rate
+    )
+    for rows in get_index_data(
+        conn,
+        index,
+        row_factory,
+        last_sync_state,
+        last_sync_id,
+        settings.loader_settings.fetch_size,
+    ):
+        # Водяной знак двигается только после успешной отправки пачки,
+        # поэтому после падения загрузка продолжится с этой точки.
+        yield loader.make_batch(
+            loader.make_actions(index_name, rows),
+            watermark.checkpoint(rows[-1].last_change_date, rows[-1].id),
+        )
+
+
+def movie_batches(
+    conn: psycopg.Connection,
+    loader: BulkLoader,
+    state_manager: StateManager,
+    index_name: str,
+    stages: list[str] | None = None,
+    invalidator: CacheInvalidator | None = None,
+) -> Generator[Batch, None, None]:
+    """Переиндексирует только фильмы, затронутые изменениями.
+
+    Для каждой таблицы-источника изменения ищутся по её собственной
+    колонке времени, переводятся в id фильмов, и тяжёлый запрос сборки
+    документа выполняется только для этих фильмов. С invalidator после
+    записи пачки сбрасывается кэш именно этих фильмов.
+    """
+    batch_size = settings.loader_settings.fetch_size
+    row_factory = serialized_row(
+        Movie, logger, settings.loader_settings.validate_sample_rate
     )
+    for stage in stages or movie_change_producers:
+        column, film_work_query = movie_change_producers[stage]
+        watermark = Watermark(state_manager, get_state_key(index_name, stage))
+        last_sync_state, last_sync_id = watermark.position
+        logger.info(
+            "Поиск изменений %s с %s (%s)",
+            stage,
+            last_sync_state,
+            last_sync_id,
+        )
 
+        for changed in get_changed_ids(
+            conn, stage, column, last_sync_state, last_sync_id, batch_size
+        ):
+            ids = [row[0] for row in changed]
+            if film_work_query is None:
+                film_work_ids = ids
+            else:
+                film_work_ids = get_film_work_ids(conn, film_work_query, ids)
 
-def get_state():
-    state_manager = StateManager(JsonFileStorage(logger=logger))
+            for movies in get_movies_by_ids(
+                conn, row_factory, film_work_ids, batch_size
+            ):
+                invalidate = None
+                if invalidator is not None:
+                    invalidate = invalidator.callback(
+                        [movie.id for movie in movies]
+                    )
+                yield loader.make_batch(
+                    loader.make_actions(index_name, movies), invalidate
+                )
 
-    last_sync_state = state_manager.get_state("movie_index_last_sync_state")
+            # Пустая пачка-отметка: сработает после записи всех фильмов,
+            # затронутых этой пачкой изменений.
+            last_id, last_change_date = changed[-1]
+            yield loader.make_batch(
+                [], watermark.checkpoint(last_change_date, last_id)
+            )
+
+
+def index_stages(index: type[Document]) -> list[str | None]:
+    if index is Movie:
+        return list(movie_change_producers)
+    return [None]
+
+
+def rebuild_index(
+    conn: psycopg.Connection,
+    client: Elasticsearch,
+    loader: BulkLoader,
+    state_manager: StateManager,
+    index: type[Document],
+) -> None:
+    """Полностью перестраивает индекс в новый версионный индекс.
+
+    Водяные знаки перестройки хранятся под именем нового индекса и
+    переносятся в боевые ключи только после переключения алиаса. Имя
+    строящегося индекса запоминается в состоянии, поэтому повторный запуск
+    после падения продолжает загрузку в него с сохранённых отметок.
+    """
+    alias = index.Index.name
+    workers = settings.loader_settings.shard_workers
+    build_key = get_state_key(alias, "build")
+    build = state_manager.get_state(build_key)
+    # Отметки шардов годятся только для того же разбиения на диапазоны.
+    resume = None
+    if build is not None and build["shards"] == workers:
+        resume = build["index"]
+    build_name = create_build_index(index, client, logger, resume=resume)
+    if build_name != resume:
+        if build is not None:
+            forget_build_state(state_manager, index, build)
+        build = {"index": build_name, "shards": workers}
+        state_manager.set_state(build_key, build)
+
+    if index is Movie:
+        # Без шардирования все фильмы перечисляются стадией film_work.
+        # Остальным стадиям достаточно запомнить текущую точку, чтобы
+        # изменения, сделанные во время перестройки, подхватила
+        # инкрементальная загрузка.
+        for stage, (column, _) in movie_change_producers.items():
+            if stage == "film_work" and workers == 1:
+                continue
+            stage_key = get_state_key(build_name, stage)
+            if state_manager.get_state(stage_key) is not None:
+                continue
+            latest = get_latest_change(conn, stage, column)
+            if latest is not None:
+                last_id, last_change_date = latest
+                state_manager.set_state(
+                    stage_key, make_state(last_change_date, last_id)
+                )
 
-    if last_sync_state is None:
-        last_sync_state = pytz.UTC.localize(datetime.min)
+    if index is Movie and workers > 1:
+        stats = load_movies_sharded(build_name, workers)
     else:
-        last_sync_state = parser.isoparse(last_sync_state)
-    return last_sync_state, state_manager
+        if index is Movie:
+            batches = movie_batches(
+                conn, loader, state_manager, build_name, ["film_work"]
+            )
+        else:
+            batches = index_batches(
+                conn, loader, state_manager, index, build_name
+            )
+        stats = loader.load(batches)
+    stats.log(logger, build_name)
+
+    publish_index(
+        index,
+        client,
+        build_name,
+        settings.elasticsearch_settings.replicas,
+        logger,
+    )
+    for stage in index_stages(index):
+        state = state_manager.get_state(get_state_key(build_name, stage))
+        if state is not None:
+            state_manager.set_state(get_state_key(alias, stage), state)
+    forget_build_state(state_manager, index, build)
+    state_manager.delete_state(build_key)
+
+
+def forget_build_state(
+    state_manager: StateManager, index: type[Document], build: dict
+) -> None:
+    """Удаляет водяные знаки перестройки в индекс build["index"]."""
+    for stage in index_stages(index):
+        state_manager.delete_state(get_state_key(build["index"], stage))
+    for shard in range(build["shards"]):
+        state_manager.delete_state(get_shard_state_key(build["index"], shard))
 
 
-indexes = [Genre, Movie, Person]
+def get_cache_invalidator() -> CacheInvalidator | None:
+    cache_settings = settings.cache_settings
+    if cache_settings.redis_url is None:
+        return None
+    from redis import Redis
+
+    return CacheInvalidator(
+        Redis.from_url(
+            cache_settings.redis_url,
+            socket_timeout=cache_settings.timeout,
+            socket_connect_timeout=cache_settings.timeout,
+        ),
+        logger,
+        key_template=cache_settings.key_template,
+        channel=cache_settings.channel,
+        redelete_delay=cache_settings.redelete_delay,
+        attempts=cache_settings.attempts,
+    )
 
 
-def update_indexs():
-    connections.create_connection(
+def update_indexs(
+    state_manager: StateManager,
+    rebuild: bool = False,
+    invalidator: CacheInvalidator | None = None,
+):
+    client = connections.create_connection(
         hosts=settings.elasticsearch_settings.get_host()
     )
-    last_sync_state, state_manager = get_state()
+    loader = BulkLoader(
+        client, logger, **settings.loader_settings.get_loader_conf()
+    )
 
     database_settings = settings.database_settings.get_dsn()
     dsn = make_conninfo(**database_settings)
 
     with psycopg.connect(dsn) as conn:
-
         for index in indexes:
-            index.init()
-
-            for rows in get_index_data(conn, index, last_sync_state, 100):
-                es_load_data = (
-                    dict(d.to_dict(True, skip_empty=False), **{"_id": d.id})
-                    for d in rows
+            if rebuild:
+                rebuild_index(conn, client, loader, state_manager, index)
+                continue
+            init_index(index, client)
+            name = index.Index.name
+            if index is Movie:
+                batches = movie_batches(
+                    conn, loader, state_manager, name, invalidator=invalidator
                 )
-                _send_to_es(es_load_data)
-
-    state_manager.set_state(
-        "movie_index_last_sync_state", last_sync_state.isoformat()
-    )
+            else:
+                batches = index_batches(
+                    conn, loader, state_manager, index, name
+                )
+            stats = loader.load(batches)
+            stats.log(logger, name)
 
 
 if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="перестроить индексы с нуля и переключить алиасы",
+    )
+    arg_parser.add_argument(
+        "--workers",
+        type=int,
+        help="число процессов для перестройки индекса фильмов",
+    )
+    args = arg_parser.parse_args()
+    if args.workers:
+        settings.loader_settings.shard_workers = args.workers
+
+    state_manager = StateManager(get_storage(settings, logger))
+    invalidator = get_cache_invalidator()
+    if args.rebuild:
+        update_indexs(state_manager, rebuild=True)
     while True:
         try:
-            update_indexs()
-            time.sleep(60)
+            update_indexs(state_manager, invalidator=invalidator)
         except Exception as e:
             logger.exception(e)
+        time.sleep(60)
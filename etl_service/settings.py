@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -18,15 +20,80 @@ class ElasticsearchSettings(BaseSettings):
     model_config = SettingsConfigDict(env_prefix="es_")
     host: str = Field(..., alias="ELASTIC_HOST")
     port: str = Field(..., alias="ELASTIC_PORT")
+    replicas: int = Field(1, alias="ETL_INDEX_REPLICAS")
 
     def get_host(self):
         return f"http://{self.host}:{self.port}"
 
 
+class LoaderSettings(BaseSettings):
+    fetch_size: int = Field(500, alias="ETL_FETCH_SIZE")
+    workers: int = Field(2, alias="ETL_BULK_WORKERS")
+    queue_size: int = Field(4, alias="ETL_BULK_QUEUE_SIZE")
+    chunk_size: int = Field(500, alias="ETL_BULK_CHUNK_SIZE")
+    max_chunk_bytes: int = Field(
+        10 * 1024 * 1024, alias="ETL_BULK_MAX_CHUNK_BYTES"
+    )
+    max_retries: int = Field(3, alias="ETL_BULK_MAX_RETRIES")
+    shard_workers: int = Field(1, alias="ETL_SHARD_WORKERS")
+    # Доля документов, которые быстрый сериализатор сверяет с
+    # elasticsearch_dsl (0 — проверка выключена).
+    validate_sample_rate: float = Field(
+        0.0, alias="ETL_VALIDATE_SAMPLE_RATE"
+    )
+
+    def get_loader_conf(self) -> dict:
+        return self.model_dump(
+            exclude={"fetch_size", "shard_workers", "validate_sample_rate"}
+        )
+
+
+class StateSettings(BaseSettings):
+    backend: Literal["file", "redis", "postgres"] = Field(
+        "file", alias="ETL_STATE_BACKEND"
+    )
+    file_path: str = Field(
+        "./storage/state_storage.json", alias="ETL_STATE_FILE"
+    )
+    redis_url: str = Field(
+        "redis://localhost:6379/0", alias="ETL_STATE_REDIS_URL"
+    )
+    redis_key: str = Field("etl_state", alias="ETL_STATE_REDIS_KEY")
+    postgres_schema: str = Field("public", alias="ETL_STATE_SCHEMA")
+    postgres_table: str = Field("etl_state", alias="ETL_STATE_TABLE")
+
+
+class CacheSettings(BaseSettings):
+    # Redis content_service; без адреса кэш не сбрасывается.
+    redis_url: str | None = Field(None, alias="ETL_CACHE_REDIS_URL")
+    # Ключ фильма в кэше content_service.
+    key_template: str = Field(
+        "content:movies:v3:id:{id}", alias="ETL_CACHE_KEY_TEMPLATE"
+    )
+    channel: str = Field(
+        "content:invalidate:movies", alias="ETL_CACHE_INVALIDATION_CHANNEL"
+    )
+    # Повторное удаление ключей после сброса, 0 — без повтора.
+    redelete_delay: float = Field(2, alias="ETL_CACHE_REDELETE_DELAY")
+    # Таймаут запросов и число попыток сброса; после них загрузка идёт дальше.
+    timeout: float = Field(1, alias="ETL_CACHE_TIMEOUT")
+    attempts: int = Field(3, alias="ETL_CACHE_ATTEMPTS")
+
+
 class Settings(BaseSettings):
     debug: bool = Field(..., alias="DEBUG")
     database_settings: DatabaseSettings = DatabaseSettings()
     elasticsearch_settings: ElasticsearchSettings = ElasticsearchSettings()
+    loader_settings: LoaderSettings = LoaderSettings()
+    state_settings: StateSettings = StateSettings()
+    cache_settings: CacheSettings = CacheSettings()
+    # Индексы, которые обрабатывает этот процесс. Несколько ETL-процессов
+    # с общим хранилищем состояния делят индексы между собой.
+    indexes: str = Field("genres,movies,persons", alias="ETL_INDEXES")
+
+    @property
+    def index_names(self) -> list[str]:
+        return [name.strip() for name in self.indexes.split(",") if name]
 
 
 settings = Settings()
@@ -3,8 +3,24 @@ from typing import Any
 
 
 class BaseStorage(abc.ABC):
+    """Хранилище состояния ETL с операциями над отдельными ключами.
+
+    Операции над ключом не затрагивают остальные ключи, поэтому одно
+    хранилище могут разделять несколько ETL-процессов.
+    """
+
+    @abc.abstractmethod
+    def get_value(self, key: str) -> Any: ...
+
     @abc.abstractmethod
-    def save_state(self, state: dict[str, Any]) -> None: ...
+    def set_value(self, key: str, value: Any) -> None: ...
 
     @abc.abstractmethod
-    def retrieve_state(self) -> dict[str, Any]: ...
+    def delete_value(self, key: str) -> None: ...
+
+    @abc.abstractmethod
+    def compare_and_set(self, key: str, expected: Any, value: Any) -> bool:
+        """Записать value, только если текущее значение равно expected.
+
+        expected=None означает, что ключа ещё нет.
+        """
@@ -0,0 +1,34 @@
+from logging import Logger
+
+from settings import Settings
+from state_manager.base_storage import BaseStorage
+from state_manager.json_file_storage import JsonFileStorage
+
+
+def get_storage(settings: Settings, logger: Logger) -> BaseStorage:
+    """Создаёт хранилище состояния, выбранное в ETL_STATE_BACKEND."""
+    state_settings = settings.state_settings
+
+    if state_settings.backend == "redis":
+        from redis import Redis
+        from state_manager.redis_storage import RedisStorage
+
+        return RedisStorage(
+            Redis.from_url(state_settings.redis_url),
+            hash_name=state_settings.redis_key,
+        )
+
+    if state_settings.backend == "postgres":
+        import psycopg
+        from psycopg.conninfo import make_conninfo
+        from state_manager.postgres_storage import PostgresStorage
+
+        dsn = make_conninfo(**settings.database_settings.get_dsn())
+        return PostgresStorage(
+            lambda: psycopg.connect(dsn, autocommit=True),
+            schema=state_settings.postgres_schema,
+            table=state_settings.postgres_table,
+            logger=logger,
+        )
+
+    return JsonFileStorage(logger=logger, file_path=state_settings.file_path)
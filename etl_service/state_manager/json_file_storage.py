@@ -1,5 +1,6 @@
 import json
 import os
+import tempfile
 from json import JSONDecodeError
 from logging import Logger
 from typing import Any
@@ -16,7 +17,9 @@ def create_directory(path):
 class JsonFileStorage(BaseStorage):
     """Реализация хранилища, использующего локальный файл.
 
-    Формат хранения: JSON
+    Формат хранения: JSON. Файл перезаписывается атомарно: состояние
+    пишется во временный файл рядом и подменяет старый через os.replace,
+    так что падение посреди записи не портит сохранённое состояние.
     """
 
     _file_path: str
@@ -31,28 +34,43 @@ class JsonFileStorage(BaseStorage):
             raise ValueError("file_path can't be None")
 
         self._file_path = file_path
+        self._lock = FileLock(f"{self._file_path}.lock")
 
         self._logger = logger
-        create_directory("./storage")
+        create_directory(os.path.dirname(self._file_path) or ".")
 
-    def save_state(self, state: dict[str, Any]) -> None:
-        """Сохранить состояние в хранилище."""
-        lock = FileLock(f"{self._file_path}.lock")
-        with lock:
-            with open(
-                file=self._file_path, mode="w", encoding="utf-8"
-            ) as json_storage:
-                json.dump(state, json_storage)
+    def get_value(self, key: str) -> Any:
+        with self._lock:
+            return self._read().get(key)
+
+    def set_value(self, key: str, value: Any) -> None:
+        with self._lock:
+            state = self._read()
+            state[key] = value
+            self._write(state)
+
+    def delete_value(self, key: str) -> None:
+        with self._lock:
+            state = self._read()
+            if state.pop(key, None) is not None:
+                self._write(state)
+
+    def compare_and_set(self, key: str, expected: Any, value: Any) -> bool:
+        with self._lock:
+            state = self._read()
+            if state.get(key) != expected:
+                return False
+            state[key] = value
+            self._write(state)
+            return True
 
-    def retrieve_state(self) -> dict[str, Any]:
+    def _read(self) -> dict[str, Any]:
         """Получить состояние из хранилища."""
         try:
-            lock = FileLock(f"{self._file_path}.lock")
-            with lock:
-                with open(
-                    file=self._file_path, mode="r", encoding="utf-8"
-                ) as json_storage:
-                    return json.load(json_storage)
+            with open(
+                file=self._file_path, mode="r", encoding="utf-8"
+            ) as json_storage:
+                return json.load(json_storage)
         except (FileNotFoundError, JSONDecodeError):
             self._logger.warning(
                 "No state file provided. Continue with default file"
@@ -61,3 +79,22 @@ class JsonFileStorage(BaseStorage):
         except Exception as e:
             self._logger.exception(e)
             raise e
+
+    def _write(self, state: dict[str, Any]) -> None:
+        """Атомарно сохранить состояние в хранилище."""
+        directory = os.path.dirname(self._file_path) or "."
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, mode="w", encoding="utf-8") as json_storage:
+                json.dump(state, json_storage)
+                json_storage.flush()
+                os.fsync(json_storage.fileno())
+            os.replace(tmp_path, self._file_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
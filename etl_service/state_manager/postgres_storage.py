@@ -0,0 +1,105 @@
+import logging
+from logging import Logger
+from typing import Any, Callable
+
+from helpers.backoff_func_wrapper import backoff
+from psycopg import Connection, Cursor, OperationalError
+from psycopg import sql
+from psycopg.types.json import Jsonb
+from state_manager.base_storage import BaseStorage
+
+
+class PostgresStorage(BaseStorage):
+    """Хранилище состояния в таблице Postgres, общее для нескольких ETL-процессов.
+
+    Значения хранятся в jsonb, поэтому сравнение в compare_and_set не
+    зависит от порядка ключей и пробелов. Соединение открывается через
+    connect и пересоздаётся, если сервер его оборвал: запрос повторяется
+    один раз на новом соединении.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Connection],
+        schema: str = "public",
+        table: str = "etl_state",
+        logger: Logger = logging.getLogger("state"),
+    ) -> None:
+        self._connect = backoff(0.1, 2, 10, logger)(connect)
+        self._logger = logger
+        self._conn: Connection | None = None
+        self._table = sql.Identifier(schema, table)
+        self._execute(
+            sql.SQL(
+                """
+                CREATE TABLE IF NOT EXISTS {} (
+                    key text PRIMARY KEY,
+                    value jsonb NOT NULL,
+                    modified timestamp with time zone NOT NULL DEFAULT now()
+                )
+                """
+            ).format(self._table)
+        )
+
+    def _execute(self, query: sql.Composable, params: tuple = ()) -> Cursor:
+        for attempt in range(2):
+            if self._conn is None or self._conn.closed:
+                self._conn = self._connect()
+            try:
+                return self._conn.execute(query, params)
+            except OperationalError as e:
+                self._conn.close()
+                self._conn = None
+                if attempt:
+                    raise
+                self._logger.warning(
+                    "Соединение с хранилищем состояния потеряно: %s", e
+                )
+
+    def get_value(self, key: str) -> Any:
+        row = self._execute(
+            sql.SQL("SELECT value FROM {} WHERE key = %s").format(self._table),
+            (key,),
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def set_value(self, key: str, value: Any) -> None:
+        self._execute(
+            sql.SQL(
+                """
+                INSERT INTO {} (key, value) VALUES (%s, %s)
+                ON CONFLICT (key)
+                DO UPDATE SET value = EXCLUDED.value, modified = now()
+                """
+            ).format(self._table),
+            (key, Jsonb(value)),
+        )
+
+    def delete_value(self, key: str) -> None:
+        self._execute(
+            sql.SQL("DELETE FROM {} WHERE key = %s").format(self._table),
+            (key,),
+        )
+
+    def compare_and_set(self, key: str, expected: Any, value: Any) -> bool:
+        if expected is None:
+            cursor = self._execute(
+                sql.SQL(
+                    """
+                    INSERT INTO {} (key, value) VALUES (%s, %s)
+                    ON CONFLICT (key) DO NOTHING
+                    """
+                ).format(self._table),
+                (key, Jsonb(value)),
+            )
+        else:
+            cursor = self._execute(
+                sql.SQL(
+                    """
+                    UPDATE {} SET value = %s, modified = now()
+                    WHERE key = %s AND value = %s
+                    """
+                ).format(self._table),
+                (Jsonb(value), key, Jsonb(expected)),
+            )
+        return cursor.rowcount == 1
@@ -0,0 +1,50 @@
+import json
+from typing import Any
+
+from redis import Redis
+from state_manager.base_storage import BaseStorage
+
+# Сравнение и запись выполняются атомарно внутри Redis.
+# ARGV[2] == "" означает, что поля ещё не должно быть.
+COMPARE_AND_SET_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], ARGV[1])
+if (current == false and ARGV[2] == '') or current == ARGV[2] then
+    redis.call('HSET', KEYS[1], ARGV[1], ARGV[3])
+    return 1
+end
+return 0
+"""
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, sort_keys=True)
+
+
+class RedisStorage(BaseStorage):
+    """Хранилище состояния в хэше Redis, общее для нескольких ETL-процессов."""
+
+    def __init__(self, client: Redis, hash_name: str = "etl_state") -> None:
+        self._client = client
+        self._hash_name = hash_name
+        self._compare_and_set = client.register_script(COMPARE_AND_SET_SCRIPT)
+
+    def get_value(self, key: str) -> Any:
+        value = self._client.hget(self._hash_name, key)
+        if value is None:
+            return None
+        return json.loads(value)
+
+    def set_value(self, key: str, value: Any) -> None:
+        self._client.hset(self._hash_name, key, _dumps(value))
+
+    def delete_value(self, key: str) -> None:
+        self._client.hdel(self._hash_name, key)
+
+    def compare_and_set(self, key: str, expected: Any, value: Any) -> bool:
+        expected_raw = "" if expected is None else _dumps(expected)
+        return bool(
+            self._compare_and_set(
+                keys=[self._hash_name],
+                args=[key, expected_raw, _dumps(value)],
+            )
+        )
@@ -3,19 +3,31 @@ from typing import Any
 from state_manager.base_storage import BaseStorage
 
 
-class StateManager:
+class StateConflictError(Exception):
+    """Значение ключа изменил другой процесс."""
+
 
-    state: dict[str, Any]
+class StateManager:
 
     def __init__(self, storage: BaseStorage) -> None:
         self.storage = storage
-        self.state = self.storage.retrieve_state()
 
     def set_state(self, key: str, value: Any) -> None:
-        self.state.update({key: value})
-        self.storage.save_state(self.state)
+        self.storage.set_value(key, value)
+
+    def compare_and_set_state(self, key: str, expected: Any, value: Any) -> None:
+        """Сдвигает значение ключа, только если его никто не изменил.
+
+        Защищает водяной знак от перезаписи, когда один и тот же индекс
+        по ошибке обрабатывают несколько ETL-процессов.
+        """
+        if not self.storage.compare_and_set(key, expected, value):
+            raise StateConflictError(
+                f"Состояние {key} изменено другим процессом"
+            )
+
+    def delete_state(self, key: str) -> None:
+        self.storage.delete_value(key)
 
     def get_state(self, key: str) -> Any:
-        if self.state.__contains__(key):
-            return self.state[key]
-        return None
+        return self.storage.get_value(key)
@@ -0,0 +1,56 @@
+from datetime import datetime
+from functools import partial
+from typing import Any, Callable
+
+import pytz
+from dateutil import parser
+from state_manager.state_manager import StateManager
+
+MIN_SYNC_ID = "00000000-0000-0000-0000-000000000000"
+
+
+def get_state_key(index_name: str, stage: str | None = None) -> str:
+    if stage is None:
+        return f"{index_name}_last_sync_state"
+    return f"{index_name}_{stage}_last_sync_state"
+
+
+def make_state(last_change_date: datetime | str, last_id: Any) -> dict:
+    if isinstance(last_change_date, datetime):
+        last_change_date = last_change_date.isoformat()
+    return {"last_change_date": last_change_date, "id": str(last_id)}
+
+
+class Watermark:
+    """Водяной знак: дата и id последней отправленной записи.
+
+    Каждая отметка сдвигает знак через compare-and-set от значения,
+    выданного предыдущей отметкой, поэтому отметки должны применяться в
+    порядке выдачи, а чужая запись в тот же ключ прерывает загрузку.
+    """
+
+    def __init__(self, state_manager: StateManager, key: str) -> None:
+        self._state_manager = state_manager
+        self.key = key
+        self._value = state_manager.get_state(key)
+
+    @property
+    def position(self) -> tuple[datetime, str]:
+        if self._value is None:
+            return pytz.UTC.localize(datetime.min), MIN_SYNC_ID
+        return (
+            parser.isoparse(self._value["last_change_date"]),
+            self._value["id"],
+        )
+
+    def checkpoint(
+        self, last_change_date: datetime | str, last_id: Any
+    ) -> Callable[[], None]:
+        value = make_state(last_change_date, last_id)
+        expected, self._value = self._value, value
+        return partial(
+            self._state_manager.compare_and_set_state,
+            self.key,
+            expected,
+            value,
+        )
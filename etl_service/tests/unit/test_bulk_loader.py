@@ -0,0 +1,76 @@
+import logging
+import threading
+
+import pytest
+
+from loader import bulk_loader
+from loader.bulk_loader import BulkLoader, BulkLoadError
+
+logger = logging.getLogger("test")
+
+
+def make_streaming_bulk(failed_ids=(), slow_ids=()):
+    """Подмена streaming_bulk: первый документ из slow_ids ждёт, пока не
+    запишется остальное, а документы из failed_ids возвращают ошибку."""
+    release = threading.Event()
+
+    def streaming_bulk(client, actions, **kwargs):
+        for action in actions:
+            if action["_id"] in slow_ids:
+                release.wait(timeout=5)
+            else:
+                release.set()
+            if action["_id"] in failed_ids:
+                yield False, {"index": {"_id": action["_id"], "status": 400}}
+
+    return streaming_bulk
+
+
+def make_batches(loader, count, committed):
+    for seq in range(count):
+        actions = [{"_index": "movies", "_id": f"doc-{seq}", "_source": b"{}"}]
+        yield loader.make_batch(actions, lambda seq=seq: committed.append(seq))
+
+
+def test_checkpoints_follow_enqueue_order(monkeypatch):
+    # Первая пачка записывается последней, но её отметка всё равно первая.
+    monkeypatch.setattr(
+        bulk_loader, "streaming_bulk", make_streaming_bulk(slow_ids={"doc-0"})
+    )
+    loader = BulkLoader(client=None, logger=logger, workers=3)
+    committed = []
+
+    stats = loader.load(make_batches(loader, 6, committed))
+
+    assert committed == [0, 1, 2, 3, 4, 5]
+    assert stats.docs == 6
+    assert stats.failed == 0
+
+
+def test_document_errors_stop_checkpoints(monkeypatch):
+    monkeypatch.setattr(
+        bulk_loader, "streaming_bulk", make_streaming_bulk(failed_ids={"doc-2"})
+    )
+    loader = BulkLoader(client=None, logger=logger, workers=1)
+    committed = []
+
+    with pytest.raises(BulkLoadError):
+        loader.load(make_batches(loader, 5, committed))
+
+    # Водяной знак не проходит дальше пачки с незаписанным документом.
+    assert committed == [0, 1]
+
+
+def test_failed_batch_blocks_later_batches_written_in_parallel(monkeypatch):
+    monkeypatch.setattr(
+        bulk_loader,
+        "streaming_bulk",
+        make_streaming_bulk(failed_ids={"doc-0"}, slow_ids={"doc-0"}),
+    )
+    loader = BulkLoader(client=None, logger=logger, workers=2)
+    committed = []
+
+    with pytest.raises(BulkLoadError):
+        loader.load(make_batches(loader, 4, committed))
+
+    assert committed == []
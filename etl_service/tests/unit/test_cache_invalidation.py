@@ -0,0 +1,83 @@
+import logging
+import threading
+
+from loader import bulk_loader
+from loader.bulk_loader import BulkLoader
+from loader.cache_invalidation import CacheInvalidator
+
+logger = logging.getLogger("test")
+
+
+class FakePipeline:
+    def __init__(self, client: "FakeRedis") -> None:
+        self._client = client
+        self._commands: list[tuple] = []
+
+    def delete(self, *keys: str) -> None:
+        self._commands.append(("delete", keys))
+
+    def publish(self, channel: str, message: str) -> None:
+        self._commands.append(("publish", channel, message))
+
+    def execute(self) -> None:
+        self._client.commands.extend(self._commands)
+
+
+class FakeRedis:
+    def __init__(self, available: bool = True) -> None:
+        self.available = available
+        self.calls = 0
+        self.commands: list[tuple] = []
+        self.redeleted = threading.Event()
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        self.calls += 1
+        if not self.available:
+            raise ConnectionError("Redis недоступен")
+        return FakePipeline(self)
+
+    def delete(self, *keys: str) -> None:
+        self.commands.append(("delete", keys))
+        self.redeleted.set()
+
+
+def test_keys_are_deleted_again_after_delay():
+    client = FakeRedis()
+    invalidator = CacheInvalidator(
+        client, logger, key_template="film:{id}", redelete_delay=0.01
+    )
+
+    invalidator.callback(["a", "b"])()
+
+    assert client.redeleted.wait(timeout=5)
+    assert client.commands == [
+        ("delete", ("film:a", "film:b")),
+        ("publish", "content:invalidate:movies", '["a", "b"]'),
+        ("delete", ("film:a", "film:b")),
+    ]
+
+
+def test_load_completes_when_redis_is_down(monkeypatch):
+    monkeypatch.setattr(
+        bulk_loader, "streaming_bulk", lambda client, actions, **kwargs: iter(())
+    )
+    client = FakeRedis(available=False)
+    invalidator = CacheInvalidator(
+        client, logger, attempts=2, retry_delay=0, redelete_delay=0.01
+    )
+    loader = BulkLoader(client=None, logger=logger, workers=1)
+    committed = []
+    actions = [{"_index": "movies", "_id": "a", "_source": b"{}"}]
+
+    stats = loader.load(
+        [
+            loader.make_batch(actions, invalidator.callback(["a"])),
+            loader.make_batch([], lambda: committed.append("watermark")),
+        ]
+    )
+
+    assert stats.docs == 1
+    assert committed == ["watermark"]
+    assert client.calls == 2
+    # Без успешного сброса повторное удаление не запускается.
+    assert not client.redeleted.wait(timeout=0.05)
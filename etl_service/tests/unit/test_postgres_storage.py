@@ -0,0 +1,57 @@
+import logging
+
+import pytest
+from psycopg import OperationalError
+
+from state_manager.postgres_storage import PostgresStorage
+
+logger = logging.getLogger("test")
+
+
+class FakeCursor:
+    def __init__(self, row=None, rowcount=1) -> None:
+        self._row = row
+        self.rowcount = rowcount
+
+    def fetchone(self):
+        return self._row
+
+
+class FakeConnection:
+    def __init__(self, broken: bool = False) -> None:
+        self.broken = broken
+        self.closed = False
+        self.queries = 0
+
+    def execute(self, query, params=()):
+        if self.broken:
+            raise OperationalError("server closed the connection unexpectedly")
+        self.queries += 1
+        return FakeCursor(row=({"id": "a"},))
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def test_reconnects_after_lost_connection():
+    connections = [FakeConnection()]
+
+    def connect():
+        return connections[-1]
+
+    storage = PostgresStorage(connect, logger=logger)
+    connections[-1].broken = True
+    connections.append(FakeConnection())
+
+    assert storage.get_value("movies_last_sync_state") == {"id": "a"}
+    assert connections[0].closed
+    assert connections[1].queries == 1
+
+
+def test_raises_when_reconnect_does_not_help():
+    connections = [FakeConnection()]
+    storage = PostgresStorage(lambda: connections[-1], logger=logger)
+    connections[-1].broken = True
+
+    with pytest.raises(OperationalError):
+        storage.get_value("movies_last_sync_state")
@@ -0,0 +1,122 @@
+import logging
+from fnmatch import fnmatch
+from types import SimpleNamespace
+
+from documents.movie import Movie
+from loader.reindex import create_build_index, init_index
+
+logger = logging.getLogger("test")
+
+
+class FakeIndices:
+    """Индексы Elasticsearch в памяти: алиасы разрешаются так же, как на
+    сервере, и ответы приходят под настоящими именами индексов."""
+
+    def __init__(self) -> None:
+        self.indices: dict[str, dict] = {}
+        self.aliases: dict[str, set[str]] = {}
+        self.mapping_updates: list[str] = []
+
+    def _resolve(self, index: str) -> list[str]:
+        if index in self.aliases:
+            return sorted(self.aliases[index])
+        return [index] if index in self.indices else []
+
+    def exists(self, index: str) -> bool:
+        return bool(self._resolve(index))
+
+    def exists_alias(self, name: str) -> bool:
+        return name in self.aliases
+
+    def get_alias(self, name: str) -> SimpleNamespace:
+        return SimpleNamespace(
+            body={index: {"aliases": {name: {}}} for index in self.aliases[name]}
+        )
+
+    def get(self, index: str) -> SimpleNamespace:
+        return SimpleNamespace(
+            body={
+                name: self.indices[name]
+                for name in self.indices
+                if fnmatch(name, index)
+            }
+        )
+
+    def delete(self, index: str) -> None:
+        del self.indices[index]
+
+    def create(self, index: str, body: dict) -> None:
+        assert index not in self.indices and index not in self.aliases
+        self.indices[index] = body
+
+    def get_settings(self, index: str) -> dict:
+        return {
+            name: {"settings": {"index": self.indices[name]["settings"]}}
+            for name in self._resolve(index)
+        }
+
+    def put_settings(self, index: str, body: dict) -> None:
+        for name in self._resolve(index):
+            self.indices[name]["settings"].update(body)
+
+    def put_mapping(self, index: str, body: dict) -> None:
+        assert index in self.indices, "маппинг обновляется по имени индекса"
+        self.mapping_updates.append(index)
+
+    def update_aliases(self, actions: list[dict]) -> None:
+        for action in actions:
+            add = action["add"]
+            self.aliases.setdefault(add["alias"], set()).add(add["index"])
+
+
+class FakeCluster:
+    def __init__(self, indices: FakeIndices) -> None:
+        self._indices = indices
+
+    def state(self, index: str, metric: str) -> dict:
+        return {"metadata": {"indices": {index: {"state": "open"}}}}
+
+
+def make_client() -> SimpleNamespace:
+    indices = FakeIndices()
+    return SimpleNamespace(indices=indices, cluster=FakeCluster(indices))
+
+
+def test_init_index_twice_updates_aliased_index():
+    client = make_client()
+
+    init_index(Movie, client)
+    init_index(Movie, client)
+
+    [name] = client.indices.aliases["movies"]
+    assert name.startswith("movies_")
+    assert list(client.indices.indices) == [name]
+    assert client.indices.mapping_updates == [name]
+
+
+def test_rebuild_resumes_unfinished_build_index():
+    client = make_client()
+    init_index(Movie, client)
+    [published] = client.indices.aliases["movies"]
+    client.indices.create(index="movies_20240101", body={"settings": {}})
+    client.indices.create(index="movies_20240102", body={"settings": {}})
+
+    name = create_build_index(
+        Movie, client, logger, resume="movies_20240102"
+    )
+
+    assert name == "movies_20240102"
+    assert sorted(client.indices.indices) == sorted(
+        [published, "movies_20240102"]
+    )
+
+
+def test_rebuild_never_resumes_published_index():
+    client = make_client()
+    init_index(Movie, client)
+    [published] = client.indices.aliases["movies"]
+
+    name = create_build_index(Movie, client, logger, resume=published)
+
+    assert name != published
+    assert sorted(client.indices.indices) == sorted([published, name])
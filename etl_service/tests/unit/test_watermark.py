@@ -0,0 +1,52 @@
+import logging
+from datetime import datetime, timezone
+
+import pytest
+
+from state_manager.json_file_storage import JsonFileStorage
+from state_manager.state_manager import StateConflictError, StateManager
+from state_manager.watermark import Watermark
+
+logger = logging.getLogger("test")
+
+
+@pytest.fixture
+def state_manager(tmp_path):
+    return StateManager(
+        JsonFileStorage(logger, file_path=str(tmp_path / "state.json"))
+    )
+
+
+def test_checkpoints_advance_position(state_manager):
+    watermark = Watermark(state_manager, "movies_last_sync_state")
+    first = watermark.checkpoint(datetime(2024, 1, 1, tzinfo=timezone.utc), "a")
+    second = watermark.checkpoint(datetime(2024, 1, 2, tzinfo=timezone.utc), "b")
+
+    first()
+    second()
+
+    restored = Watermark(state_manager, "movies_last_sync_state")
+    assert restored.position == (
+        datetime(2024, 1, 2, tzinfo=timezone.utc),
+        "b",
+    )
+
+
+def test_checkpoint_out_of_order_conflicts(state_manager):
+    watermark = Watermark(state_manager, "movies_last_sync_state")
+    watermark.checkpoint(datetime(2024, 1, 1, tzinfo=timezone.utc), "a")
+    second = watermark.checkpoint(datetime(2024, 1, 2, tzinfo=timezone.utc), "b")
+
+    with pytest.raises(StateConflictError):
+        second()
+
+
+def test_concurrent_writer_conflicts(state_manager):
+    watermark = Watermark(state_manager, "movies_last_sync_state")
+    checkpoint = watermark.checkpoint(
+        datetime(2024, 1, 1, tzinfo=timezone.utc), "a"
+    )
+    state_manager.set_state("movies_last_sync_state", {"id": "other"})
+
+    with pytest.raises(StateConflictError):
+        checkpoint()
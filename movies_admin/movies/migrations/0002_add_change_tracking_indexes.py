@@ -0,0 +1,41 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("movies", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="filmwork",
+            index=models.Index(
+                fields=["modified", "id"], name="film_work_modified_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="genre",
+            index=models.Index(
+                fields=["modified", "id"], name="genre_modified_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="person",
+            index=models.Index(
+                fields=["modified", "id"], name="person_modified_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="genrefilmwork",
+            index=models.Index(
+                fields=["created", "id"], name="genre_film_work_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="personfilmwork",
+            index=models.Index(
+                fields=["created", "id"], name="person_film_work_created_idx"
+            ),
+        ),
+    ]
@@ -34,6 +34,12 @@ class Genre(UUIDMixin, TimeStampedMixin):
         verbose_name = _("genre")
         verbose_name_plural = _("genres")
         ordering = ("name",)
+        indexes = [
+            models.Index(
+                fields=["modified", "id"],
+                name="genre_modified_idx",
+            ),
+        ]
 
 
 class Person(UUIDMixin, TimeStampedMixin):
@@ -46,6 +52,12 @@ class Person(UUIDMixin, TimeStampedMixin):
         db_table = 'content"."person'
         verbose_name = _("person")
         verbose_name_plural = _("persons")
+        indexes = [
+            models.Index(
+                fields=["modified", "id"],
+                name="person_modified_idx",
+            ),
+        ]
 
 
 class FilmTypes(models.TextChoices):
@@ -91,6 +103,10 @@ class FilmWork(UUIDMixin, TimeStampedMixin):
                 fields=["creation_date", "rating"],
                 name="film_work_creation_rating_idx",
             ),
+            models.Index(
+                fields=["modified", "id"],
+                name="film_work_modified_idx",
+            ),
         ]
 
 
@@ -110,6 +126,12 @@ class GenreFilmWork(UUIDMixin):
         db_table = 'content"."genre_film_work'
         verbose_name = _("genre")
         verbose_name_plural = _("film genres")
+        indexes = [
+            models.Index(
+                fields=["created", "id"],
+                name="genre_film_work_created_idx",
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=["film_work", "genre"],
@@ -146,6 +168,12 @@ class PersonFilmWork(UUIDMixin):
         db_table = 'content"."person_film_work'
         verbose_name = _("person")
         verbose_name_plural = _("film persons")
+        indexes = [
+            models.Index(
+                fields=["created", "id"],
+                name="person_film_work_created_idx",
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=["film_work", "person", "role"],
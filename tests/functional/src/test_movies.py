@@ -1,4 +1,5 @@
 from http import HTTPStatus
+import uuid
 
 import pytest
 
@@ -41,3 +42,39 @@ async def test_get_film(add_film, http_client):
         assert response.status == HTTPStatus.OK
         result = await response.json()
         assert result.get("title") == FILM_NAME
+
+
+@pytest.mark.asyncio
+async def test_get_unknown_film(add_film, http_client):
+    url = test_settings.service_url + "/api/v1/films/" + str(uuid.uuid4())
+    # Второй запрос отвечает из кэша отсутствующих фильмов.
+    for _ in range(2):
+        async with http_client.get(url) as response:
+            assert response.status == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_film_list_cursor(add_films, http_client):
+    url = test_settings.service_url + "/api/v1/films/"
+    async with http_client.get(url) as response:
+        first_page = await response.json()
+        cursor = response.headers.get("X-Next-Cursor")
+    assert cursor is not None
+
+    async with http_client.get(url, params={"cursor": cursor}) as response:
+        assert response.status == HTTPStatus.OK
+        next_page = await response.json()
+
+    async with http_client.get(url, params={"page": 2}) as response:
+        second_page = await response.json()
+
+    # Рейтинги у фильмов равны: порядок держится на тайбрейке по id.
+    first_ids = {film["id"] for film in first_page}
+    assert len(next_page) == 10
+    assert not first_ids & {film["id"] for film in next_page}
+    assert [film["id"] for film in next_page] == [
+        film["id"] for film in second_page
+    ]
+
+    async with http_client.get(url, params={"cursor": "broken"}) as response:
+        assert response.status == HTTPStatus.BAD_REQUEST